@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ポスターAPI（server.js）を呼ぶ asyncio の HTTP/1.1 クライアント
+
+接続は keep-alive で再利用し、同時に開く接続の数を pool_size までに抑える。
+標準ライブラリだけで動くよう、アプリのAPIに必要な範囲（JSONの送受信、
+Content-Length・chunked の応答）だけを実装している。
+
+    async with APIClient('http://localhost:5000', pool_size=20) as client:
+        status, data = await client.request('GET', '/api/states/suita')
+        status, data = await client.request('POST', '/api/states/check', {...})
+"""
+
+import asyncio
+import json
+import ssl
+from urllib.parse import quote, urlsplit
+
+# 応答を待つ秒数の既定値
+DEFAULT_TIMEOUT = 30.0
+
+
+class APIError(Exception):
+    """通信の失敗（接続できない、応答が不正など）"""
+
+
+class _Connection:
+    """keep-alive で再利用する1本の接続"""
+
+    __slots__ = ('reader', 'writer')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class APIClient:
+    """接続プール付きのクライアント"""
+
+    def __init__(self, base_url, pool_size=10, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"http:// または https:// のURLを指定してください: {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+        self.base_path = parts.path.rstrip('/')
+        default_port = (parts.scheme == 'https' and self.port == 443) or (parts.scheme == 'http' and self.port == 80)
+        self.host_header = self.host if default_port else f"{self.host}:{self.port}"
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(pool_size)
+        self._idle = []
+        # 新しく開いた接続の数
+        self.connections_opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    async def _open(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, method, path, payload=None):
+        """
+        リクエストを送って応答を受け取る
+
+        Returns:
+            tuple: (ステータスコード, JSONを解析した応答本文（JSONでなければ文字列）)
+        """
+        body = b'' if payload is None else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = [
+            f"{method} {quote(self.base_path + path, safe='/:?=&')} HTTP/1.1",
+            f"Host: {self.host_header}",
+            "Connection: keep-alive",
+            "Accept: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        if payload is not None:
+            head.append("Content-Type: application/json")
+        request = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+        async with self._slots:
+            # 再利用した接続がサーバー側で閉じられていた場合は、新しい接続で1回だけやり直す
+            for attempt in range(2):
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else await self._open()
+                try:
+                    connection.writer.write(request)
+                    await connection.writer.drain()
+                    status, headers, data = await asyncio.wait_for(self._read_response(connection.reader),
+                                                                   self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    connection.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise APIError(f"{method} {path}: {e}") from e
+                except BaseException:
+                    connection.close()
+                    raise
+                if headers.get('connection', '').lower() == 'close':
+                    connection.close()
+                else:
+                    self._idle.append(connection)
+                return status, _decode_body(headers, data)
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            raise APIError(f"不正な応答です: {status_line!r}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b''.join(chunks)
+        else:
+            data = await reader.readexactly(int(headers.get('content-length', 0)))
+        return status, headers, data
+
+
+def _decode_body(headers, data):
+    text = data.decode('utf-8')
+    if 'json' in headers.get('content-type', ''):
+        return json.loads(text)
+    return text
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+稼働中のAPIから状態を取得してエクスポートJSONを作る
+
+ブラウザの「エクスポート」と同じく、public/*.csv の全市区町村について
+GET /api/states/:city を（keep-alive の接続を使い回して）同時に取得し、
+checkStates・memos を掲示場所一覧と組み合わせて poster-data-export-*.json と
+同じ形で書き出す。convert_json_to_csv.py などでそのまま変換できる。
+
+定期実行向けに、出力先にディレクトリを指定すると取得時刻入りのファイル名で保存する。
+ファイルは一時ファイルに書いてから置き換え、取得に失敗した場合は何も書かずに終了コード1で終了する。
+
+使い方:
+    python api_snapshot.py --url https://example.onrender.com
+    python api_snapshot.py --url http://localhost:5000 -o snapshots/
+
+    # cron で10分ごとに保存する例
+    */10 * * * * cd /path/to/repo && python api_snapshot.py --url https://example.onrender.com -o snapshots/
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from api_client import APIClient, APIError
+from db_dump import EXPORT_CITIES, district_sort_key, location_entry, read_app_csv, write_export
+from location_store import PUBLIC_DIR
+from poster_db import memo_value_to_comments, now_iso
+
+# 取得に失敗した市区町村を再試行する回数
+DEFAULT_RETRIES = 2
+
+
+def discover_public_cities():
+    """
+    public/*.csv の市区町村（アプリと同じ順、それ以外は名前の順）
+
+    Returns:
+        list: (市キー, CSVのパス) のリスト
+    """
+    found = {os.path.splitext(os.path.basename(path))[0]: path
+             for path in glob.glob(os.path.join(PUBLIC_DIR, '*.csv'))}
+    order = [key for key in EXPORT_CITIES if key in found]
+    order += sorted(key for key in found if key not in EXPORT_CITIES)
+    return [(key, found[key]) for key in order]
+
+
+def city_name_of(city_key):
+    """市区町村名（レイアウトがなければ市キー）"""
+    from list_parsing.engine import load_layout
+    try:
+        return load_layout(city_key).city_name
+    except ImportError:
+        return city_key
+
+
+async def fetch_states(url, city_keys, retries=DEFAULT_RETRIES, connections=4):
+    """
+    全市区町村の GET /api/states/:city を同時に取得する
+
+    Returns:
+        dict: 市キー → {checkStates, memos}
+    """
+    async with APIClient(url, pool_size=connections) as client:
+        async def fetch(city_key):
+            for attempt in range(retries + 1):
+                try:
+                    status, data = await client.request('GET', f'/api/states/{city_key}')
+                except (APIError, OSError, asyncio.TimeoutError) as e:
+                    error = f"{city_key}: {e}"
+                else:
+                    if status == 200 and isinstance(data, dict):
+                        return data
+                    error = f"{city_key}: HTTP {status}"
+                if attempt < retries:
+                    await asyncio.sleep(2 ** attempt)
+            raise APIError(error)
+
+        results = await asyncio.gather(*(fetch(city_key) for city_key in city_keys))
+    return dict(zip(city_keys, results))
+
+
+def _check_state(value):
+    """アプリ（convertCheckStates）と同じくチェック状態を (checked, lastUpdated) にする"""
+    if isinstance(value, bool):
+        return value, None
+    if isinstance(value, dict) and 'checked' in value:
+        return value['checked'] or False, value.get('lastUpdated') or None
+    return False, None
+
+
+def iter_snapshot_districts(master, states, exported_at, stats):
+    """
+    掲示場所一覧に状態を付けて、エクスポートの投票区データを順に返す
+
+    Yields:
+        tuple: (投票区, エクスポートの投票区データ)
+    """
+    check_states = states.get('checkStates') or {}
+    memos = states.get('memos') or {}
+    for district_id in sorted(master, key=district_sort_key):
+        locations = []
+        for location in master[district_id]:
+            key = f"{district_id}-{location.get('number')}"
+            is_checked, last_updated = _check_state(check_states.get(key))
+            comments = memo_value_to_comments(memos.get(key), exported_at)
+            locations.append(location_entry(location, is_checked, last_updated, comments))
+            stats['locations'] += 1
+            stats['checked'] += bool(is_checked)
+        key = f"{district_id}-district"
+        is_checked, last_updated = _check_state(check_states.get(key))
+        yield district_id, {
+            'locations': locations,
+            'districtComments': {
+                'isChecked': is_checked,
+                'lastUpdated': last_updated,
+                'comments': memo_value_to_comments(memos.get(key), exported_at),
+            },
+        }
+
+
+def snapshot_path(output, fetched_at):
+    """出力先がディレクトリ（または省略）なら取得時刻入りのファイル名にする"""
+    name = f"poster-data-export-{fetched_at.strftime('%Y-%m-%dT%H-%M-%SZ')}.json"
+    if not output:
+        return name
+    if os.path.isdir(output) or output.endswith(os.sep):
+        os.makedirs(output, exist_ok=True)
+        return os.path.join(output, name)
+    return output
+
+
+def take_snapshot(url, output=None, cities=None, retries=DEFAULT_RETRIES):
+    """
+    APIから全市区町村の状態を取得してエクスポートJSONを書き出す
+
+    Returns:
+        tuple: (出力したパス, 件数)
+    """
+    targets = discover_public_cities()
+    if cities:
+        targets = [(key, path) for key, path in targets if key in cities]
+        missing = set(cities) - {key for key, _ in targets}
+        if missing:
+            raise ValueError(f"public/ に掲示場所一覧がありません: {', '.join(sorted(missing))}")
+    if not targets:
+        raise ValueError("public/ に掲示場所一覧（*.csv）がありません")
+
+    start = time.perf_counter()
+    states = asyncio.run(fetch_states(url, [key for key, _ in targets], retries))
+    stats = {'cities': len(targets), 'locations': 0, 'checked': 0, 'fetch_seconds': time.perf_counter() - start}
+
+    fetched_at = datetime.now(timezone.utc)
+    exported_at = now_iso()
+    output_path = snapshot_path(output, fetched_at)
+    write_export(output_path, exported_at, (
+        (city_key, city_name_of(city_key),
+         iter_snapshot_districts(read_app_csv(csv_path), states[city_key], exported_at, stats))
+        for city_key, csv_path in targets
+    ))
+    stats['seconds'] = time.perf_counter() - start
+    return output_path, stats
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='稼働中のAPIから状態を取得してエクスポートJSONを作る')
+    parser.add_argument('--url', required=True, help='アプリのURL（例: http://localhost:5000）')
+    parser.add_argument('-o', '--output',
+                        help='出力するJSON、またはディレクトリ（省略時・ディレクトリは poster-data-export-<取得時刻>.json）')
+    parser.add_argument('--city', action='append', help='対象の市キー（複数指定可、省略時は public/ の全て）')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='取得に失敗した場合の再試行の回数')
+    args = parser.parse_args()
+
+    try:
+        output_path, stats = take_snapshot(args.url, args.output, args.city, args.retries)
+    except ValueError as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+    except APIError as e:
+        print(f"エラー: 状態を取得できませんでした（出力していません）。{e}")
+        sys.exit(1)
+
+    print(f"出力: {output_path}")
+    print(f"市区町村: {stats['cities']} / 掲示場所: {stats['locations']}件 (チェック済み {stats['checked']}件)")
+    print(f"処理時間: {stats['seconds']:.3f}秒 (取得 {stats['fetch_seconds']:.3f}秒)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数のエクスポートJSONをまとめてCSVに変換するバッチスクリプト
+
+ディレクトリまたはglobパターンで指定したエクスポートを、
+CPUコア数分のプロセスで並列に convert_json_to_csv へ渡す。
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from convert_json_to_csv import convert_json_to_csv
+
+# ディレクトリ指定時に対象とするファイル名のパターン
+DEFAULT_PATTERN = 'poster-data-export-*.json'
+
+
+def collect_export_files(targets, pattern=DEFAULT_PATTERN):
+    """
+    引数で指定されたディレクトリ・ファイル・globパターンから変換対象を集める
+
+    Returns:
+        list: 重複を除いてソートしたJSONファイルのパス
+    """
+    files = set()
+    for target in targets:
+        if os.path.isdir(target):
+            files.update(glob.glob(os.path.join(target, pattern)))
+        elif os.path.isfile(target):
+            files.add(target)
+        else:
+            files.update(path for path in glob.glob(target) if os.path.isfile(path))
+    return sorted(set(os.path.normpath(path) for path in files))
+
+
+def output_path_for(json_file_path, output_dir=None):
+    """入力ファイルに対応する出力CSVのパスを返す（省略時は入力と同じ場所）"""
+    base_name = os.path.splitext(os.path.basename(json_file_path))[0]
+    if output_dir is None:
+        output_dir = os.path.dirname(json_file_path)
+    return os.path.join(output_dir, f"{base_name}.csv")
+
+
+def output_paths_for(json_files, output_dir=None):
+    """
+    入力ファイルごとの出力CSVのパスを返す
+
+    出力先ディレクトリに別々のディレクトリの同じ名前のファイルが重なる場合は、上書きし合わないよう
+    入力の共通の親ディレクトリからの相対パス（サブディレクトリ）で出力する。
+
+    Returns:
+        dict: 入力パス → 出力パス
+    """
+    paths = {path: output_path_for(path, output_dir) for path in json_files}
+    if output_dir is None or len(set(paths.values())) == len(paths):
+        return paths
+    base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in json_files])
+    return {
+        path: os.path.join(output_dir, f"{os.path.splitext(os.path.relpath(os.path.abspath(path), base_dir))[0]}.csv")
+        for path in json_files
+    }
+
+
+def convert_one(json_file_path, output_csv_path, streaming=False):
+    """
+    1ファイルを変換する（ワーカープロセスで実行）
+
+    Returns:
+        tuple: (入力パス, 出力パス, 成否, 処理秒数, 変換時の出力メッセージ)
+    """
+    # 並列実行時に各ファイルのメッセージが混ざらないよう取り込んで返す
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        try:
+            success = convert_json_to_csv(json_file_path, output_csv_path, streaming=streaming)
+        except Exception as e:
+            print(f"エラー: {e}")
+            success = False
+    elapsed = time.perf_counter() - start
+    return json_file_path, output_csv_path, success, elapsed, log.getvalue()
+
+
+def batch_convert(json_files, output_dir=None, workers=None, streaming=False):
+    """
+    複数のJSONファイルを並列に変換する
+
+    Args:
+        json_files (list): 変換するJSONファイルのパス
+        output_dir (str): 出力先ディレクトリ（省略時は入力ファイルと同じ場所）
+        workers (int): ワーカープロセス数（省略時はCPUコア数）
+        streaming (bool): 各ファイルをストリーミングモードで変換する
+
+    Returns:
+        list: ファイルごとの convert_one の結果（入力パス順）
+    """
+    output_paths = output_paths_for(json_files, output_dir)
+    for output_csv_path in output_paths.values():
+        os.makedirs(os.path.dirname(output_csv_path) or '.', exist_ok=True)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(convert_one, path, output_paths[path], streaming)
+            for path in json_files
+        ]
+        for future in as_completed(futures):
+            json_file_path, output_csv_path, success, elapsed, _ = result = future.result()
+            status = "完了" if success else "失敗"
+            print(f"[{status}] {json_file_path} → {output_csv_path} ({elapsed:.2f}秒)")
+            results.append(result)
+
+    results.sort(key=lambda result: result[0])
+    return results
+
+
+def print_summary(results, total_elapsed):
+    """変換結果のサマリーを表示"""
+    succeeded = [result for result in results if result[2]]
+    failed = [result for result in results if not result[2]]
+    elapsed_list = [result[3] for result in results]
+
+    print("\n=== 変換結果 ===")
+    print(f"対象ファイル数: {len(results)}件")
+    print(f"成功: {len(succeeded)}件 / 失敗: {len(failed)}件")
+    if elapsed_list:
+        print(f"1ファイルあたり: 平均{sum(elapsed_list) / len(elapsed_list):.2f}秒 "
+              f"(最短{min(elapsed_list):.2f}秒 / 最長{max(elapsed_list):.2f}秒)")
+    print(f"全体の処理時間: {total_elapsed:.2f}秒")
+
+    for json_file_path, _, _, _, log in failed:
+        print(f"\n失敗: {json_file_path}")
+        print(log.rstrip())
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='複数のエクスポートJSONをまとめてCSVに変換')
+    parser.add_argument('targets', nargs='+',
+                        help=f'JSONファイル・ディレクトリ・globパターン（ディレクトリは {DEFAULT_PATTERN} を対象）')
+    parser.add_argument('-o', '--output-dir',
+                        help='出力先ディレクトリ（省略時は入力ファイルと同じ場所。同じ名前のファイルは元のディレクトリ構成で出力）')
+    parser.add_argument('-j', '--workers', type=int, help='並列数（省略時はCPUコア数）')
+    parser.add_argument('--stream', action='store_true', help='各ファイルをストリーミングモードで変換する')
+    args = parser.parse_args()
+
+    print("JSON to CSV一括変換スクリプト")
+    print("=" * 50)
+
+    json_files = collect_export_files(args.targets)
+    if not json_files:
+        print("エラー: 変換対象のJSONファイルが見つかりません。")
+        return
+
+    print(f"対象ファイル数: {len(json_files)}件")
+    print(f"並列数: {args.workers or os.cpu_count() or 1}")
+    print()
+
+    start = time.perf_counter()
+    results = batch_convert(json_files, args.output_dir, args.workers, args.stream)
+    print_summary(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+convert_json_to_csv の日時フォーマット処理のベンチマーク
+
+サンプルのエクスポートを指定倍率で複製した大きなエクスポートを作り、
+従来の datetime.fromisoformat + strftime による変換と、
+キャッシュ付き・固定形式高速パス付きの変換を比較する。
+
+使い方:
+    python benchmarks/bench_format_datetime.py [--scale 100]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_json_to_csv  # noqa: E402
+from export_stream import iter_export_districts  # noqa: E402
+
+SAMPLE_EXPORT = os.path.join(ROOT_DIR, 'poster-data-export-2025-07-10.json')
+
+
+def legacy_format_datetime(iso_string):
+    """従来の変換処理（比較用）"""
+    if not iso_string:
+        return ""
+    try:
+        dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
+        return dt.strftime('%Y/%m/%d %H:%M')
+    except Exception:
+        return iso_string
+
+
+def legacy_format_comments(comments):
+    """従来のコメント変換処理（比較用）"""
+    if not comments:
+        return ""
+    comment_texts = []
+    for comment in comments:
+        timestamp = comment.get('timestamp', '')
+        if timestamp:
+            try:
+                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+                comment_texts.append(f"{comment.get('text', '')} ({dt.strftime('%Y/%m/%d %H:%M')})")
+            except Exception:
+                comment_texts.append(comment.get('text', ''))
+        else:
+            comment_texts.append(comment.get('text', ''))
+    return " | ".join(comment_texts)
+
+
+def jitter_timestamp(iso_string, rng):
+    """タイムスタンプを数時間の範囲でずらす（分単位の重複が残る程度）"""
+    if not iso_string:
+        return iso_string
+    dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
+    dt += timedelta(minutes=rng.randint(0, 180), milliseconds=rng.randint(0, 59999))
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z"
+
+
+def build_large_export(scale, seed=0):
+    """サンプルのエクスポートを scale 倍に複製した大きなエクスポートを作る"""
+    with open(SAMPLE_EXPORT, 'r', encoding='utf-8') as f:
+        sample = json.load(f)
+
+    rng = random.Random(seed)
+    data = {'timestamp': sample['timestamp'], 'cities': {}}
+    for copy_index in range(scale):
+        for city_key, city_data in sample['cities'].items():
+            districts = {}
+            for district_key, district_data in city_data['districts'].items():
+                locations = []
+                for location in district_data['locations']:
+                    location = dict(location)
+                    location['lastUpdated'] = jitter_timestamp(location['lastUpdated'], rng)
+                    location['comments'] = [
+                        dict(comment, timestamp=jitter_timestamp(comment['timestamp'], rng))
+                        for comment in location['comments']
+                    ]
+                    locations.append(location)
+                districts[district_key] = {
+                    'locations': locations,
+                    'districtComments': district_data['districtComments'],
+                }
+            data['cities'][f"{city_key}_{copy_index}"] = {'name': city_data['name'], 'districts': districts}
+    return data
+
+
+def run_formatting(data, format_datetime, format_comments):
+    """全ての日時・コメントを変換して処理時間を返す"""
+    start = time.perf_counter()
+    for _, _, _, district_data in iter_export_districts(data):
+        district_comments = district_data.get('districtComments', {})
+        format_datetime(district_comments.get('lastUpdated', ''))
+        format_comments(district_comments.get('comments', []))
+        for location in district_data.get('locations', []):
+            format_datetime(location.get('lastUpdated', ''))
+            format_comments(location.get('comments', []))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='日時フォーマット処理のベンチマーク')
+    parser.add_argument('--scale', type=int, default=100, help='サンプルのエクスポートを複製する倍率')
+    args = parser.parse_args()
+
+    print(f"エクスポートを{args.scale}倍に複製中...")
+    data = build_large_export(args.scale)
+    location_count = sum(
+        len(district_data['locations']) for _, _, _, district_data in iter_export_districts(data)
+    )
+    print(f"掲示場所数: {location_count}件")
+
+    legacy_elapsed = run_formatting(data, legacy_format_datetime, legacy_format_comments)
+
+    convert_json_to_csv._format_iso_datetime.cache_clear()
+    cached_elapsed = run_formatting(
+        data, convert_json_to_csv.format_datetime, convert_json_to_csv.format_comments
+    )
+    cache_info = convert_json_to_csv._format_iso_datetime.cache_info()
+
+    print("\n=== 結果 ===")
+    print(f"従来の変換:     {legacy_elapsed:.3f}秒")
+    print(f"キャッシュ付き: {cached_elapsed:.3f}秒")
+    print(f"高速化: {legacy_elapsed / cached_elapsed:.1f}倍")
+    hit_rate = cache_info.hits / max(cache_info.hits + cache_info.misses, 1)
+    print(f"キャッシュヒット率: {hit_rate:.1%} (ヒット{cache_info.hits}件 / ミス{cache_info.misses}件)")
+
+
+if __name__ == "__main__":
+    main()
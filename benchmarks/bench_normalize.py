@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+text_normalize の文字列正規化のベンチマーク
+
+サンプルのエクスポートの名称・住所を指定倍率で並べ、1行あたりの処理時間を
+変更前の実装と比較する。
+
+    全角数字の変換: 吹田市の convert_to_halfwidth（10回の replace）と、呼び出しごとに
+                    str.maketrans で変換表を作っていた処理 → to_halfwidth_digits（作成済みの変換表）
+                    入力は実際の呼び出し元と同じく、投票区の見出し（第１０１投票区 など）と
+                    エンジンが全件で正規化する投票区・番号のキー
+    名称の改行除去: 変換処理に直接書かれていた replace → strip_line_breaks
+    住所の照合キー: normalize_address のキャッシュなし・キャッシュ付き（初回／2回目）
+
+複製した行には複製ごとに異なる番号を付けるため、全ての文字列は互いに異なる。
+キャッシュ付きの2回目は、行数がキャッシュの上限（NORMALIZE_CACHE_SIZE）を超える場合は
+ほとんど再計算になる。
+
+使い方:
+    python benchmarks/bench_normalize.py [--scale 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+import unicodedata
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import text_normalize  # noqa: E402
+from export_stream import open_export  # noqa: E402
+
+SAMPLE_EXPORT = os.path.join(ROOT_DIR, 'poster-data-export-2025-07-10.json')
+
+TO_FULLWIDTH_TABLE = str.maketrans('0123456789- ', '０１２３４５６７８９－　')
+
+
+def baseline_convert_to_halfwidth(text):
+    """変更前の実装（list_parsing/suita/work.py の convert_to_halfwidth）"""
+    fullwidth_digits = '０１２３４５６７８９'
+    halfwidth_digits = '0123456789'
+    for fw, hw in zip(fullwidth_digits, halfwidth_digits):
+        text = text.replace(fw, hw)
+    return text
+
+
+def baseline_translate_per_call(text):
+    """変更前の実装（extract_district_items などで呼び出しごとに変換表を作っていた処理）"""
+    return text.translate(str.maketrans('０１２３４５６７８９', '0123456789'))
+
+
+def baseline_strip_name(text):
+    """変更前の実装（convert_json_to_csv などに直接書かれていた改行の除去）"""
+    return text.replace('\r', '').replace('\n', '')
+
+
+def load_rows(scale):
+    """
+    サンプルのエクスポートの行を、複製ごとに番号を変えて scale 倍に並べる
+
+    Returns:
+        tuple: ((名称, 住所, 全角表記の住所) のリスト, (投票区の見出し, 投票区, 番号) のリスト)
+    """
+    samples = []
+    with open_export(SAMPLE_EXPORT) as export:
+        for _, _, district_key, district_data in export.iter_districts():
+            for location in district_data.get('locations', []):
+                samples.append((location.get('name', ''), location.get('address', ''),
+                                district_key, str(location.get('number', ''))))
+    rows = []
+    keys = []
+    for copy in range(scale):
+        suffix = f"-{copy}" if copy else ''
+        for name, address, district_key, number in samples:
+            address = f"{address}{suffix}"
+            rows.append((f"{name}{suffix}", address, address.translate(TO_FULLWIDTH_TABLE)))
+            heading = f"第{district_key}{copy or ''}投票区".translate(TO_FULLWIDTH_TABLE)
+            keys.append((heading, f"{district_key}{copy or ''}", number))
+    return rows, keys
+
+
+def display_width(text):
+    """端末での表示幅（全角文字は2）"""
+    return sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in text)
+
+
+def pad(text, width):
+    return text + ' ' * max(width - display_width(text), 0)
+
+
+def measure(function, values):
+    """全ての値を変換して処理時間を返す"""
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return time.perf_counter() - start
+
+
+def compare(title, values, baselines, current):
+    """変更前の実装と現在の実装の1行あたりの処理時間を表示（結果が同じことも確認する）"""
+    print(f"\n=== {title} ===")
+    current_label, current_function = current
+    expected = [current_function(value) for value in values]
+    current_ns = measure(current_function, values) / len(values) * 1e9
+    for label, function in baselines:
+        if [function(value) for value in values] != expected:
+            raise SystemExit(f"エラー: {label} と {current_label} の結果が異なります")
+        baseline_ns = measure(function, values) / len(values) * 1e9
+        print(f"  {pad(label, 34)} {baseline_ns:7.0f}ナノ秒 (現在の {baseline_ns / current_ns:.1f}倍)")
+    print(f"  {pad(current_label, 34)} {current_ns:7.0f}ナノ秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文字列正規化のベンチマーク')
+    parser.add_argument('--scale', type=int, default=10, help='サンプルの行を複製する倍率')
+    args = parser.parse_args()
+
+    rows, keys = load_rows(args.scale)
+    print(f"行数: {len(rows)}件（全て異なる文字列）")
+
+    digit_baselines = [
+        ('変更前: replace を10回', baseline_convert_to_halfwidth),
+        ('変更前: 呼び出しごとに maketrans', baseline_translate_per_call),
+    ]
+    current_digits = ('現在: to_halfwidth_digits', text_normalize.to_halfwidth_digits)
+    compare('全角数字の変換（投票区の見出し）', [key[0] for key in keys], digit_baselines, current_digits)
+    compare('全角数字の変換（投票区・番号のキー）', [value for key in keys for value in key[1:]],
+            digit_baselines, current_digits)
+
+    names = [row[0] for row in rows]
+    compare('名称の改行除去', names, [
+        ('変更前: 直接 replace', baseline_strip_name),
+    ], ('現在: strip_line_breaks', text_normalize.strip_line_breaks))
+
+    print(f"\n=== 住所の照合キー（normalize_address、キャッシュの上限 {text_normalize.NORMALIZE_CACHE_SIZE}種類） ===")
+    normalizer = text_normalize.normalize_address
+    for label, column in (('住所', 1), ('住所（全角表記）', 2)):
+        values = [row[column] for row in rows]
+
+        def per_row(elapsed):
+            return elapsed / len(values) * 1e9
+
+        uncached_elapsed = measure(normalizer.__wrapped__, values)
+        normalizer.cache_clear()
+        cold_elapsed = measure(normalizer, values)
+        cold_info = normalizer.cache_info()
+        warm_elapsed = measure(normalizer, values)
+        warm_hits = normalizer.cache_info().hits - cold_info.hits
+
+        print(f"{label}:")
+        print(f"  {pad('キャッシュなし', 34)} {per_row(uncached_elapsed):7.0f}ナノ秒")
+        print(f"  {pad('キャッシュ付き（初回）', 34)} {per_row(cold_elapsed):7.0f}ナノ秒 "
+              f"(ヒット率 {cold_info.hits / len(values):.0%})")
+        print(f"  {pad('キャッシュ付き（2回目）', 34)} {per_row(warm_elapsed):7.0f}ナノ秒 "
+              f"(ヒット率 {warm_hits / len(values):.0%})")
+
+
+if __name__ == "__main__":
+    main()
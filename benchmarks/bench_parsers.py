@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+掲示場所一覧のパーサーのベンチマークと回帰確認
+
+作成済みのCSV（golden）の掲示場所から、各市区町村のPDF抽出テキストと同じレイアウトの
+テキストを生成し、指定倍率（投票区を複製）でパーサーに解析させる。
+
+    吹田市:   「第N投票区」「番号 設 置 場 所」の設置場所と「所 在 地」の住所が別セクション
+              （投票区101-103は「番号 設置場所 住所」の行形式）
+    茨木市:   「通し番号 投票区 番号 設置場所 設置説明」の空白区切りの表
+    箕面市:   「番号 住所 備考」の行（番号が1に戻ると次の投票区）
+    西淀川区: 「N.投票区名」の行の後に「備考 住所」の行
+
+1倍の解析結果は作成済みのCSVと、複製したデータの解析結果は複製元から求めた期待値と比較し、
+パーサーごとの処理速度（件/秒）を表示する。一致しない場合は終了コード1で終了する。
+
+使い方:
+    python benchmarks/bench_parsers.py                    # 1倍・10倍・100倍
+    python benchmarks/bench_parsers.py suita --scales 1 1000
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from list_parsing.engine import city_dir, discover_cities, load_layout, parse_city  # noqa: E402
+
+DEFAULT_SCALES = (1, 10, 100)
+
+TO_FULLWIDTH_TABLE = str.maketrans('0123456789', '０１２３４５６７８９')
+
+# 吹田市の1ページに載る投票区の数
+SUITA_DISTRICTS_PER_PAGE = 4
+
+
+def golden_path(layout):
+    return os.path.normpath(os.path.join(city_dir(layout.city_key), layout.golden_file or layout.output_file))
+
+
+def load_golden(layout):
+    """作成済みのCSVを読み込む（ヘッダーを除く行のリスト）"""
+    with open(golden_path(layout), 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.reader(f))
+    return rows[1:]
+
+
+def strip_prefix(address, prefix):
+    return address[len(prefix):] if address.startswith(prefix) else address
+
+
+def group_by_district(rows, district_column):
+    """投票区ごとに行をまとめる（出現順）"""
+    districts = {}
+    for row in rows:
+        districts.setdefault(row[district_column], []).append(row)
+    return list(districts.items())
+
+
+def generate_minoo(layout, rows, scale):
+    """
+    箕面市: 「番号 住所 備考」の行
+
+    Returns:
+        tuple: ({ファイル名: テキスト}, 期待する LocationRecord のリスト)
+    """
+    districts = group_by_district(rows, 0)
+    lines = ['ポスター掲示場設置場所一覧表', '令和7年6月26日現在', '投票区 番号']
+    expected = []
+    for copy_index in range(scale):
+        for district_index, (_, district_rows) in enumerate(districts, 1):
+            district = copy_index * len(districts) + district_index
+            for _, number, address, remark, _ in district_rows:
+                address = strip_prefix(address, layout.address_prefix)
+                lines.append(f"{number} {address} {remark}".rstrip())
+                expected.append(layout.make_record(district, int(number), address, remark))
+    return {'text.txt': '\n'.join(lines) + '\n'}, expected
+
+
+def generate_ibaraki(layout, rows, scale):
+    """茨木市: 「通し番号 投票区 番号 設置場所 設置説明」の表"""
+    max_serial = max(int(row[0]) for row in rows)
+    max_district = max(int(row[1]) for row in rows)
+    lines = ['通し番号 投票区 番号 設置場所 設置説明']
+    expected = []
+    for copy_index in range(scale):
+        for serial, district, number, _, address, remark in rows:
+            serial = str(copy_index * max_serial + int(serial))
+            district = str(copy_index * max_district + int(district))
+            address = strip_prefix(address, layout.address_prefix)
+            lines.append(f"{serial} {district} {number} {address} {remark}")
+            expected.append(layout.make_record(district, number, address, remark, serial=serial))
+    return {'text.txt': '\n'.join(lines) + '\n'}, expected
+
+
+def generate_nishiyodogawa(layout, rows, scale):
+    """西淀川区: 「N.投票区名」の後に「備考 住所」の行"""
+    districts = group_by_district(rows, 0)
+    max_district = max(int(district) for district, _ in districts)
+    lines = []
+    expected = []
+    for copy_index in range(scale):
+        for district, district_rows in districts:
+            district = str(copy_index * max_district + int(district))
+            lines.append(f"{district}.第{district}投票区")
+            for _, number, address, remark, _ in district_rows:
+                address = strip_prefix(address, layout.address_prefix)
+                lines.append(f"{remark} {address}")
+                expected.append(layout.make_record(district, int(number), address, remark))
+    return {'text.txt': '\n'.join(lines) + '\n'}, expected
+
+
+def generate_suita(layout, rows, scale):
+    """
+    吹田市: 投票区101-103は行形式（text copy.txt）、104以降はセクション形式（text.txt）
+
+    セクション形式は1ページに4投票区分の設置場所を並べ、その後に同じ順で所在地を並べる。
+    """
+    districts = group_by_district(rows, 0)
+    line_lines = []
+    section_districts = []
+    expected = []
+    for copy_index in range(scale):
+        for district, district_rows in districts:
+            district = str(copy_index * 1000 + int(district))
+            entries = [(number, strip_prefix(address, layout.address_prefix), remark)
+                       for _, number, address, remark, _ in district_rows]
+            if int(district_rows[0][0]) <= 103:
+                line_lines.append(f"第{district.translate(TO_FULLWIDTH_TABLE)}投票区")
+                line_lines.append('番号 設 置 場 所 所 在 地')
+                for number, address, remark in entries:
+                    line_lines.append(f"{number} {remark} {address}")
+                    expected.append(layout.make_record(district, number, address, remark))
+            else:
+                section_districts.append((district, entries))
+                for number, address, remark in entries:
+                    expected.append(layout.make_record(district, int(number), address, remark))
+
+    section_lines = []
+    for page, start in enumerate(range(0, len(section_districts), SUITA_DISTRICTS_PER_PAGE), 1):
+        page_districts = section_districts[start:start + SUITA_DISTRICTS_PER_PAGE]
+        section_lines.append(f"第{page_districts[0][0].translate(TO_FULLWIDTH_TABLE)}投票区")
+        for index, (_, entries) in enumerate(page_districts):
+            items = ' '.join(f"{number} {remark}" for number, _, remark in entries)
+            if index + 1 < len(page_districts):
+                next_district = page_districts[index + 1][0].translate(TO_FULLWIDTH_TABLE)
+                section_lines.append(f"番号 設 置 場 所 {items} 第{next_district}投票区")
+            else:
+                section_lines.append(f"番号 設 置 場 所 {items} {page}")
+        for _, entries in page_districts:
+            section_lines.append('所 在 地')
+            section_lines.extend(address for _, address, _ in entries)
+
+    files = {
+        'text copy.txt': '\n'.join(line_lines) + '\n',
+        'text.txt': '\n'.join(section_lines) + '\n',
+    }
+    return files, layout.finalize(expected)
+
+
+GENERATORS = {
+    'ibaraki': generate_ibaraki,
+    'minoo': generate_minoo,
+    'nishiyodogawa': generate_nishiyodogawa,
+    'suita': generate_suita,
+}
+
+
+def to_rows(layout, records):
+    """CSVに書き出すときと同じ文字列の行に変換"""
+    return [[str(value) for value in layout.to_row(record)] for record in records]
+
+
+def run_benchmark(city_key, scale, golden_rows):
+    """
+    生成したテキストを解析して期待値と比較する
+
+    Returns:
+        tuple: (一致したか, 件数, 解析時間（秒）, 最初に異なった行の説明)
+    """
+    layout = load_layout(city_key)
+    files, expected_records = GENERATORS[city_key](layout, golden_rows, scale)
+    # 1倍は作成済みのCSVそのもの、複製は複製元から求めた期待値と比較する
+    expected = golden_rows if scale == 1 else to_rows(layout, expected_records)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_name, text in files.items():
+            with open(os.path.join(tmp_dir, file_name), 'w', encoding='utf-8') as f:
+                f.write(text)
+        # 解析中の進捗表示は計測結果に不要なため抑止する
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            records = parse_city(layout, base_dir=tmp_dir)
+            elapsed = time.perf_counter() - start
+
+    actual = to_rows(layout, records)
+    if actual == expected:
+        return True, len(actual), elapsed, None
+    for index, (actual_row, expected_row) in enumerate(zip(actual, expected)):
+        if actual_row != expected_row:
+            return False, len(actual), elapsed, f"{index + 1}行目: {actual_row} (期待値 {expected_row})"
+    return False, len(actual), elapsed, f"件数: {len(actual)}件 (期待値 {len(expected)}件)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='掲示場所一覧のパーサーのベンチマークと回帰確認')
+    parser.add_argument('cities', nargs='*', help='対象の市区町村（省略時は全て）')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help='投票区を複製する倍率（既定: 1 10 100）')
+    args = parser.parse_args()
+
+    cities = args.cities or [city_key for city_key in discover_cities() if city_key in GENERATORS]
+    failures = []
+
+    print(f"{'市区町村':<14} {'倍率':>5} {'件数':>8} {'時間(秒)':>9} {'件/秒':>10}  結果")
+    for city_key in cities:
+        golden_rows = load_golden(load_layout(city_key))
+        for scale in args.scales:
+            ok, count, elapsed, difference = run_benchmark(city_key, scale, golden_rows)
+            throughput = count / elapsed if elapsed else 0
+            status = "一致" if ok else "不一致"
+            print(f"{city_key:<14} {scale:>4}倍 {count:>8} {elapsed:>9.3f} {throughput:>10,.0f}  {status}")
+            if not ok:
+                failures.append((city_key, scale, difference))
+
+    if failures:
+        print("\n=== 不一致 ===")
+        for city_key, scale, difference in failures:
+            print(f"  {city_key} {scale}倍: {difference}")
+        sys.exit(1)
+    print("\n全ての解析結果が期待値と一致しました")
+
+
+if __name__ == "__main__":
+    main()
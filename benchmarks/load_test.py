@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ポスターAPIの負荷試験（asyncio）
+
+投票日の朝に大勢のボランティアが一斉にアプリを開いた状況を、エクスポートJSONから
+作った操作で再現し、エンドポイントごとの応答時間（パーセンタイル）と処理件数を表示する。
+
+利用者ごとの操作はアプリ（App.js・VotingDistrict.js）と同じ要求にしている:
+    - 起動時と30秒ごとの自動更新: 全市区町村の GET /api/states/:city を同時に送る
+    - 掲示場所のチェック: POST /api/states/check
+    - 投票区の一括チェック: 投票区全体と全掲示場所の POST /api/states/check を同時に送る
+    - コメントの追加: 既存のコメントに1件加えた配列を POST /api/states/memo
+    - 進捗の確認: GET /api/stats/:city
+
+各利用者の担当の投票区は、エクスポートの掲示場所を等しい確率で選ぶ（掲示場所の多い
+市区町村・投票区ほど担当者が多い）。利用者は --ramp 秒の間に順に開始し、
+操作の間隔は平均 --think 秒の指数分布とする。利用者ごとにブラウザと同じく
+最大6本の keep-alive 接続を使う。
+
+使い方:
+    # 代替サーバー（stand_in_server.py）を起動して試験
+    python benchmarks/load_test.py poster-data-export-2025-07-10.json --stand-in load_test.db --users 200 --duration 60
+
+    # 起動済みのサーバーに対して試験
+    python benchmarks/load_test.py poster-data-export-2025-07-10.json --url http://localhost:5000 --users 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import unicodedata
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from api_client import APIClient, APIError  # noqa: E402
+from export_stream import open_export  # noqa: E402
+from poster_db import now_iso  # noqa: E402
+
+# アプリが状態を読み込む市区町村
+APP_CITIES = ('suita', 'ibaraki', 'nishiyodogawa', 'minoo')
+
+# アプリの自動更新の間隔（秒）
+REFRESH_INTERVAL = 30
+
+# ブラウザの1ホストあたりの同時接続数
+BROWSER_CONNECTIONS = 6
+
+# 操作 → 選ばれる重み
+ACTION_WEIGHTS = {
+    'check': 60,
+    'memo': 15,
+    'reload': 15,
+    'stats': 8,
+    'district_check': 2,
+}
+
+COMMENT_TEXTS = ('貼付完了', '掲示板が破損しています', '雨のため明日再訪', '前回のポスターが残っていました', '場所が分かりにくい')
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Location:
+    """試験中に利用者が変更する掲示場所の状態"""
+
+    __slots__ = ('city', 'district', 'number', 'checked', 'comments')
+
+    def __init__(self, city, district, number, checked, comments):
+        self.city = city
+        self.district = district
+        self.number = number
+        self.checked = checked
+        self.comments = comments
+
+
+def load_locations(json_file_path):
+    """
+    エクスポートから掲示場所と投票区の一覧を作る
+
+    Returns:
+        tuple: (掲示場所のリスト, (市キー, 投票区) → 掲示場所のリスト)
+    """
+    locations = []
+    districts = {}
+    with open_export(json_file_path, streaming=True) as export:
+        for city_key, _, district_key, district_data in export.iter_districts():
+            members = districts.setdefault((city_key, district_key), [])
+            for item in district_data.get('locations', []):
+                comments = item.get('comments')
+                location = Location(city_key, district_key, str(item.get('number', '')),
+                                    bool(item.get('isChecked')), list(comments) if isinstance(comments, list) else [])
+                locations.append(location)
+                members.append(location)
+    return locations, districts
+
+
+class LoadStats:
+    """エンドポイントごとの応答時間（ミリ秒）と失敗の件数"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, milliseconds, ok):
+        self.latencies.setdefault(endpoint, []).append(milliseconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, elapsed):
+        """エンドポイントごとの件数・失敗・件/秒・パーセンタイル"""
+        rows = {}
+        everything = []
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            everything.extend(values)
+            rows[endpoint] = _summarize(values, self.errors.get(endpoint, 0), elapsed)
+        everything.sort()
+        rows['合計'] = _summarize(everything, sum(self.errors.values()), elapsed)
+        return rows
+
+
+def percentile(sorted_values, p):
+    """最近順位法のパーセンタイル"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _summarize(values, errors, elapsed):
+    row = {
+        'requests': len(values),
+        'errors': errors,
+        'rps': len(values) / elapsed if elapsed else 0.0,
+    }
+    for p in PERCENTILES:
+        row[f'p{p}'] = percentile(values, p)
+    row['max'] = values[-1] if values else 0.0
+    return row
+
+
+class VirtualUser:
+    """1人のボランティア（ブラウザ1つ）"""
+
+    def __init__(self, client, stats, rng, home, districts, think_seconds):
+        self.client = client
+        self.stats = stats
+        self.rng = rng
+        self.city, self.district = home
+        self.locations = districts[home]
+        self.think_seconds = think_seconds
+
+    async def call(self, endpoint, method, path, payload=None):
+        start = time.perf_counter()
+        try:
+            status, _ = await self.client.request(method, path, payload)
+            ok = 200 <= status < 300
+        except (APIError, OSError, asyncio.TimeoutError):
+            ok = False
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, ok)
+
+    async def reload(self):
+        """アプリの起動・自動更新と同じく全市区町村の状態を同時に読み込む"""
+        await asyncio.gather(*(self.call('GET /api/states/:city', 'GET', f'/api/states/{city}')
+                               for city in APP_CITIES))
+
+    async def check(self):
+        location = self.rng.choice(self.locations)
+        location.checked = not location.checked
+        await self.call('POST /api/states/check', 'POST', '/api/states/check', {
+            'city': self.city, 'districtId': self.district, 'locationId': location.number,
+            'isChecked': location.checked,
+        })
+
+    async def district_check(self):
+        should_check = not all(location.checked for location in self.locations)
+        requests = [self.call('POST /api/states/check', 'POST', '/api/states/check', {
+            'city': self.city, 'districtId': self.district, 'locationId': None, 'isChecked': should_check,
+        })]
+        for location in self.locations:
+            location.checked = should_check
+            requests.append(self.call('POST /api/states/check', 'POST', '/api/states/check', {
+                'city': self.city, 'districtId': self.district, 'locationId': location.number,
+                'isChecked': should_check,
+            }))
+        await asyncio.gather(*requests)
+
+    async def memo(self):
+        location = self.rng.choice(self.locations)
+        location.comments.append({
+            'id': str(int(time.time() * 1000)),
+            'text': self.rng.choice(COMMENT_TEXTS),
+            'timestamp': now_iso(),
+        })
+        await self.call('POST /api/states/memo', 'POST', '/api/states/memo', {
+            'city': self.city, 'districtId': self.district, 'locationId': location.number,
+            'memo': location.comments,
+        })
+
+    async def stats_view(self):
+        await self.call('GET /api/stats/:city', 'GET', f'/api/stats/{self.city}')
+
+    async def run(self, start_delay, deadline):
+        await asyncio.sleep(start_delay)
+        if time.monotonic() >= deadline:
+            return
+        await self.reload()
+        next_refresh = time.monotonic() + REFRESH_INTERVAL
+        actions = {
+            'check': self.check, 'memo': self.memo, 'reload': self.reload,
+            'stats': self.stats_view, 'district_check': self.district_check,
+        }
+        names = list(ACTION_WEIGHTS)
+        weights = [ACTION_WEIGHTS[name] for name in names]
+        while True:
+            wait = self.rng.expovariate(1 / self.think_seconds) if self.think_seconds > 0 else 0
+            now = time.monotonic()
+            if now + wait >= deadline:
+                break
+            await asyncio.sleep(wait)
+            if time.monotonic() >= next_refresh:
+                next_refresh = time.monotonic() + REFRESH_INTERVAL
+                await self.reload()
+            await actions[self.rng.choices(names, weights)[0]]()
+
+
+async def run_load_test(url, locations, districts, users, duration, ramp, think_seconds, seed=None):
+    """
+    負荷試験を実行する
+
+    Returns:
+        tuple: (LoadStats, 経過秒数, 開いた接続の数)
+    """
+    rng = random.Random(seed)
+    stats = LoadStats()
+    clients = [APIClient(url, pool_size=BROWSER_CONNECTIONS) for _ in range(users)]
+    start = time.monotonic()
+    deadline = start + duration
+    tasks = []
+    for index, client in enumerate(clients):
+        home = rng.choice(locations)
+        user = VirtualUser(client, stats, random.Random(rng.random()), (home.city, home.district),
+                           districts, think_seconds)
+        delay = ramp * index / users if users else 0
+        tasks.append(asyncio.ensure_future(user.run(delay, deadline)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for client in clients:
+            await client.close()
+    elapsed = time.monotonic() - start
+    return stats, elapsed, sum(client.connections_opened for client in clients)
+
+
+def start_stand_in(db_path, json_file_path):
+    """代替サーバーを空いているポートで起動し、(プロセス, URL) を返す"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT_DIR, 'stand_in_server.py'), '--db', db_path,
+         '--seed', json_file_path, '--port', '0'],
+        stdout=subprocess.PIPE, text=True, encoding='utf-8', cwd=ROOT_DIR)
+    for line in process.stdout:
+        if line.startswith('起動しました: '):
+            return process, line.split(': ', 1)[1].strip()
+    process.wait()
+    raise RuntimeError("代替サーバーを起動できませんでした")
+
+
+def _pad(text, width, left=False):
+    """全角文字を2桁として幅を揃える"""
+    space = ' ' * max(0, width - sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text))
+    return text + space if left else space + text
+
+
+def print_summary(summary):
+    columns = [('件数', 8), ('失敗', 6), ('件/秒', 9)] + [(f'p{p}', 9) for p in PERCENTILES] + [('最大', 9)]
+    print(_pad('エンドポイント', 28, left=True) + ''.join(_pad(name, width) for name, width in columns)
+          + '  (ミリ秒)')
+    for endpoint, row in summary.items():
+        values = [str(row['requests']), str(row['errors']), f"{row['rps']:.1f}"]
+        values += [f"{row[f'p{p}']:.1f}" for p in PERCENTILES] + [f"{row['max']:.1f}"]
+        print(_pad(endpoint, 28, left=True)
+              + ''.join(_pad(value, width) for value, (_, width) in zip(values, columns)))
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='ポスターAPIの負荷試験')
+    parser.add_argument('json_file', help='操作の元にするエクスポートJSON')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='試験するサーバーのURL（例: http://localhost:5000）')
+    target.add_argument('--stand-in', metavar='DB', help='代替サーバーをこのSQLiteファイルで起動して試験')
+    parser.add_argument('--users', type=int, default=200, help='同時に操作する利用者の数')
+    parser.add_argument('--duration', type=float, default=60, help='試験の秒数')
+    parser.add_argument('--ramp', type=float, default=10, help='全員が開始するまでの秒数')
+    parser.add_argument('--think', type=float, default=5, help='操作の平均間隔（秒、0で待たずに連続）')
+    parser.add_argument('--random-seed', type=int, help='操作の乱数の種（同じ操作を再現する）')
+    parser.add_argument('--json', help='結果をJSONで保存するパス')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.json_file):
+        print(f"エラー: 指定されたJSONファイルが見つかりません: {args.json_file}")
+        sys.exit(1)
+
+    locations, districts = load_locations(args.json_file)
+    if not locations:
+        print("エラー: エクスポートに掲示場所がありません")
+        sys.exit(1)
+
+    process = None
+    url = args.url
+    try:
+        if args.stand_in:
+            process, url = start_stand_in(args.stand_in, args.json_file)
+            print(f"代替サーバー: {url}")
+        print(f"利用者: {args.users}人 / {args.duration:g}秒（開始まで {args.ramp:g}秒、操作間隔 平均{args.think:g}秒）")
+        stats, elapsed, connections = asyncio.run(run_load_test(
+            url, locations, districts, args.users, args.duration, args.ramp, args.think, args.random_seed))
+    except (RuntimeError, ValueError) as e:
+        print(f"エラー: {e}")
+        sys.exit(1)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    summary = stats.summary(elapsed)
+    print(f"経過時間: {elapsed:.1f}秒 / 接続数: {connections}\n")
+    print_summary(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'users': args.users, 'seconds': elapsed, 'endpoints': summary},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n結果を保存しました: {args.json}")
+    if summary['合計']['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
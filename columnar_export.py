@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ポスター貼り付けデータのエクスポートJSONを列指向形式に変換するモジュール
+
+CSVのように文字列として読み直す必要がないよう、列ごとに型付きの
+バイナリファイルへ書き出す（Arrowの固定長配列・可変長文字列と同じ考え方）。
+
+    出力ディレクトリ/
+        manifest.json        行数・列の型・エンディアンなど
+        city.codes           市名の辞書番号 (uint16)      + city.dict.json
+        district.codes       投票区番号の辞書番号 (uint32) + district.dict.json
+        is_checked.values    チェック状態 (int8, 0/1)
+        last_updated.values  最終更新日時 (int64, UNIXエポックミリ秒, NULLは最小値)
+        name.offsets / name.data   文字列 (int64のオフセット + UTF-8)
+        ...
+
+必要な列だけを読み込めるよう、読み込み側は read_columns(列名のリスト) を使う。
+
+変換中のファイルは出力ディレクトリ内の一時ディレクトリに書き、全ての列が揃ってから
+manifest.json を最後にして置き換えるため、途中で失敗しても以前の出力はそのまま残る。
+"""
+
+import argparse
+import calendar
+import json
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from convert_json_to_csv import DATETIME_CACHE_SIZE, FAST_ISO_PATTERN
+from export_stream import open_export
+from text_normalize import strip_line_breaks
+
+FORMAT_NAME = 'poster-columnar'
+FORMAT_VERSION = 1
+
+# 日時列のNULLを表す値
+NULL_TIMESTAMP = -(2 ** 63)
+
+# この行数ごとに各列のバッファをファイルへ書き出す
+ROW_GROUP_SIZE = 65536
+
+# 列名と型（出力順）
+COLUMNS = [
+    ('city', 'dictionary'),
+    ('city_key', 'dictionary'),
+    ('district', 'dictionary'),
+    ('number', 'string'),
+    ('name', 'string'),
+    ('address', 'string'),
+    ('remark', 'string'),
+    ('is_checked', 'bool'),
+    ('last_updated', 'timestamp'),
+    ('comment_count', 'int32'),
+    ('comments', 'string'),
+    ('district_is_checked', 'bool'),
+    ('district_last_updated', 'timestamp'),
+    ('district_comments', 'string'),
+]
+
+# 型ごとの array の型コード
+_TYPECODES = {
+    'bool': 'b',
+    'int32': 'i',
+    'timestamp': 'q',
+    'offsets': 'q',
+}
+_DICTIONARY_TYPECODES = {'city': 'H', 'city_key': 'H', 'district': 'I'}
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def iso_to_epoch_ms(iso_string):
+    """ISO形式の日時をUNIXエポックミリ秒に変換（解析できない場合はNULL値）"""
+    if FAST_ISO_PATTERN.match(iso_string):
+        seconds = calendar.timegm((
+            int(iso_string[0:4]), int(iso_string[5:7]), int(iso_string[8:10]),
+            int(iso_string[11:13]), int(iso_string[14:16]), int(iso_string[17:19]),
+        ))
+        return seconds * 1000 + int(iso_string[20:23])
+
+    try:
+        dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
+    except ValueError:
+        return NULL_TIMESTAMP
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def _to_epoch_ms(value):
+    if not value or not isinstance(value, str):
+        return NULL_TIMESTAMP
+    return iso_to_epoch_ms(value)
+
+
+def epoch_ms_to_datetime(value):
+    """エポックミリ秒をUTCのdatetimeに戻す（NULL値はNone）"""
+    if value == NULL_TIMESTAMP:
+        return None
+    return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+
+def _comments_json(comments):
+    return json.dumps(comments or [], ensure_ascii=False, separators=(',', ':'))
+
+
+class _FixedColumnWriter:
+    """固定長の値を持つ列の書き込み"""
+
+    def __init__(self, output_dir, name, typecode):
+        self.file_name = f'{name}.values'
+        self._file = open(os.path.join(output_dir, self.file_name), 'wb')
+        self._buffer = array(typecode)
+        self.typecode = typecode
+
+    def append(self, value):
+        self._buffer.append(value)
+
+    def flush(self):
+        self._buffer.tofile(self._file)
+        del self._buffer[:]
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def describe(self, column_type):
+        return {'type': column_type, 'typecode': self.typecode, 'files': [self.file_name]}
+
+
+class _DictionaryColumnWriter:
+    """値を辞書番号に置き換えて保存する列の書き込み"""
+
+    def __init__(self, output_dir, name, typecode):
+        self._output_dir = output_dir
+        self._name = name
+        self.file_name = f'{name}.codes'
+        self.dict_file_name = f'{name}.dict.json'
+        self._file = open(os.path.join(output_dir, self.file_name), 'wb')
+        self._buffer = array(typecode)
+        self._codes = {}
+        self._values = []
+        self.typecode = typecode
+
+    def append(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        self._buffer.append(code)
+
+    def flush(self):
+        self._buffer.tofile(self._file)
+        del self._buffer[:]
+
+    def close(self):
+        self.flush()
+        self._file.close()
+        with open(os.path.join(self._output_dir, self.dict_file_name), 'w', encoding='utf-8') as f:
+            json.dump(self._values, f, ensure_ascii=False)
+
+    def describe(self, column_type):
+        return {
+            'type': column_type,
+            'typecode': self.typecode,
+            'files': [self.file_name, self.dict_file_name],
+            'dictionary_size': len(self._values),
+        }
+
+
+class _StringColumnWriter:
+    """可変長文字列の列の書き込み（オフセット配列 + UTF-8データ）"""
+
+    def __init__(self, output_dir, name):
+        self.offsets_file_name = f'{name}.offsets'
+        self.data_file_name = f'{name}.data'
+        self._offsets_file = open(os.path.join(output_dir, self.offsets_file_name), 'wb')
+        self._data_file = open(os.path.join(output_dir, self.data_file_name), 'wb')
+        self._offsets = array(_TYPECODES['offsets'], [0])
+        self._data = bytearray()
+        self._position = 0
+
+    def append(self, value):
+        encoded = (value or '').encode('utf-8')
+        self._data += encoded
+        self._position += len(encoded)
+        self._offsets.append(self._position)
+
+    def flush(self):
+        self._offsets.tofile(self._offsets_file)
+        del self._offsets[:]
+        self._data_file.write(self._data)
+        self._data.clear()
+
+    def close(self):
+        self.flush()
+        self._offsets_file.close()
+        self._data_file.close()
+
+    def describe(self, column_type):
+        return {
+            'type': column_type,
+            'typecode': _TYPECODES['offsets'],
+            'files': [self.offsets_file_name, self.data_file_name],
+        }
+
+
+def _create_writer(output_dir, name, column_type):
+    if column_type == 'dictionary':
+        return _DictionaryColumnWriter(output_dir, name, _DICTIONARY_TYPECODES[name])
+    if column_type == 'string':
+        return _StringColumnWriter(output_dir, name)
+    return _FixedColumnWriter(output_dir, name, _TYPECODES[column_type])
+
+
+def _write_columns(json_file_path, output_dir, streaming):
+    """
+    エクスポートJSONの全ての列と manifest.json を output_dir に書き出す
+
+    Returns:
+        int: 行数（変換できなかった場合は None）
+    """
+    writers = {name: _create_writer(output_dir, name, column_type) for name, column_type in COLUMNS}
+    row_count = 0
+
+    try:
+        with open_export(json_file_path, streaming=streaming) as export:
+            for city_key, city_name, district_key, district_data in export.iter_districts():
+                district_comments = district_data.get('districtComments', {})
+                district_checked = 1 if district_comments.get('isChecked', False) else 0
+                district_last_updated = _to_epoch_ms(district_comments.get('lastUpdated'))
+                district_comment_json = _comments_json(district_comments.get('comments'))
+
+                for location in district_data.get('locations', []):
+                    comments = location.get('comments') or []
+                    writers['city'].append(city_name)
+                    writers['city_key'].append(city_key)
+                    writers['district'].append(district_key)
+                    writers['number'].append(str(location.get('number', '')))
+                    writers['name'].append(strip_line_breaks(location.get('name', '')))
+                    writers['address'].append(location.get('address', ''))
+                    writers['remark'].append(location.get('remark', ''))
+                    writers['is_checked'].append(1 if location.get('isChecked', False) else 0)
+                    writers['last_updated'].append(_to_epoch_ms(location.get('lastUpdated')))
+                    writers['comment_count'].append(len(comments))
+                    writers['comments'].append(_comments_json(comments))
+                    writers['district_is_checked'].append(district_checked)
+                    writers['district_last_updated'].append(district_last_updated)
+                    writers['district_comments'].append(district_comment_json)
+
+                    row_count += 1
+                    if row_count % ROW_GROUP_SIZE == 0:
+                        for writer in writers.values():
+                            writer.flush()
+            export_timestamp = export.timestamp
+    except FileNotFoundError:
+        print(f"エラー: ファイル '{json_file_path}' が見つかりません。")
+        return None
+    except json.JSONDecodeError:
+        print(f"エラー: ファイル '{json_file_path}' のJSON形式が不正です。")
+        return None
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    manifest = {
+        'format': FORMAT_NAME,
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'row_count': row_count,
+        'export_timestamp': export_timestamp,
+        'export_timestamp_ms': _to_epoch_ms(export_timestamp),
+        'null_timestamp': NULL_TIMESTAMP,
+        'columns': {
+            name: writers[name].describe(column_type) for name, column_type in COLUMNS
+        },
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return row_count
+
+
+def _replace_files(source_dir, output_dir):
+    """
+    source_dir の全ファイルを output_dir へ移す
+
+    読み込み側が新旧の列を混ぜて読まないよう、先に以前の manifest.json を削除し、
+    新しい manifest.json は最後に移す。
+    """
+    old_manifest = os.path.join(output_dir, 'manifest.json')
+    if os.path.exists(old_manifest):
+        os.remove(old_manifest)
+    file_names = sorted(os.listdir(source_dir), key=lambda file_name: file_name == 'manifest.json')
+    for file_name in file_names:
+        os.replace(os.path.join(source_dir, file_name), os.path.join(output_dir, file_name))
+
+
+def convert_json_to_columnar(json_file_path, output_dir=None, streaming=False):
+    """
+    エクスポートJSONを列指向形式のディレクトリに変換
+
+    Returns:
+        bool: 変換に成功した場合 True
+    """
+    # 出力ディレクトリ名を自動生成
+    if output_dir is None:
+        base_name = os.path.splitext(os.path.basename(json_file_path))[0]
+        output_dir = f"{base_name}.columnar"
+
+    created = not os.path.isdir(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    row_count = None
+    # 置き換えが同じファイルシステム内の名前の変更で済むよう、一時ディレクトリは出力ディレクトリ内に作る
+    temp_dir = tempfile.mkdtemp(prefix='.columnar-', dir=output_dir)
+    try:
+        row_count = _write_columns(json_file_path, temp_dir, streaming)
+        if row_count is not None:
+            _replace_files(temp_dir, output_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if created and row_count is None:
+            shutil.rmtree(output_dir, ignore_errors=True)
+    if row_count is None:
+        return False
+
+    print(f"変換完了: {output_dir}/")
+    print(f"総レコード数: {row_count}行")
+    return True
+
+
+def read_manifest(columnar_dir):
+    """manifest.json を読み込む"""
+    with open(os.path.join(columnar_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_NAME:
+        raise ValueError(f"列指向形式のディレクトリではありません: {columnar_dir}")
+    return manifest
+
+
+def _read_array(path, typecode, byteorder):
+    values = array(typecode)
+    with open(path, 'rb') as f:
+        values.frombytes(f.read())
+    if byteorder != sys.byteorder:
+        values.byteswap()
+    return values
+
+
+def read_column(columnar_dir, name, manifest=None, decode=True):
+    """
+    1つの列を読み込む
+
+    Args:
+        decode (bool): False の場合、辞書列は (辞書番号の配列, 辞書) を返す
+
+    Returns:
+        固定長の列は array、文字列・辞書列は list
+    """
+    if manifest is None:
+        manifest = read_manifest(columnar_dir)
+    column = manifest['columns'][name]
+    byteorder = manifest['byteorder']
+    files = [os.path.join(columnar_dir, file_name) for file_name in column['files']]
+
+    if column['type'] == 'dictionary':
+        codes = _read_array(files[0], column['typecode'], byteorder)
+        with open(files[1], 'r', encoding='utf-8') as f:
+            dictionary = json.load(f)
+        if not decode:
+            return codes, dictionary
+        return [dictionary[code] for code in codes]
+
+    if column['type'] == 'string':
+        offsets = _read_array(files[0], column['typecode'], byteorder)
+        with open(files[1], 'rb') as f:
+            data = f.read()
+        return [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+
+    return _read_array(files[0], column['typecode'], byteorder)
+
+
+def read_columns(columnar_dir, columns=None, decode=True):
+    """
+    指定した列だけを読み込む
+
+    Returns:
+        dict: 列名 → 値
+    """
+    manifest = read_manifest(columnar_dir)
+    if columns is None:
+        columns = list(manifest['columns'])
+    return {name: read_column(columnar_dir, name, manifest, decode) for name in columns}
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='ポスター貼り付けデータのJSONを列指向形式に変換')
+    parser.add_argument('json_file', help='変換するJSONファイル')
+    parser.add_argument('-o', '--output', help='出力ディレクトリ')
+    parser.add_argument('--stream', action='store_true',
+                        help='投票区ごとに読み込みながら変換する（大きなエクスポート向け）')
+    args = parser.parse_args()
+
+    if convert_json_to_columnar(args.json_file, args.output, streaming=args.stream):
+        print("\n変換が正常に完了しました。")
+    else:
+        print("\n変換に失敗しました。")
+
+
+if __name__ == "__main__":
+    main()
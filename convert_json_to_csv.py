@@ -4,14 +4,42 @@
 参院選2025大阪府選挙ポスター貼り付けデータ JSON to CSV変換スクリプト
 """
 
+import argparse
 import json
 import csv
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
+
+from export_stream import open_export
+from text_normalize import strip_line_breaks
 
 # 変換するJSONファイルのパス（ここで指定）
 JSON_FILE_PATH = "data/poster-data-export-2025-07-05 (1).json"
 
+# 日時フォーマット結果をキャッシュする件数（同じ分の更新が多く繰り返し現れる）
+DATETIME_CACHE_SIZE = 65536
+
+# エクスポートが出力する固定形式 YYYY-MM-DDTHH:MM:SS.sssZ
+# 29日以降は月によって存在しない日付があるため通常の解析に回す
+FAST_ISO_PATTERN = re.compile(
+    r'\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])T(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d\.\d{3}Z\Z'
+)
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _format_iso_datetime(iso_string):
+    """ISO形式の日時を日本語形式に変換（解析できない場合はNone）"""
+    # 固定形式は文字列の切り出しだけで変換できる
+    if FAST_ISO_PATTERN.match(iso_string):
+        return f"{iso_string[0:4]}/{iso_string[5:7]}/{iso_string[8:10]} {iso_string[11:16]}"
+    
+    try:
+        dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
+        return dt.strftime('%Y/%m/%d %H:%M')
+    except ValueError:
+        return None
+
 def format_comments(comments):
     """コメントリストを文字列に変換"""
     if not comments:
@@ -21,14 +49,12 @@ def format_comments(comments):
     for comment in comments:
         # コメントの内容とタイムスタンプを結合
         timestamp = comment.get('timestamp', '')
-        if timestamp:
-            try:
-                # ISO形式の日時を日本語形式に変換
-                dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                formatted_time = dt.strftime('%Y/%m/%d %H:%M')
-                comment_text = f"{comment.get('text', '')} ({formatted_time})"
-            except:
-                comment_text = comment.get('text', '')
+        formatted_time = None
+        if timestamp and isinstance(timestamp, str):
+            # ISO形式の日時を日本語形式に変換
+            formatted_time = _format_iso_datetime(timestamp)
+        if formatted_time is not None:
+            comment_text = f"{comment.get('text', '')} ({formatted_time})"
         else:
             comment_text = comment.get('text', '')
         comment_texts.append(comment_text)
@@ -40,24 +66,88 @@ def format_datetime(iso_string):
     if not iso_string:
         return ""
     
-    try:
-        dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
-        return dt.strftime('%Y/%m/%d %H:%M')
-    except:
+    if not isinstance(iso_string, str):
         return iso_string
+    
+    formatted = _format_iso_datetime(iso_string)
+    return iso_string if formatted is None else formatted
+
+# CSVヘッダー
+CSV_HEADERS = [
+    '市名',
+    '投票区番号',
+    '場所番号',
+    '場所名',
+    '住所',
+    '備考',
+    'チェック状態',
+    '最終更新日時',
+    'コメント',
+    '投票区チェック状態',
+    '投票区最終更新日時',
+    '投票区コメント'
+]
+
+def build_district_rows(city_name, district_key, district_data):
+    """投票区1つ分の掲示場所をCSVの行に変換"""
+    # 投票区レベルの情報
+    district_comments = district_data.get('districtComments', {})
+    district_checked = district_comments.get('isChecked', False)
+    district_last_updated = format_datetime(district_comments.get('lastUpdated', ''))
+    district_comment_text = format_comments(district_comments.get('comments', []))
+    
+    # 各掲示場所の情報
+    locations = district_data.get('locations', [])
+    
+    for location in locations:
+        yield [
+            city_name,                                          # 市名
+            district_key,                                       # 投票区番号
+            location.get('number', ''),                         # 場所番号
+            strip_line_breaks(location.get('name', '')),        # 場所名（改行文字除去）
+            location.get('address', ''),                        # 住所
+            location.get('remark', ''),                         # 備考
+            '✓' if location.get('isChecked', False) else '',    # チェック状態
+            format_datetime(location.get('lastUpdated', '')),   # 最終更新日時
+            format_comments(location.get('comments', [])),      # コメント
+            '✓' if district_checked else '',                    # 投票区チェック状態
+            district_last_updated,                              # 投票区最終更新日時
+            district_comment_text                               # 投票区コメント
+        ]
 
-def convert_json_to_csv(json_file_path, output_csv_path=None):
-    """JSONファイルをCSVに変換"""
+def write_csv_preamble(writer, formatted_timestamp):
+    """CSV冒頭のヘッダー情報と列見出しを書き込む"""
+    writer.writerow(['# 参院選2025大阪府選挙ポスター貼り付けデータ'])
+    writer.writerow([f'# エクスポート日時: {formatted_timestamp}'])
+    writer.writerow([f'# 変換日時: {datetime.now().strftime("%Y/%m/%d %H:%M")}'])
+    writer.writerow([])  # 空行
+    writer.writerow(CSV_HEADERS)
+
+def convert_json_to_csv(json_file_path, output_csv_path=None, streaming=False):
+    """
+    JSONファイルをCSVに変換
+
+    streaming=True の場合はJSON全体を読み込まず、投票区ごとに読み込みながら
+    CSVへ書き出すため、使用メモリがエクスポートの大きさに比例しない。
+    出力内容は通常モードと同じ。
+    """
     
     # 出力ファイル名を自動生成
     if output_csv_path is None:
         base_name = os.path.splitext(os.path.basename(json_file_path))[0]
         output_csv_path = f"{base_name}.csv"
     
+    if streaming:
+        return _convert_streaming(json_file_path, output_csv_path)
+    
     # JSONファイルを読み込み
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open_export(json_file_path) as export:
+            # データを変換
+            rows = []
+            for _, city_name, district_key, district_data in export.iter_districts():
+                rows.extend(build_district_rows(city_name, district_key, district_data))
+            formatted_timestamp = format_datetime(export.timestamp)
     except FileNotFoundError:
         print(f"エラー: ファイル '{json_file_path}' が見つかりません。")
         return False
@@ -65,74 +155,13 @@ def convert_json_to_csv(json_file_path, output_csv_path=None):
         print(f"エラー: ファイル '{json_file_path}' のJSON形式が不正です。")
         return False
     
-    # CSVヘッダー
-    headers = [
-        '市名',
-        '投票区番号',
-        '場所番号',
-        '場所名',
-        '住所',
-        '備考',
-        'チェック状態',
-        '最終更新日時',
-        'コメント',
-        '投票区チェック状態',
-        '投票区最終更新日時',
-        '投票区コメント'
-    ]
-    
-    rows = []
-    
-    # データを変換
-    timestamp = data.get('timestamp', '')
-    formatted_timestamp = format_datetime(timestamp)
-    
-    cities = data.get('cities', {})
-    
-    for city_key, city_data in cities.items():
-        city_name = city_data.get('name', city_key)
-        districts = city_data.get('districts', {})
-        
-        for district_key, district_data in districts.items():
-            # 投票区レベルの情報
-            district_comments = district_data.get('districtComments', {})
-            district_checked = district_comments.get('isChecked', False)
-            district_last_updated = format_datetime(district_comments.get('lastUpdated', ''))
-            district_comment_text = format_comments(district_comments.get('comments', []))
-            
-            # 各掲示場所の情報
-            locations = district_data.get('locations', [])
-            
-            for location in locations:
-                row = [
-                    city_name,                                          # 市名
-                    district_key,                                       # 投票区番号
-                    location.get('number', ''),                         # 場所番号
-                    location.get('name', '').replace('\r', '').replace('\n', ''),  # 場所名（改行文字除去）
-                    location.get('address', ''),                        # 住所
-                    location.get('remark', ''),                         # 備考
-                    '✓' if location.get('isChecked', False) else '',    # チェック状態
-                    format_datetime(location.get('lastUpdated', '')),   # 最終更新日時
-                    format_comments(location.get('comments', [])),      # コメント
-                    '✓' if district_checked else '',                    # 投票区チェック状態
-                    district_last_updated,                              # 投票区最終更新日時
-                    district_comment_text                               # 投票区コメント
-                ]
-                rows.append(row)
-    
     # CSVファイルに書き込み
     try:
         with open(output_csv_path, 'w', encoding='utf-8-sig', newline='') as f:
             writer = csv.writer(f)
             
-            # ヘッダー情報を追加
-            writer.writerow(['# 参院選2025大阪府選挙ポスター貼り付けデータ'])
-            writer.writerow([f'# エクスポート日時: {formatted_timestamp}'])
-            writer.writerow([f'# 変換日時: {datetime.now().strftime("%Y/%m/%d %H:%M")}'])
-            writer.writerow([])  # 空行
-            
-            # データヘッダーとデータ
-            writer.writerow(headers)
+            # ヘッダー情報とデータ
+            write_csv_preamble(writer, formatted_timestamp)
             writer.writerows(rows)
         
         print(f"変換完了: {output_csv_path}")
@@ -143,25 +172,69 @@ def convert_json_to_csv(json_file_path, output_csv_path=None):
         print(f"エラー: CSVファイルの書き込みに失敗しました。{e}")
         return False
 
+def _convert_streaming(json_file_path, output_csv_path):
+    """投票区ごとに読み込みながらCSVへ書き出す"""
+    row_count = 0
+    
+    try:
+        with open_export(json_file_path, streaming=True) as export, \
+                open(output_csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            write_csv_preamble(writer, format_datetime(export.timestamp))
+            
+            for _, city_name, district_key, district_data in export.iter_districts():
+                for row in build_district_rows(city_name, district_key, district_data):
+                    writer.writerow(row)
+                    row_count += 1
+    except FileNotFoundError:
+        print(f"エラー: ファイル '{json_file_path}' が見つかりません。")
+        return False
+    except json.JSONDecodeError:
+        print(f"エラー: ファイル '{json_file_path}' のJSON形式が不正です。")
+        return False
+    except Exception as e:
+        print(f"エラー: CSVファイルの書き込みに失敗しました。{e}")
+        return False
+    
+    print(f"変換完了: {output_csv_path}")
+    print(f"総レコード数: {row_count}行")
+    return True
+
 def main():
     """メイン処理"""
+    parser = argparse.ArgumentParser(description='ポスター貼り付けデータのJSONをCSVに変換')
+    parser.add_argument('json_file', nargs='?', default=JSON_FILE_PATH,
+                        help='変換するJSONファイル（省略時はJSON_FILE_PATH）')
+    parser.add_argument('-o', '--output', help='出力CSVファイルのパス')
+    parser.add_argument('--stream', action='store_true',
+                        help='投票区ごとに読み込みながら変換する（大きなエクスポート向け）')
+    parser.add_argument('--format', choices=['csv', 'columnar'], default='csv',
+                        help='出力形式（columnar: 列指向形式のディレクトリ）')
+    args = parser.parse_args()
+    
     print("JSON to CSV変換スクリプト")
     print("=" * 50)
     
     # ファイル存在確認
-    if not os.path.exists(JSON_FILE_PATH):
-        print(f"エラー: 指定されたJSONファイルが見つかりません: {JSON_FILE_PATH}")
-        print("スクリプト内のJSON_FILE_PATHを正しいパスに変更してください。")
+    if not os.path.exists(args.json_file):
+        print(f"エラー: 指定されたJSONファイルが見つかりません: {args.json_file}")
+        print("引数でパスを指定するか、スクリプト内のJSON_FILE_PATHを正しいパスに変更してください。")
         return
     
-    print(f"入力ファイル: {JSON_FILE_PATH}")
+    print(f"入力ファイル: {args.json_file}")
     
     # 変換実行
-    success = convert_json_to_csv(JSON_FILE_PATH)
+    if args.format == 'columnar':
+        # columnar_export はこのモジュールを参照するため実行時に読み込む
+        from columnar_export import convert_json_to_columnar
+        success = convert_json_to_columnar(args.json_file, args.output, streaming=args.stream)
+    else:
+        success = convert_json_to_csv(args.json_file, args.output, streaming=args.stream)
     
     if success:
         print("\n変換が正常に完了しました。")
-        print("生成されたCSVファイルをExcelなどで開いて確認してください。")
+        if args.format == 'csv':
+            print("生成されたCSVファイルをExcelなどで開いて確認してください。")
     else:
         print("\n変換に失敗しました。")
 
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エクスポートJSONの差分だけをCSVに変換するスクリプト
+
+前回のエクスポート（または状態インデックスファイル）と比較して、
+lastUpdated・チェック状態・コメントなどが変わった掲示場所と投票区だけを出力する。
+--patch を指定すると、convert_json_to_csv で作成済みのCSVに差分を反映する。
+
+使い方:
+    python delta_convert.py current.json --previous previous.json -o delta.csv
+    python delta_convert.py current.json --state state.json -o delta.csv
+    python delta_convert.py current.json --state state.json --patch full.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import tempfile
+
+from convert_json_to_csv import build_district_rows, format_datetime, write_csv_preamble
+from export_stream import open_export
+
+# CSVの先頭にある「# 」で始まる情報行と空行の数（この後に列見出しが続く）
+PREAMBLE_LINES = 4
+
+
+def _fingerprint(value):
+    """値の内容から短いハッシュを作る"""
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def location_key(city_name, district_key, number):
+    """掲示場所のキー（CSVの 市名・投票区番号・場所番号 に対応）"""
+    return f"{city_name}\t{district_key}\t{number}"
+
+
+def district_key_of(city_name, district_key):
+    """投票区のキー"""
+    return f"{city_name}\t{district_key}"
+
+
+def empty_state_index():
+    return {'timestamp': '', 'districts': {}, 'locations': {}}
+
+
+def build_state_index(json_file_path):
+    """エクスポートから状態インデックス（キー → 内容のハッシュ）を作る"""
+    index = empty_state_index()
+    with open_export(json_file_path, streaming=True) as export:
+        index['timestamp'] = export.timestamp
+        for _, city_name, district_key, district_data in export.iter_districts():
+            index['districts'][district_key_of(city_name, district_key)] = \
+                _fingerprint(district_data.get('districtComments', {}))
+            for location in district_data.get('locations', []):
+                key = location_key(city_name, district_key, location.get('number', ''))
+                index['locations'][key] = _fingerprint(location)
+    return index
+
+
+def load_state_index(state_file_path):
+    """状態インデックスファイルを読み込む（存在しない場合は空）"""
+    if not os.path.exists(state_file_path):
+        return empty_state_index()
+    with open(state_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state_index(index, state_file_path):
+    """状態インデックスファイルを保存する"""
+    with open(state_file_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def compute_delta(json_file_path, previous_index):
+    """
+    前回の状態インデックスと比較して変更のあった行を求める
+
+    投票区のチェック状態やコメントは投票区内の全行に含まれるため、
+    投票区が変わった場合はその投票区の全行を変更として扱う。
+
+    Returns:
+        tuple: (エクスポート日時, 変更行の辞書 {キー: 行}, 削除されたキーのリスト, 新しい状態インデックス)
+    """
+    previous_districts = previous_index.get('districts', {})
+    previous_locations = previous_index.get('locations', {})
+    index = empty_state_index()
+    changed_rows = {}
+
+    with open_export(json_file_path, streaming=True) as export:
+        index['timestamp'] = export.timestamp
+        for _, city_name, district_key, district_data in export.iter_districts():
+            d_key = district_key_of(city_name, district_key)
+            district_fp = _fingerprint(district_data.get('districtComments', {}))
+            index['districts'][d_key] = district_fp
+            district_changed = previous_districts.get(d_key) != district_fp
+
+            locations = district_data.get('locations', [])
+            changed_locations = []
+            for location in locations:
+                key = location_key(city_name, district_key, location.get('number', ''))
+                location_fp = _fingerprint(location)
+                index['locations'][key] = location_fp
+                if district_changed or previous_locations.get(key) != location_fp:
+                    changed_locations.append((key, location))
+
+            if not changed_locations:
+                continue
+            changed_data = dict(district_data, locations=[location for _, location in changed_locations])
+            rows = build_district_rows(city_name, district_key, changed_data)
+            for (key, _), row in zip(changed_locations, rows):
+                changed_rows[key] = row
+
+    removed_keys = [key for key in previous_locations if key not in index['locations']]
+    return index['timestamp'], changed_rows, removed_keys, index
+
+
+def write_delta_csv(changed_rows, timestamp, output_csv_path):
+    """変更のあった行だけを convert_json_to_csv と同じ形式のCSVに書き込む"""
+    with open(output_csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        write_csv_preamble(writer, format_datetime(timestamp))
+        writer.writerows(changed_rows.values())
+
+
+def patch_csv(csv_path, changed_rows, removed_keys, timestamp):
+    """
+    作成済みのCSVに差分を反映する
+
+    変更行はその場で置き換え、削除された掲示場所の行は取り除き、
+    新しい掲示場所は末尾に追加する。行の長さが変わるためファイルは
+    一時ファイルへ順に書き直してから置き換える（行の変換処理は変更分のみ）。
+
+    Returns:
+        tuple: (置き換えた行数, 追加した行数, 削除した行数)
+    """
+    remaining = dict(changed_rows)
+    removed = set(removed_keys)
+    replaced_count = 0
+    removed_count = 0
+
+    directory = os.path.dirname(os.path.abspath(csv_path))
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as src, \
+            tempfile.NamedTemporaryFile('w', encoding='utf-8-sig', newline='',
+                                        dir=directory, suffix='.csv', delete=False) as dst:
+        reader = csv.reader(src)
+        writer = csv.writer(dst)
+
+        # 情報行と列見出しは全件変換と同じく書き直す（エクスポート日時・変換日時を更新）
+        for line_number, _ in enumerate(reader):
+            if line_number == PREAMBLE_LINES:
+                break
+        write_csv_preamble(writer, format_datetime(timestamp))
+
+        for row in reader:
+            key = location_key(row[0], row[1], row[2])
+            if key in removed:
+                removed_count += 1
+                continue
+            if key in remaining:
+                row = remaining.pop(key)
+                replaced_count += 1
+            writer.writerow(row)
+
+        writer.writerows(remaining.values())
+
+    os.replace(dst.name, csv_path)
+    return replaced_count, len(remaining), removed_count
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='エクスポートJSONの差分だけをCSVに変換')
+    parser.add_argument('json_file', help='最新のエクスポートJSON')
+    parser.add_argument('--previous', help='比較する前回のエクスポートJSON')
+    parser.add_argument('--state', help='状態インデックスファイル（読み込み後、最新の状態で更新する）')
+    parser.add_argument('-o', '--output', help='差分CSVの出力先')
+    parser.add_argument('--patch', help='差分を反映する作成済みのCSV')
+    args = parser.parse_args()
+
+    print("JSON to CSV差分変換スクリプト")
+    print("=" * 50)
+
+    if not args.output and not args.patch:
+        parser.error('--output または --patch を指定してください')
+
+    if args.previous:
+        previous_index = build_state_index(args.previous)
+        print(f"比較対象: {args.previous}")
+    elif args.state:
+        previous_index = load_state_index(args.state)
+        print(f"状態インデックス: {args.state}")
+    else:
+        previous_index = empty_state_index()
+        print("比較対象がないため全件を出力します")
+
+    timestamp, changed_rows, removed_keys, index = compute_delta(args.json_file, previous_index)
+
+    print(f"総掲示場所数: {len(index['locations'])}件")
+    print(f"変更: {len(changed_rows)}件 / 削除: {len(removed_keys)}件")
+
+    if args.output:
+        write_delta_csv(changed_rows, timestamp, args.output)
+        print(f"差分CSV: {args.output}")
+
+    if args.patch:
+        replaced, added, removed = patch_csv(args.patch, changed_rows, removed_keys, timestamp)
+        print(f"CSVを更新しました: {args.patch} (置換{replaced}件 / 追加{added}件 / 削除{removed}件)")
+
+    if args.state:
+        save_state_index(index, args.state)
+        print(f"状態インデックスを更新しました: {args.state}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ポスター貼り付けデータのエクスポートJSONを 市 → 投票区 → 掲示場所 の順にたどるモジュール
+
+json.load で全体を読み込む方法と、ファイルを少しずつ読みながら
+投票区単位で取り出すストリーミング方式の両方で同じ形のデータを返す。
+"""
+
+import json
+import re
+from contextlib import contextmanager
+
+# ストリーミング時に一度に読み込む文字数
+CHUNK_SIZE = 64 * 1024
+
+# ストリーミング時に1つの値（投票区など）として読み足す文字数の上限
+# 途中で切れた・壊れたファイルで残り全体をメモリに読み込まないようにする
+MAX_VALUE_SIZE = 8 * 1024 * 1024
+
+# 値がバッファの末尾で途切れているだけとみなすデコードエラーの位置（末尾からの文字数）
+# 末尾で切れた true/false/null や \uXXXX でも、エラーの位置は末尾の数文字手前になる
+_TRUNCATION_MARGIN = 8
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+def iter_export_districts(data):
+    """
+    読み込み済みのエクスポートデータから投票区を順に返す
+
+    Yields:
+        tuple: (市キー, 市名, 投票区番号, 投票区データ)
+    """
+    cities = data.get('cities', {})
+
+    for city_key, city_data in cities.items():
+        city_name = city_data.get('name', city_key)
+        districts = city_data.get('districts', {})
+
+        for district_key, district_data in districts.items():
+            yield city_key, city_name, district_key, district_data
+
+
+class _ChunkedJsonScanner:
+    """ファイルを一定サイズずつ読みながらJSONの値を取り出すスキャナー"""
+
+    def __init__(self, file, chunk_size=CHUNK_SIZE, max_value_size=MAX_VALUE_SIZE):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._max_value_size = max_value_size
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size=None):
+        """読み終えた部分を捨てて次のチャンク（size 文字、省略時はチャンクサイズ）を追加する"""
+        if self._eof:
+            return False
+        chunk = self._file.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message):
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def peek(self):
+        """空白を読み飛ばして次の文字を返す（終端なら空文字）"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        """次の文字が char であることを確認して読み進める"""
+        if self.peek() != char:
+            raise self._error(f"'{char}' が必要です")
+        self._pos += 1
+
+    def _fill_value(self):
+        """
+        読み込み中の値のために読み足す
+
+        再試行のたびに読み込み中の値の先頭から解析し直すため、読み足す量を読み込み済みの量と
+        同じだけにして（倍々に増やして）、解析し直す文字数の合計を値の長さに比例させる。
+        """
+        pending = len(self._buffer) - self._pos
+        if pending >= self._max_value_size:
+            raise self._error(f"値が {self._max_value_size:,}文字を超えても終わりません"
+                              "（ファイルが途中で切れているか壊れています）")
+        return self._fill(min(max(pending, self._chunk_size), self._max_value_size - pending))
+
+    def value(self):
+        """次のJSON値を1つ読み込んで返す"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # 値がチャンクの境界で切れている場合だけ読み足して再試行する
+                # （末尾より前の位置の誤りは、読み足しても直らない不正なJSON）
+                truncated = (e.pos >= len(self._buffer) - _TRUNCATION_MARGIN
+                             or e.msg.startswith('Unterminated string'))
+                if truncated and self._fill_value():
+                    continue
+                raise
+            # 数値がチャンク末尾で途切れている可能性があるため読み足して確認
+            if end == len(self._buffer) and self._fill_value():
+                continue
+            self._pos = end
+            return value
+
+    def iter_object(self):
+        """
+        オブジェクトのキーを順に返す
+        呼び出し側は各キーを受け取るたびに対応する値を読み込むこと
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error('オブジェクトのキーが文字列ではありません')
+            self.expect(':')
+            yield key
+
+            char = self.peek()
+            self._pos += 1
+            if char == ',':
+                continue
+            if char == '}':
+                return
+            self._pos -= 1
+            raise self._error("',' または '}' が必要です")
+
+    def iter_array(self):
+        """
+        配列の要素位置ごとに制御を返す
+        呼び出し側は各要素を読み込むこと
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield
+
+            char = self.peek()
+            self._pos += 1
+            if char == ',':
+                continue
+            if char == ']':
+                return
+            self._pos -= 1
+            raise self._error("',' または ']' が必要です")
+
+    def skip_rest(self):
+        """ドキュメント末尾に余分なデータがないことを確認する"""
+        if self.peek() != '':
+            raise self._error('JSONの後に余分なデータがあります')
+
+
+class ExportStreamReader:
+    """
+    エクスポートJSONを投票区単位で逐次読み込むリーダー
+
+    メモリに保持するのは処理中の投票区1つ分だけなので、
+    エクスポートの大きさに関係なく使用メモリが一定に収まる。
+    timestamp は cities より前に書かれている場合、開いた時点で参照できる。
+    """
+
+    def __init__(self, file_path, chunk_size=CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.timestamp = ''
+        self._file = None
+        self._scanner = None
+        self._members = None
+        self._at_cities = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """ファイルを開いて cities の直前まで読み進める"""
+        self._file = open(self.file_path, 'r', encoding='utf-8')
+        self._scanner = _ChunkedJsonScanner(self._file, self.chunk_size)
+        self._members = self._scanner.iter_object()
+        try:
+            self._read_top_level(stop_at_cities=True)
+        except json.JSONDecodeError:
+            self.close()
+            raise
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _read_top_level(self, stop_at_cities):
+        for key in self._members:
+            if key == 'cities' and stop_at_cities:
+                self._at_cities = True
+                return
+            value = self._scanner.value()
+            if key == 'timestamp':
+                self.timestamp = value
+        self._scanner.skip_rest()
+
+    def iter_districts(self):
+        """
+        投票区を順に返す
+
+        Yields:
+            tuple: (市キー, 市名, 投票区番号, 投票区データ)
+        """
+        if self._at_cities:
+            self._at_cities = False
+            for city_key in self._scanner.iter_object():
+                yield from self._iter_city(city_key)
+            self._read_top_level(stop_at_cities=False)
+
+    def __iter__(self):
+        return self.iter_districts()
+
+    def _iter_city(self, city_key):
+        # エクスポートでは name が districts より前に出力される
+        city_name = city_key
+        for key in self._scanner.iter_object():
+            if key == 'districts':
+                for district_key in self._scanner.iter_object():
+                    yield city_key, city_name, district_key, self._read_district()
+            else:
+                value = self._scanner.value()
+                if key == 'name':
+                    city_name = value
+
+    def _read_district(self):
+        """投票区1つ分を読み込む（掲示場所は1件ずつデコード）"""
+        district_data = {}
+        for key in self._scanner.iter_object():
+            if key == 'locations':
+                locations = []
+                for _ in self._scanner.iter_array():
+                    locations.append(self._scanner.value())
+                district_data['locations'] = locations
+            else:
+                district_data[key] = self._scanner.value()
+        return district_data
+
+
+class _LoadedExport:
+    """json.load で読み込んだエクスポートを ExportStreamReader と同じ形で扱うラッパー"""
+
+    def __init__(self, data):
+        self.data = data
+        self.timestamp = data.get('timestamp', '')
+
+    def iter_districts(self):
+        return iter_export_districts(self.data)
+
+    def __iter__(self):
+        return self.iter_districts()
+
+
+@contextmanager
+def open_export(file_path, streaming=False):
+    """
+    エクスポートJSONを開く
+
+    Args:
+        file_path (str): エクスポートJSONのパス
+        streaming (bool): True の場合は投票区単位で逐次読み込む
+
+    Yields:
+        timestamp 属性と iter_districts() を持つオブジェクト
+    """
+    if streaming:
+        with ExportStreamReader(file_path) as reader:
+            yield reader
+    else:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield _LoadedExport(data)
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+掲示場所の住所に座標を付けるジオコーディング
+
+住所は表記ゆれを正規化した文字列をキーとしてディスク上のキャッシュに保存し、
+2回目以降は新しい住所・変わった住所だけを解決する。
+
+住所の解決方法（リゾルバー）は差し替えられる。既定はネットワークを使わない
+地名辞書（ガゼッティア）のCSVで、住所の先頭から最も長く一致する地名の座標を使う。
+地名辞書にない住所は座標なしとして記録する（推測の座標は付けない）。
+
+地名辞書のCSV（1行目はヘッダー）:
+    住所,緯度,経度
+    大阪府吹田市泉町1丁目,34.7617,135.5160
+
+独自のリゾルバーは resolve(正規化した住所) が (緯度, 経度, 一致した地名) または
+None を返すクラスとして作り、--resolver モジュール名:クラス名 で指定する。
+
+使い方:
+    python geocode.py --gazetteer gazetteer.csv -o geocoded.csv
+    python geocode.py --export poster-data-export-2025-07-10.json --cache geocode_cache.json
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from location_store import LocationStore
+from reconcile import load_master
+from text_normalize import normalize_address
+
+DEFAULT_CACHE_FILE = 'geocode_cache.json'
+DEFAULT_GAZETTEER_FILE = 'gazetteer.csv'
+CACHE_VERSION = 1
+
+OUTPUT_HEADERS = ['市', '投票区', '番号', '名称', '住所', '緯度', '経度', '一致した地名']
+
+
+class GazetteerResolver:
+    """
+    地名辞書のCSVで住所を解決するリゾルバー
+
+    住所の先頭から最も長く一致する地名の座標を返す。
+    """
+
+    name = 'gazetteer'
+
+    def __init__(self, gazetteer_path=DEFAULT_GAZETTEER_FILE):
+        self.gazetteer_path = gazetteer_path
+        self.places = {}
+        self.max_length = 0
+        if gazetteer_path and os.path.exists(gazetteer_path):
+            self._load(gazetteer_path)
+        self.signature = f"{self.name}:{len(self.places)}:{self._mtime()}"
+
+    def _mtime(self):
+        if self.gazetteer_path and os.path.exists(self.gazetteer_path):
+            return int(os.path.getmtime(self.gazetteer_path))
+        return 0
+
+    def _load(self, gazetteer_path):
+        with open(gazetteer_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) < 3 or not row[0]:
+                    continue
+                place = normalize_address(row[0])
+                self.places[place] = (float(row[1]), float(row[2]))
+                self.max_length = max(self.max_length, len(place))
+
+    def resolve(self, address):
+        """正規化した住所を (緯度, 経度, 一致した地名) に解決する（見つからない場合は None）"""
+        for length in range(min(len(address), self.max_length), 0, -1):
+            coordinates = self.places.get(address[:length])
+            if coordinates is not None:
+                return coordinates[0], coordinates[1], address[:length]
+        return None
+
+
+def load_resolver(spec=None, gazetteer_path=DEFAULT_GAZETTEER_FILE):
+    """
+    リゾルバーを作成する
+
+    Args:
+        spec (str): 'モジュール名:クラス名'（省略時は地名辞書）
+    """
+    if not spec:
+        return GazetteerResolver(gazetteer_path)
+    module_name, _, class_name = spec.partition(':')
+    resolver_class = getattr(importlib.import_module(module_name), class_name)
+    return resolver_class()
+
+
+class GeocodeCache:
+    """
+    正規化した住所 → 解決結果 のディスク上のキャッシュ
+
+    解決できなかった住所も、解決を試みたリゾルバー（地名辞書）の識別子とともに記録し、
+    同じリゾルバーでは再解決しない。識別子は住所ごとに持つため、一部の住所だけを
+    解決した実行（--city など）の後でも、古い地名辞書で解決できなかった住所は再解決する。
+    """
+
+    def __init__(self, cache_file_path=DEFAULT_CACHE_FILE):
+        self.cache_file_path = cache_file_path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if cache_file_path and os.path.exists(cache_file_path):
+            with open(cache_file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self.entries = data.get('entries', {})
+
+    def lookup(self, address, resolver_signature):
+        """
+        キャッシュを引く
+
+        Returns:
+            tuple: (キャッシュにあったか, 解決結果の辞書またはNone)
+        """
+        entry = self.entries.get(address)
+        if entry is not None and (entry.get('lat') is not None or entry.get('resolver') == resolver_signature):
+            self.hits += 1
+            return True, entry if entry.get('lat') is not None else None
+        self.misses += 1
+        return False, None
+
+    def store(self, address, result, resolver_signature):
+        """解決結果を記録する（result が None の場合は解決できなかったことを記録）"""
+        entry = {'resolver': resolver_signature, 'resolvedAt': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        if result is None:
+            entry.update({'lat': None, 'lng': None, 'matched': None})
+        else:
+            entry.update({'lat': result[0], 'lng': result[1], 'matched': result[2]})
+        self.entries[address] = entry
+        self._dirty = True
+        return entry if result is not None else None
+
+    def save(self):
+        """キャッシュを保存する（一時ファイルに書いてから置き換える）"""
+        if not self.cache_file_path or not self._dirty:
+            return
+        temp_path = f"{self.cache_file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self.entries},
+                      f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.cache_file_path)
+        self._dirty = False
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class GeocodeStats:
+    """ジオコーディングの集計"""
+
+    def __init__(self):
+        self.locations = 0
+        self.addresses = 0
+        self.resolved = 0
+        self.unresolved = 0
+        self.resolve_calls = 0
+        self.resolve_seconds = 0.0
+
+
+def geocode_store(store, resolver, cache):
+    """
+    ストアの全掲示場所の住所を解決する
+
+    同じ住所は1回だけキャッシュを引き、キャッシュにない住所だけをリゾルバーで解決する。
+
+    Returns:
+        tuple: (行番号ごとの解決結果のリスト, GeocodeStats)
+    """
+    stats = GeocodeStats()
+    signature = getattr(resolver, 'signature', resolver.name)
+    by_address = {}
+    results = []
+
+    for (address,) in store.iter_columns('address'):
+        stats.locations += 1
+        key = normalize_address(address)
+        if key not in by_address:
+            found, entry = cache.lookup(key, signature)
+            if not found:
+                start = time.perf_counter()
+                result = resolver.resolve(key)
+                stats.resolve_seconds += time.perf_counter() - start
+                stats.resolve_calls += 1
+                entry = cache.store(key, result, signature)
+            by_address[key] = entry
+        results.append(by_address[key])
+
+    stats.addresses = len(by_address)
+    stats.resolved = sum(1 for entry in results if entry is not None)
+    stats.unresolved = stats.locations - stats.resolved
+    cache.save()
+    return results, stats
+
+
+def write_geocoded_csv(store, results, output_path):
+    """座標付きの掲示場所一覧をCSVに書き出す"""
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(OUTPUT_HEADERS)
+        columns = store.iter_columns('city_key', 'district', 'number', 'name', 'address')
+        for (city_key, district, number, name, address), entry in zip(columns, results):
+            if entry is None:
+                writer.writerow([city_key, district, number, name.strip(), address, '', '', ''])
+            else:
+                writer.writerow([city_key, district, number, name.strip(), address,
+                                 entry['lat'], entry['lng'], entry['matched']])
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='掲示場所の住所に座標を付ける')
+    parser.add_argument('--export', help='エクスポートJSON（省略時は list_parsing/ の解析結果）')
+    parser.add_argument('--master', choices=['parsed', 'public'], default='parsed',
+                        help='エクスポートを使わない場合の一覧（parsed: 解析結果、public: public/ のCSV）')
+    parser.add_argument('--city', action='append', help='対象の市キー（複数指定可、省略時は全て）')
+    parser.add_argument('--gazetteer', default=DEFAULT_GAZETTEER_FILE, help='地名辞書のCSV')
+    parser.add_argument('--resolver', help='独自のリゾルバー（モジュール名:クラス名）')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE, help='キャッシュファイル')
+    parser.add_argument('-o', '--output', help='座標付きのCSVの出力先')
+    args = parser.parse_args()
+
+    if args.export:
+        store = LocationStore.from_export(args.export, streaming=True)
+    else:
+        store = load_master(args.city, args.master)
+
+    resolver = load_resolver(args.resolver, args.gazetteer)
+    if isinstance(resolver, GazetteerResolver) and not resolver.places:
+        print(f"警告: 地名辞書 '{args.gazetteer}' がないか空のため、住所は解決されません")
+
+    cache = GeocodeCache(args.cache)
+    start = time.perf_counter()
+    results, stats = geocode_store(store, resolver, cache)
+    elapsed = time.perf_counter() - start
+
+    print(f"掲示場所: {stats.locations}件 (住所 {stats.addresses}種類)")
+    print(f"座標あり: {stats.resolved}件 / 座標なし: {stats.unresolved}件")
+    print(f"キャッシュ: ヒット {cache.hits}件 / ミス {cache.misses}件 (ヒット率 {cache.hit_rate:.1%})")
+    average = stats.resolve_seconds / stats.resolve_calls * 1000 if stats.resolve_calls else 0
+    print(f"解決: {stats.resolve_calls}件 {stats.resolve_seconds:.3f}秒 (平均 {average:.2f}ミリ秒)")
+    print(f"全体の処理時間: {elapsed:.3f}秒")
+
+    if args.output:
+        write_geocoded_csv(store, results, args.output)
+        print(f"\n出力: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+市区町村ごとの選挙ポスター掲示場所一覧の解析
+
+共通の処理は engine.py、市区町村ごとのレイアウトは <市>/layout.py に置く。
+"""
@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+住所と設置場所（備考）の分割に使う住所の文法
+
+住所は「町名 + 番地部分」からなるものとして、1行の走査で住所の範囲を求める。
+
+    町名:     市区町村ごとの町名一覧（towns.txt）のトライで最長一致（ヶ と ケ は同じ文字とみなす）
+    番地部分: 数字と 丁目・番地・番・号、区切り（－ の と など）、末尾の語（先 内 の前 など）の
+              並びを小さな状態機械で読む（町名の直後の 一丁目 のような漢数字の丁目も読む）
+
+    泉町１丁目３－４０ / 森町中３丁目１３番内 / 下止々呂美５４３番地先 / 耳原二丁目２０－５５
+
+町名一覧は市区町村の町名の一覧から作ったもので、解析結果の確認に使う作成済みのCSVとは独立している。
+一覧にない町名は `python -m list_parsing.engine --check-towns` で確認できる。
+"""
+
+import os
+
+DIGITS = frozenset('0123456789０１２３４５６７８９')
+KANJI_DIGITS = frozenset('一二三四五六七八九十')
+
+# 町名の表記ゆれ（小書きのケ・カ）
+TOWN_VARIANTS = {'ヶ': 'ケ', 'ヵ': 'カ'}
+TOWN_VARIANTS_TABLE = str.maketrans(TOWN_VARIANTS)
+
+# 番地部分の語の種類
+NUMBER = 'number'
+UNIT = 'unit'
+SEPARATOR = 'separator'
+QUALIFIER = 'qualifier'
+# 町名の直後の漢数字の丁目（一丁目 など）
+KANJI_CHOME = 'kanji_chome'
+
+SUFFIX_WORDS = {
+    '丁目': UNIT, '番地': UNIT, '番': UNIT, '号': UNIT,
+    'の': SEPARATOR, 'と': SEPARATOR,
+    '－': SEPARATOR, '-': SEPARATOR, '‐': SEPARATOR, '−': SEPARATOR, 'ｰ': SEPARATOR, 'ー': SEPARATOR,
+    '先': QUALIFIER, '内': QUALIFIER, '地先': QUALIFIER, '付近': QUALIFIER,
+    'の前': QUALIFIER, 'の横': QUALIFIER, 'の境': QUALIFIER,
+}
+
+# 状態
+TOWN = 'town'
+END = 'end'
+
+# (状態, 語の種類) → 次の状態
+TRANSITIONS = {
+    (TOWN, NUMBER): NUMBER,
+    (TOWN, KANJI_CHOME): UNIT,
+    (NUMBER, UNIT): UNIT,
+    (NUMBER, SEPARATOR): SEPARATOR,
+    (NUMBER, QUALIFIER): END,
+    (UNIT, NUMBER): NUMBER,
+    (UNIT, SEPARATOR): SEPARATOR,
+    (UNIT, QUALIFIER): END,
+    (SEPARATOR, NUMBER): NUMBER,
+}
+# 住所の終わりになれる状態（区切りの直後では終われない）
+ACCEPTING_STATES = frozenset((TOWN, NUMBER, UNIT, END))
+
+_TERMINAL = None
+
+
+def build_trie(words):
+    """文字ごとの辞書を入れ子にしたトライを作る（語の終わりは None キーに語を持つ）"""
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = word
+    return root
+
+
+_SUFFIX_TRIE = build_trie(SUFFIX_WORDS)
+
+
+def _read_suffix_word(text, position):
+    """position から始まる番地部分の語を最長一致で読む（(種類, 終わりの位置) または None）"""
+    node = _SUFFIX_TRIE
+    found = None
+    for index in range(position, len(text)):
+        node = node.get(text[index])
+        if node is None:
+            break
+        word = node.get(_TERMINAL)
+        if word is not None:
+            found = (SUFFIX_WORDS[word], index + 1)
+    return found
+
+
+def _digit_run_ends(text):
+    """各位置から続く数字の終わりの位置（数字でない位置はその位置）"""
+    ends = list(range(len(text) + 1))
+    for index in range(len(text) - 1, -1, -1):
+        if text[index] in DIGITS:
+            ends[index] = ends[index + 1]
+    return ends
+
+
+def _read_token(text, position, digit_ends=None):
+    """
+    position から始まる番地部分の語を読む
+
+    Returns:
+        tuple: (種類, 終わりの位置)（番地部分の語でない場合は None）
+    """
+    char = text[position]
+    if char in DIGITS:
+        if digit_ends is not None:
+            return NUMBER, digit_ends[position]
+        end = position + 1
+        while end < len(text) and text[end] in DIGITS:
+            end += 1
+        return NUMBER, end
+    if char in KANJI_DIGITS:
+        end = position + 1
+        while end < len(text) and text[end] in KANJI_DIGITS:
+            end += 1
+        if text.startswith('丁目', end):
+            return KANJI_CHOME, end + 2
+        return None
+    return _read_suffix_word(text, position)
+
+
+def extract_town(address, prefixes=()):
+    """住所から市区町村名と番地部分（漢数字の丁目を含む）を除いた町名を取り出す"""
+    for prefix in prefixes:
+        if address.startswith(prefix):
+            address = address[len(prefix):]
+            break
+    for index, char in enumerate(address):
+        if char in DIGITS or (char in KANJI_DIGITS and _read_token(address, index) is not None):
+            return address[:index]
+    return address
+
+
+class AddressGrammar:
+    """町名のトライと番地部分の状態機械で住所を見つける"""
+
+    def __init__(self, towns):
+        self.towns = sorted(set(town for town in towns if town))
+        self._trie = build_trie(town.translate(TOWN_VARIANTS_TABLE) for town in self.towns)
+
+    @classmethod
+    def from_file(cls, towns_file_path):
+        """町名一覧から作る"""
+        return cls(read_towns(towns_file_path))
+
+    def __len__(self):
+        return len(self.towns)
+
+    def _town_ends(self, text, start):
+        """start から始まる町名の終わりの位置（長い順）"""
+        node = self._trie
+        ends = []
+        for index in range(start, len(text)):
+            char = text[index]
+            node = node.get(TOWN_VARIANTS.get(char, char))
+            if node is None:
+                break
+            if _TERMINAL in node:
+                ends.append(index + 1)
+        ends.reverse()
+        return ends
+
+    def has_town(self, town):
+        """町名一覧にある町名か"""
+        return len(town) in self._town_ends(town, 0)
+
+    def _read_suffix(self, text, position, allow_spaces):
+        """
+        町名の後の番地部分を読む
+
+        Returns:
+            tuple: (住所の終わりの位置, 最後の状態)（最長一致）
+        """
+        state = TOWN
+        last_accept = (position, TOWN)
+        length = len(text)
+        while position < length:
+            next_position = position
+            if allow_spaces or state == SEPARATOR:
+                while next_position < length and text[next_position].isspace():
+                    next_position += 1
+                if next_position == length:
+                    break
+
+            word = _read_token(text, next_position)
+            if word is None:
+                break
+            kind, word_end = word
+
+            state = TRANSITIONS.get((state, kind))
+            if state is None:
+                break
+            position = word_end
+            if state in ACCEPTING_STATES:
+                last_accept = (position, state)
+            if state == END:
+                break
+        return last_accept
+
+    def match_address(self, text, start=0, allow_spaces=False):
+        """
+        start から始まる住所の終わりの位置を求める
+
+        Returns:
+            tuple: (住所の終わりの位置, 最後の状態)（町名が一致しない場合は None）
+        """
+        best = None
+        for town_end in self._town_ends(text, start):
+            end, state = self._read_suffix(text, town_end, allow_spaces)
+            if best is None or end > best[0]:
+                best = (end, state)
+        return best
+
+    def split_leading(self, text):
+        """
+        「住所 備考」の形のテキストを分割する
+
+        住所が備考と空白なしで続いている場合も、番地部分の終わりで分割する。
+
+        Returns:
+            tuple: (住所, 備考)（住所が見つからない場合は None）
+        """
+        text = text.strip()
+        match = self.match_address(text)
+        if match is None:
+            return None
+        end, state = match
+        # 町名だけの住所は後ろが空白か行末の場合のみ
+        if state == TOWN and end < len(text) and not text[end].isspace():
+            return None
+        return _compact(text[:end]), ' '.join(text[end:].split())
+
+    def split_trailing(self, text):
+        """
+        「備考 住所」の形のテキストを分割する
+
+        行末まで住所として読める最初の位置で分割する。住所の中の空白（泉町１丁目 ３－４０ など）も
+        住所の一部として扱う。番地部分が各位置から行末まで読めるかを後ろから1回の走査で求めておき、
+        左から町名の終わりがその位置に当たる最初の始まりを探すため、行の長さに比例する時間で済む。
+
+        Returns:
+            tuple: (備考, 住所)（住所が見つからない場合は None）
+        """
+        text = text.strip()
+        completes = self._trailing_suffix_table(text)
+        for start, char in enumerate(text):
+            if char.isspace():
+                continue
+            if any(completes[town_end] for town_end in self._town_ends(text, start)):
+                return ' '.join(text[:start].split()), _compact(text[start:])
+        return None
+
+    @staticmethod
+    def _trailing_suffix_table(text):
+        """
+        町名の直後の各位置から、番地部分（空白を含んでもよい）が行末までちょうど読めるか
+
+        _read_suffix(allow_spaces=True) の状態機械を、(位置, 状態) ごとに後ろから求める。
+
+        Returns:
+            list: 位置 → 行末まで読めるか
+        """
+        length = len(text)
+        digit_ends = _digit_run_ends(text)
+        states = (TOWN, NUMBER, UNIT, SEPARATOR)
+        # reachable[位置][状態]: その状態で位置まで読んだ後、行末で住所が終われるか
+        reachable = [None] * (length + 1)
+        reachable[length] = {state: state in ACCEPTING_STATES for state in states}
+        for position in range(length - 1, -1, -1):
+            if text[position].isspace():
+                # 空白は読み飛ばすが、行末の手前の空白で住所は終われない（text は strip 済み）
+                reachable[position] = reachable[position + 1]
+                continue
+            word = _read_token(text, position, digit_ends)
+            row = {}
+            for state in states:
+                next_state = None if word is None else TRANSITIONS.get((state, word[0]))
+                if next_state is None:
+                    row[state] = False
+                elif next_state == END:
+                    row[state] = word[1] == length
+                else:
+                    row[state] = reachable[word[1]][next_state]
+            reachable[position] = row
+        return [row[TOWN] for row in reachable]
+
+
+def _compact(address):
+    """住所の中の空白を除去"""
+    return ''.join(address.split())
+
+
+def read_towns(towns_file_path):
+    """町名一覧（1行1町名、# 以降はコメント）を読む"""
+    with open(towns_file_path, 'r', encoding='utf-8') as f:
+        return [line.split('#', 1)[0].strip() for line in f]
+
+
+def load_grammar(towns_file_path):
+    """町名一覧があれば AddressGrammar を作る（ない場合は None）"""
+    if towns_file_path and os.path.exists(towns_file_path):
+        return AddressGrammar.from_file(towns_file_path)
+    return None
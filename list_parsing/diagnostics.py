@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+解析の診断情報（処理段階ごとの時間、種類ごとの警告・件数）
+
+解析中の警告はこれまでどおり表示したうえで、有効な場合は種類ごとに記録し、
+実行ごとのJSONレポートに書き出す。無効な場合（既定）は NULL_DIAGNOSTICS が
+何も記録しないため、解析の処理時間はほとんど変わらない。
+
+処理段階の時間は入れ子にでき、内側の段階の時間は外側の段階から除く
+（各段階の時間の合計が全体の処理時間になる）。
+
+    diagnostics = ParseDiagnostics()
+    with diagnostics.phase('tokenize'):
+        ...
+    diagnostics.warn('count_mismatch', '警告: ...', district='104')
+    diagnostics.count('address_fallback')
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+# レポートに残す警告の件数の上限（種類ごと）
+MAX_RECORDED_WARNINGS = 100
+
+
+class _NullPhase:
+    """何もしない処理段階"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class NullDiagnostics:
+    """診断情報を記録しない（警告の表示だけを行う）"""
+
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_PHASE
+
+    def warn(self, kind, message, **context):
+        print(message)
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_DIAGNOSTICS = NullDiagnostics()
+
+
+class _Phase:
+    """時間を計る処理段階（内側の段階の時間は除く）"""
+
+    __slots__ = ('diagnostics', 'name', 'start', 'children')
+
+    def __init__(self, diagnostics, name):
+        self.diagnostics = diagnostics
+        self.name = name
+
+    def __enter__(self):
+        self.children = 0.0
+        self.diagnostics._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        stack = self.diagnostics._stack
+        stack.pop()
+        if stack:
+            stack[-1].children += elapsed
+        phases = self.diagnostics.phases
+        phases[self.name] = phases.get(self.name, 0.0) + elapsed - self.children
+        return False
+
+
+class ParseDiagnostics:
+    """解析1回分の診断情報"""
+
+    enabled = True
+
+    def __init__(self, label=None):
+        self.label = label
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        # 段階名 → 秒（内側の段階を除く）
+        self.phases = {}
+        # 警告の種類 → 件数 / 記録した警告
+        self.warning_counts = {}
+        self.warnings = []
+        # 名前 → 件数
+        self.counters = {}
+        self._stack = []
+
+    def phase(self, name):
+        """処理段階の時間を計る（with 文で使う）"""
+        return _Phase(self, name)
+
+    def warn(self, kind, message, **context):
+        """警告を表示して種類ごとに記録する"""
+        print(message)
+        count = self.warning_counts.get(kind, 0) + 1
+        self.warning_counts[kind] = count
+        if count <= MAX_RECORDED_WARNINGS:
+            self.warnings.append({'kind': kind, 'message': message, **context})
+
+    def count(self, name, amount=1):
+        """件数を加算する"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, other):
+        """別の診断情報（市区町村ごとなど）を合算する"""
+        for name, seconds in other.phases.items():
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+        for kind, count in other.warning_counts.items():
+            self.warning_counts[kind] = self.warning_counts.get(kind, 0) + count
+        for name, count in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + count
+        self.warnings.extend(other.warnings)
+
+    def to_dict(self):
+        """JSONレポート用の辞書に変換"""
+        return {
+            'label': self.label,
+            'startedAt': self.started_at,
+            'phases': {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            'totalSeconds': round(sum(self.phases.values()), 6),
+            'warningCounts': dict(self.warning_counts),
+            'counters': dict(self.counters),
+            'warnings': self.warnings,
+        }
+
+
+def write_report(report_path, runs):
+    """
+    実行ごとのJSONレポートを書き出す
+
+    Args:
+        runs (dict): 市区町村キー → ParseDiagnostics
+    """
+    total = ParseDiagnostics('total')
+    for diagnostics in runs.values():
+        total.merge(diagnostics)
+    report = {
+        'generatedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'cities': {city_key: diagnostics.to_dict() for city_key, diagnostics in runs.items()},
+        'total': {key: value for key, value in total.to_dict().items() if key not in ('label', 'startedAt', 'warnings')},
+    }
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+市区町村ごとのポスター掲示場所一覧を解析する共通エンジン
+
+各市区町村は list_parsing/<市>/layout.py にレイアウト（行のパターンと
+項目の対応付け）だけを定義し、ファイルの読み込み・住所の補完・名称の生成・
+CSVの書き出しはこのエンジンが共通の処理で行う。
+
+使い方（リポジトリのルートで実行）:
+    python -m list_parsing.engine              # 全市区町村を解析して出力
+    python -m list_parsing.engine minoo suita  # 指定した市区町村だけ
+    python -m list_parsing.engine --check      # 作成済みのCSV・住所の分割例（address_cases.txt）と一致するか確認
+    python -m list_parsing.engine --check-towns  # 作成済みのCSVの町名のうち町名一覧（towns.txt）にないものを表示
+    python -m list_parsing.engine --report parse_report.json  # 段階ごとの時間・警告をJSONに出力
+
+--check と同じ確認は tests/test_list_parsing.py のテストとしても実行できる（python -m pytest）。
+"""
+
+import argparse
+import contextlib
+import csv
+import functools
+import importlib
+import io
+import os
+import tempfile
+
+from list_parsing.address_grammar import extract_town, load_grammar
+from list_parsing.diagnostics import NULL_DIAGNOSTICS, ParseDiagnostics, write_report
+from list_parsing.text_reader import MappedLines
+from text_normalize import to_halfwidth_digits
+
+LIST_PARSING_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 住所と備考の分割の確認に使う例（市キー, 並び, テキスト, 住所, 備考 のタブ区切り）
+ADDRESS_CASES_FILE = os.path.join(LIST_PARSING_DIR, 'address_cases.txt')
+
+# 各市区町村の統合CSVの列
+STANDARD_FIELDNAMES = ['投票区', '番号', '住所', '備考', '名称']
+
+
+class LocationRecord:
+    """掲示場所1件分のデータ"""
+
+    __slots__ = ('district', 'number', 'address', 'remark', 'name', 'extra')
+
+    def __init__(self, district, number, address, remark, name, extra=None):
+        self.district = district
+        self.number = number
+        self.address = address
+        self.remark = remark
+        self.name = name
+        self.extra = extra or {}
+
+    def __repr__(self):
+        return f"LocationRecord({self.district!r}, {self.number!r}, {self.address!r}, {self.remark!r})"
+
+
+class Layout:
+    """
+    市区町村ごとのレイアウトの基底クラス
+
+    サブクラスは parse_line で1行を解析し、make_record で掲示場所を作って返す。
+    1行単位で扱えないレイアウトは parse を上書きする。
+    """
+
+    # 市区町村のキー（public/<キー>.csv やエクスポートのキーと同じ）
+    city_key = None
+    city_name = None
+    # 住所の先頭に付加する文字列
+    address_prefix = ''
+    # 解析するテキストファイル（市区町村ディレクトリからの相対パス）
+    input_files = ('text.txt',)
+    # 統合CSVの出力先
+    output_file = None
+    # 回帰確認に使う作成済みのCSV（省略時は output_file）
+    golden_file = None
+    # Webアプリで配信するCSV（public/ 以下のファイル名）と、その元になる出力（省略時は output_file）
+    public_file = None
+    public_source = None
+    fieldnames = STANDARD_FIELDNAMES
+    # 住所と備考の分割に使う町名一覧（市区町村ディレクトリからの相対パス）
+    towns_file = 'towns.txt'
+    # 解析中の警告・件数の記録先（parse_city が解析の間だけ差し替える）
+    diagnostics = NULL_DIAGNOSTICS
+
+    _address_grammar = None
+
+    @property
+    def address_grammar(self):
+        """町名一覧から作った住所の文法（町名一覧がない場合は None）"""
+        if self._address_grammar is None:
+            grammar = load_grammar(os.path.join(city_dir(self.city_key), self.towns_file))
+            self._address_grammar = grammar if grammar is not None else False
+        return self._address_grammar or None
+
+    def split_address(self, text, address_first=True):
+        """
+        住所の文法でテキストを住所と備考に分割する
+
+        Args:
+            address_first (bool): True は「住所 備考」、False は「備考 住所」の並び
+
+        Returns:
+            tuple: (住所, 備考)（町名一覧がないか住所が見つからない場合は None）
+        """
+        grammar = self.address_grammar
+        if grammar is None:
+            result = None
+        elif address_first:
+            result = grammar.split_leading(text)
+        else:
+            result = grammar.split_trailing(text)
+            result = None if result is None else (result[1], result[0])
+        if result is None:
+            self.diagnostics.count('address_fallback')
+        return result
+
+    def normalize_line(self, line):
+        """行の前後の空白を除去"""
+        return line.strip()
+
+    def start_file(self, file_name):
+        """ファイルごとの解析状態を作る"""
+        return {}
+
+    def parse_line(self, state, line_number, line):
+        """1行を解析して掲示場所を返す（該当しない行は None）"""
+        raise NotImplementedError
+
+    def parse(self, file_name, lines):
+        """
+        ファイル1つ分の行を解析して掲示場所を順に返す
+
+        lines は MappedLines で、先頭から順に読むほか lines[行番号] で前後の行も参照できる。
+        """
+        state = self.start_file(file_name)
+        for line_number, line in enumerate(lines, 1):
+            record = self.parse_line(state, line_number, self.normalize_line(line))
+            if record is not None:
+                yield record
+
+    def finalize(self, records):
+        """全ファイルの解析後に並べ替えなどを行う"""
+        return records
+
+    def full_address(self, address):
+        """住所に市区町村名を付加"""
+        return f"{self.address_prefix}{address}"
+
+    def build_name(self, district, number, remark):
+        """名称を作成（投票区番号-番号 備考）"""
+        return f"{district}-{number} {remark}"
+
+    def normalize_key(self, value):
+        """投票区・番号の全角数字を半角に統一（Webアプリのキーと一致させる）"""
+        return to_halfwidth_digits(value) if isinstance(value, str) else value
+
+    def make_record(self, district, number, address, remark, **extra):
+        """住所の補完と名称の生成を行って掲示場所を作る"""
+        district = self.normalize_key(district)
+        number = self.normalize_key(number)
+        return LocationRecord(
+            district, number, self.full_address(address), remark,
+            self.build_name(district, number, remark), extra,
+        )
+
+    def to_row(self, record):
+        """CSVの1行に変換"""
+        return [record.district, record.number, record.address, record.remark, record.name]
+
+    def to_dict(self, record):
+        """列名をキーとする辞書に変換"""
+        return dict(zip(self.fieldnames, self.to_row(record)))
+
+
+def read_lines(path):
+    """
+    テキストファイルを1行ずつ返す（content.split('\\n') と同じ行の区切り方）
+
+    行番号で前後の行を参照する場合は MappedLines を使う。
+    """
+    with MappedLines(path) as lines:
+        yield from lines
+
+
+def city_dir(city_key):
+    return os.path.join(LIST_PARSING_DIR, city_key)
+
+
+def master_csv_path(layout):
+    """Webアプリで配信する掲示場所一覧の元になるCSVのパス"""
+    return os.path.join(city_dir(layout.city_key), layout.public_source or layout.output_file)
+
+
+def parsed_master_csv_path(layout):
+    """
+    解析結果の掲示場所一覧として読むCSVのパス
+
+    出力先に以前の形式のCSVが残っている市区町村（golden_file を指定したレイアウト）は、
+    解析結果と一致することを --check で確認している golden_file を読む。
+    """
+    if layout.public_source or not layout.golden_file:
+        return master_csv_path(layout)
+    return os.path.normpath(os.path.join(city_dir(layout.city_key), layout.golden_file))
+
+
+def load_layout(city_key):
+    """list_parsing/<市>/layout.py の LAYOUT を読み込む"""
+    module = importlib.import_module(f'list_parsing.{city_key}.layout')
+    return module.LAYOUT
+
+
+def discover_cities():
+    """layout.py を持つ市区町村ディレクトリの一覧"""
+    return sorted(
+        name for name in os.listdir(LIST_PARSING_DIR)
+        if os.path.isfile(os.path.join(LIST_PARSING_DIR, name, 'layout.py'))
+    )
+
+
+def parse_city(layout, base_dir=None, diagnostics=None):
+    """
+    市区町村のテキストを解析する
+
+    Args:
+        diagnostics (ParseDiagnostics): 段階ごとの時間・警告の記録先（省略時は記録しない）
+            read: ファイルのメモリマップ / tokenize: 行の解析（行のデコードを含む） /
+            match: 投票区と住所の対応付け（吹田市） / finalize: 並べ替えなど
+
+    Returns:
+        list: LocationRecord のリスト
+    """
+    if base_dir is None:
+        base_dir = city_dir(layout.city_key)
+    if diagnostics is None:
+        diagnostics = NULL_DIAGNOSTICS
+    layout.diagnostics = diagnostics
+    try:
+        records = []
+        for file_name in layout.input_files:
+            with diagnostics.phase('read'):
+                lines = MappedLines(os.path.join(base_dir, file_name))
+            with lines, diagnostics.phase('tokenize'):
+                records.extend(layout.parse(file_name, lines))
+        with diagnostics.phase('finalize'):
+            records = layout.finalize(records)
+    finally:
+        del layout.diagnostics
+    diagnostics.count('records', len(records))
+    return records
+
+
+def write_csv(layout, records, output_file, standard=False):
+    """
+    統合CSVを書き出す
+
+    Args:
+        standard (bool): レイアウトの列ではなく標準の列（STANDARD_FIELDNAMES、Webアプリの形）で書き出す
+    """
+    if standard:
+        fieldnames, to_row = STANDARD_FIELDNAMES, functools.partial(Layout.to_row, layout)
+    else:
+        fieldnames, to_row = layout.fieldnames, layout.to_row
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(to_row(record) for record in records)
+
+
+def run_city(city_key, output_file=None, diagnostics=None):
+    """
+    市区町村を解析して統合CSVを書き出す
+
+    Returns:
+        tuple: (レイアウト, 掲示場所のリスト, 出力ファイル)
+    """
+    if diagnostics is None:
+        diagnostics = NULL_DIAGNOSTICS
+    layout = load_layout(city_key)
+    records = parse_city(layout, diagnostics=diagnostics)
+    if output_file is None:
+        output_file = os.path.join(city_dir(city_key), layout.output_file)
+    with diagnostics.phase('write'):
+        write_csv(layout, records, output_file)
+    return layout, records, output_file
+
+
+def check_towns(city_key):
+    """
+    作成済みのCSVの住所の町名のうち、町名一覧（towns.txt）にないものを求める
+
+    町名一覧は市区町村の町名の一覧から作るため、CSVからは作り直さない。
+
+    Returns:
+        list: 町名一覧にない町名
+    """
+    layout = load_layout(city_key)
+    grammar = layout.address_grammar
+    source = os.path.join(city_dir(city_key), layout.golden_file or layout.output_file)
+    prefixes = (layout.address_prefix, '大阪府')
+    with open(source, 'r', encoding='utf-8', newline='') as f:
+        towns = {extract_town(row['住所'], prefixes) for row in csv.DictReader(f)}
+    return sorted(town for town in towns if town and (grammar is None or not grammar.has_town(town)))
+
+
+def read_address_cases(cases_file=ADDRESS_CASES_FILE):
+    """
+    住所の分割例を読む
+
+    Yields:
+        tuple: (行番号, 市キー, 住所が先か, テキスト, 住所, 備考)
+    """
+    with open(cases_file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            city_key, order, text, address, remark = line.split('\t')
+            yield line_number, city_key, order == '住所先', text, address, remark
+
+
+def check_address_cases(cases_file=ADDRESS_CASES_FILE):
+    """
+    住所の分割例が期待どおりに分割されるか確認する
+
+    Returns:
+        tuple: (例の数, 一致しなかった例の説明のリスト)
+    """
+    layouts = {}
+    count = 0
+    failures = []
+    for line_number, city_key, address_first, text, address, remark in read_address_cases(cases_file):
+        if city_key not in layouts:
+            layouts[city_key] = load_layout(city_key)
+        actual = layouts[city_key].split_address(text, address_first)
+        count += 1
+        if actual != (address, remark):
+            failures.append(f"{os.path.basename(cases_file)}:{line_number}: {text} → {actual}"
+                            f"（期待: {(address, remark)}）")
+    return count, failures
+
+
+def check_city(city_key):
+    """
+    解析結果が作成済みのCSVと一致するか確認する
+
+    Returns:
+        tuple: (一致したか, 件数, 比較したファイル)
+    """
+    layout = load_layout(city_key)
+    golden = os.path.normpath(os.path.join(city_dir(city_key), layout.golden_file or layout.output_file))
+
+    # 解析中の進捗表示は確認結果に不要なため抑止する
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = parse_city(layout)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, 'output.csv')
+        write_csv(layout, records, output_file)
+        with open(output_file, 'rb') as f:
+            actual = f.read()
+    with open(golden, 'rb') as f:
+        expected = f.read()
+    return actual == expected, len(records), golden
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='市区町村ごとのポスター掲示場所一覧を解析')
+    parser.add_argument('cities', nargs='*', help='対象の市区町村（省略時は全て）')
+    parser.add_argument('--check', action='store_true', help='作成済みのCSVと一致するか確認する')
+    parser.add_argument('--check-towns', action='store_true', help='町名一覧にない町名を表示する')
+    parser.add_argument('--report', help='段階ごとの時間・警告の件数をJSONで出力するファイル')
+    args = parser.parse_args()
+
+    cities = args.cities or discover_cities()
+
+    if args.check_towns:
+        for city_key in cities:
+            missing = check_towns(city_key)
+            print(f"{city_key}: 町名一覧にない町名 {len(missing)}件" + (f" ({', '.join(missing)})" if missing else ''))
+        return
+
+    if args.check:
+        failed = []
+        for city_key in cities:
+            ok, count, golden = check_city(city_key)
+            status = "一致" if ok else "不一致"
+            print(f"[{status}] {city_key}: {count}件 ({os.path.relpath(golden)})")
+            if not ok:
+                failed.append(city_key)
+        count, failures = check_address_cases()
+        print(f"[{'不一致' if failures else '一致'}] 住所の分割例: {count}件 ({os.path.relpath(ADDRESS_CASES_FILE)})")
+        for failure in failures:
+            print(f"  {failure}")
+        if failures:
+            failed.append('住所の分割例')
+        if failed:
+            raise SystemExit(f"\n作成済みのCSV・住所の分割例と一致しないものがあります: {', '.join(failed)}")
+        print("\n全ての市区町村が作成済みのCSVと一致しました")
+        return
+
+    runs = {}
+    for city_key in cities:
+        diagnostics = ParseDiagnostics(city_key) if args.report else None
+        _, records, output_file = run_city(city_key, diagnostics=diagnostics)
+        print(f"{city_key}: {len(records)}件 → {os.path.relpath(output_file)}")
+        if diagnostics is not None:
+            runs[city_key] = diagnostics
+
+    if args.report:
+        report = write_report(args.report, runs)
+        warning_count = sum(report['total']['warningCounts'].values())
+        print(f"\nレポート: {args.report} (処理時間 {report['total']['totalSeconds']:.3f}秒, 警告 {warning_count}件)")
+
+
+if __name__ == "__main__":
+    main()
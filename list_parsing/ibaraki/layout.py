@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""茨木市の掲示場所一覧のレイアウト"""
+
+from list_parsing.engine import Layout
+
+
+class IbarakiLayout(Layout):
+    """
+    1行目はヘッダー、2行目以降は
+    「通し番号 投票区 番号 設置場所 設置説明...」の空白区切り
+    """
+
+    city_key = 'ibaraki'
+    city_name = '茨木市'
+    address_prefix = '大阪府茨木市'
+    output_file = 'ibaraki_poster_locations.csv'
+    public_file = 'ibaraki.csv'
+    # Webアプリでは担当の投票区だけを抜き出したCSVを使う
+    public_source = 'specific_districts.csv'
+    fieldnames = ['通し番号', '投票区', '番号', '名称', '住所', '設置説明']
+
+    def parse_line(self, state, line_number, line):
+        # ヘッダー行をスキップ（1行目）
+        if line_number == 1 or not line:
+            return None
+
+        # 設置場所以降は住所の文法で住所と設置説明に分割（町名一覧にない住所は空白区切り）
+        fields = line.split(None, 3)
+        split = self.split_address(fields[3]) if len(fields) == 4 else None
+        if split is None:
+            parts = line.split()
+            if len(parts) >= 5:
+                split = (parts[3], ' '.join(parts[4:]))
+        if split is None or not split[1]:
+            self.diagnostics.warn('incomplete_line', f"警告: 行 {line_number} のデータが不完全です: {line}",
+                                  line=line_number)
+            return None
+
+        address, remark = split
+        return self.make_record(fields[1], fields[2], address, remark, serial=fields[0])
+
+    def to_row(self, record):
+        return [record.extra['serial'], record.district, record.number, record.name, record.address, record.remark]
+
+
+LAYOUT = IbarakiLayout()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""箕面市の掲示場所一覧のレイアウト"""
+
+import re
+
+from list_parsing.engine import Layout
+
+# 番号＋半角スペースで始まる行（番号が1に戻ると次の投票区）
+LOCATION_PATTERN = re.compile(r'^(\d+)\s+(.+)$')
+
+
+class MinooLayout(Layout):
+    city_key = 'minoo'
+    city_name = '箕面市'
+    address_prefix = '大阪府箕面市'
+    output_file = 'poster_locations.csv'
+    public_file = 'minoo.csv'
+
+    def start_file(self, file_name):
+        return {'district': 0}
+
+    def parse_line(self, state, line_number, line):
+        match = LOCATION_PATTERN.match(line)
+        if not match:
+            return None
+
+        number = int(match.group(1))
+        rest_text = match.group(2)
+
+        # 番号が1の場合、新しい投票区の開始
+        if number == 1:
+            state['district'] += 1
+
+        # 住所と備考を分離（町名一覧にない住所は最初の1つの空白で分割）
+        split = self.split_address(rest_text)
+        if split is None:
+            address, _, remarks = rest_text.partition(' ')
+        else:
+            address, remarks = split
+        return self.make_record(state['district'], number, address, remarks)
+
+    def build_name(self, district, number, remark):
+        """名称を作成（No.{番号} {備考}）"""
+        return f"No.{number} {remark}" if remark else f"No.{number}"
+
+
+LAYOUT = MinooLayout()
@@ -1,57 +1,24 @@
-import re
-import csv
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from list_parsing.engine import read_lines, write_csv
+from list_parsing.minoo.layout import LAYOUT
+from list_parsing.partitioned_writer import PartitionedCsvWriter
 
 def parse_poster_locations(input_file, output_file):
     """
     選挙ポスター掲示場所一覧表をCSVに変換する
     """
     
-    # CSVの出力データ
-    csv_data = []
-    current_voting_district = 0
-    
-    with open(input_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    for line in lines:
-        line = line.strip()
-        
-        # 一桁の数字＋半角スペースで始まる行を特定
-        match = re.match(r'^(\d+)\s+(.+)$', line)
-        if match:
-            number = int(match.group(1))
-            rest_text = match.group(2)
-            
-            # 番号が1の場合、新しい投票区の開始
-            if number == 1:
-                current_voting_district += 1
-            
-            # 住所と備考を分離（2番目の半角スペースで区切る）
-            parts = rest_text.split(' ', 1)  # 最初の1つの空白で分割
-            if len(parts) >= 2:
-                address = parts[0]
-                remarks = parts[1]
-            else:
-                address = rest_text
-                remarks = ""
-            
-            # 住所に「大阪府箕面市」を冒頭に付加
-            full_address = f"大阪府箕面市{address}"
-            
-            # 名称を作成（No.{番号} {備考}）
-            name = f"No.{number} {remarks}" if remarks else f"No.{number}"
-            
-            # CSVデータに追加（投票区、番号、住所、備考、名称）
-            csv_data.append([current_voting_district, number, full_address, remarks, name])
+    # 行の解析・住所の付加・名称の作成はレイアウトで行う
+    records = list(LAYOUT.parse(input_file, read_lines(input_file)))
+    csv_data = [LAYOUT.to_row(record) for record in records]
+    current_voting_district = csv_data[-1][0] if csv_data else 0
     
     # 統合CSVファイルに出力
-    with open(output_file, 'w', encoding='utf-8', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        # ヘッダー行を書き込み
-        writer.writerow(['投票区', '番号', '住所', '備考', '名称'])
-        # データ行を書き込み
-        writer.writerows(csv_data)
+    write_csv(LAYOUT, records, output_file)
     
     print(f"統合CSV変換完了: {len(csv_data)}件のデータを{output_file}に出力しました")
     print(f"投票区数: {current_voting_district}")
@@ -68,24 +35,24 @@ def create_separate_csv_by_district(csv_data, total_districts):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
     
-    # 投票区ごとにデータを分離
+    # 1回の走査で各行を投票区のファイルに振り分ける
+    writer = PartitionedCsvWriter(
+        lambda district_num: f"{output_dir}/投票区{district_num}.csv",  # ファイル名を生成（投票区{番号}.csv）
+        LAYOUT.fieldnames)
+    with writer:
+        # 該当するデータがない投票区もヘッダーだけのファイルを作成
+        for district_num in range(1, total_districts + 1):
+            writer.create(district_num)
+        for row in csv_data:
+            writer.write(row[0], row)
+    
     for district_num in range(1, total_districts + 1):
-        # 該当する投票区のデータのみを抽出
-        district_data = [row for row in csv_data if row[0] == district_num]
-        
-        # ファイル名を生成（投票区{番号}.csv）
-        filename = f"{output_dir}/投票区{district_num}.csv"
-        
-        # CSVファイルに出力
-        with open(filename, 'w', encoding='utf-8', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            # ヘッダー行を書き込み
-            writer.writerow(['投票区', '番号', '住所', '備考', '名称'])
-            # データ行を書き込み
-            writer.writerows(district_data)
-        
-        print(f"投票区{district_num}: {len(district_data)}件のデータを{filename}に出力")
+        print(f"投票区{district_num}: {writer.counts[district_num]}件のデータを{writer.paths[district_num]}に出力")
+
+def main():
+    """メイン処理"""
+    parse_poster_locations('text.txt', 'poster_locations.csv')
 
 # 実行
 if __name__ == "__main__":
-    parse_poster_locations('text.txt', 'poster_locations.csv')
+    main()
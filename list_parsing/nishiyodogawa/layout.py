@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""西淀川区の掲示場所一覧のレイアウト"""
+
+import re
+
+from list_parsing.engine import Layout
+
+# 投票区行（数字+ピリオドから始まる行）
+DISTRICT_PATTERN = re.compile(r'^(\d+)\.(.+)$')
+
+
+class NishiyodogawaLayout(Layout):
+    """
+    投票区行の後に「備考... 住所」の空白区切りの行が続く
+    （番号は投票区ごとの出現順）
+    """
+
+    city_key = 'nishiyodogawa'
+    city_name = '西淀川区'
+    address_prefix = '大阪府大阪市西淀川区'
+    output_file = 'output/nishiyodogawa_poster_locations.csv'
+    # output/ 以下のCSVは投票区名入りだった頃のもののため、現在の出力と同じ public/ の方と比較する
+    golden_file = '../../public/nishiyodogawa.csv'
+    public_file = 'nishiyodogawa.csv'
+
+    def start_file(self, file_name):
+        return {'district': None, 'number': 1}
+
+    def parse_line(self, state, line_number, line):
+        if not line:
+            return None
+
+        district_match = DISTRICT_PATTERN.match(line)
+        if district_match:
+            state['district'] = district_match.group(1)
+            state['number'] = 1
+            return None
+
+        if state['district'] is None:
+            return None
+
+        split = self.split_address(line, address_first=False)
+        if split is None:
+            # 町名一覧にない住所は最後の部分を住所、それ以外を備考として扱う
+            parts = line.split()
+            split = (parts[-1], ' '.join(parts[:-1]))
+        address, remark = split
+        if not remark:
+            return None
+
+        record = self.make_record(state['district'], state['number'], address, remark)
+        state['number'] += 1
+        return record
+
+
+LAYOUT = NishiyodogawaLayout()
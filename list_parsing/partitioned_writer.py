@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+行を投票区・グループごとのCSVに振り分けて書き出す共通の仕組み
+
+行を1回走査するだけで、各行をキー（投票区番号など）に対応するファイルへ
+順に書き込む。開いたままにするファイル数には上限を設け、上限を超えたら
+最も長く使われていないファイルを閉じる（再度書き込むときは追記で開き直す）。
+"""
+
+import csv
+import os
+from collections import OrderedDict
+
+# 同時に開いておくファイル数の上限
+DEFAULT_MAX_OPEN_FILES = 64
+
+
+class PartitionedCsvWriter:
+    """
+    キーごとのCSVファイルに行を振り分けるライター
+
+    Args:
+        path_for: キーから出力ファイルのパスを返す関数
+        header (list): 各ファイルのヘッダー行（辞書の行はこの列順で書き出す）
+        max_open_files (int): 同時に開いておくファイル数の上限
+    """
+
+    def __init__(self, path_for, header, max_open_files=DEFAULT_MAX_OPEN_FILES):
+        self.path_for = path_for
+        self.header = list(header)
+        self.max_open_files = max(1, max_open_files)
+        # キー → 出力ファイルのパス・書き込んだ行数（最初に出現した順）
+        self.paths = {}
+        self.counts = {}
+        self._open = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _writer_for(self, key):
+        entry = self._open.get(key)
+        if entry is not None:
+            self._open.move_to_end(key)
+            return entry[1]
+
+        if len(self._open) >= self.max_open_files:
+            _, (oldest, _) = self._open.popitem(last=False)
+            oldest.close()
+
+        if key in self.paths:
+            # 上限のため一度閉じたファイルは追記で開き直す
+            f = open(self.paths[key], 'a', newline='', encoding='utf-8')
+            writer = csv.writer(f)
+        else:
+            path = self.path_for(key)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = open(path, 'w', newline='', encoding='utf-8')
+            writer = csv.writer(f)
+            writer.writerow(self.header)
+            self.paths[key] = path
+            self.counts[key] = 0
+        self._open[key] = (f, writer)
+        return writer
+
+    def create(self, key):
+        """行がなくてもヘッダーだけのファイルを作成する"""
+        self._writer_for(key)
+
+    def write(self, key, row):
+        """1行をキーに対応するファイルに書き込む"""
+        if isinstance(row, dict):
+            row = [row.get(field, '') for field in self.header]
+        self._writer_for(key).writerow(row)
+        self.counts[key] += 1
+
+    def close(self):
+        """開いているファイルを全て閉じる"""
+        while self._open:
+            _, (f, _) = self._open.popitem(last=False)
+            f.close()
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+吹田市の掲示場所一覧のレイアウト
+
+投票区101-103（text copy.txt）は「番号 設置場所 住所」の行形式、
+104以降（text.txt）は設置場所と所在地が別々のセクションに分かれた形式。
+"""
+
+import re
+
+from list_parsing.diagnostics import NULL_DIAGNOSTICS
+from list_parsing.engine import Layout
+from text_normalize import to_halfwidth_digits
+
+# 行の分類に使うパターン
+DISTRICT_PATTERN = re.compile(r'第([０-９\d]+)投票区')
+PAGE_NUMBER_PATTERN = re.compile(r'^\d+$')
+ADDRESS_SUFFIX_PATTERN = re.compile(r'[丁目町番号－]\d*$')
+ITEMS_HEADER = '番号 設 置 場 所'
+ADDRESS_HEADER = '所 在 地'
+
+# 設置場所テキストの整形に使うパターン
+ITEMS_HEADER_PATTERN = re.compile(r'番号\s*設\s*置\s*場\s*所\s*')
+TRAILING_PAGE_NUMBER_PATTERN = re.compile(r'\s+\d+\s*$')
+TRAILING_ADDRESS_HEADER_PATTERN = re.compile(r'\s+所\s*在\s*地\s*$')
+TRAILING_DISTRICT_PATTERN = re.compile(r'\s+第[０-９\d]+投票区.*$')
+ITEM_PATTERN = re.compile(r'(\d+)\s+(.+?)(?=\s+\d+|$)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class _ItemsSection:
+    """「番号 設 置 場 所」から次の区切りまでの設置場所データ"""
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.combined_text = None
+
+class _DistrictEntry:
+    """投票区名の出現1件分"""
+
+    def __init__(self, district_num, district_line):
+        self.district_num = district_num
+        self.district_line = district_line
+        # 投票区名より後で最も近い設置場所データ
+        self.section = None
+        # 投票区名と同じ行から始まる設置場所データ（後続の行に見つからない場合に使用）
+        self.own_section = None
+
+class SuitaSectionParser:
+    """
+    吹田市のテキストを1回の走査で解析する状態機械
+
+    各行を 投票区名・設置場所ヘッダー・所在地ヘッダー・ページ番号・データ に分類し、
+    投票区ごとの設置場所データと所在地セクションを同時に組み立てる。
+    設置場所データの区切りはどのセクションでも共通なので、開いているセクションは
+    1つのバッファを共有し、次の区切り行でまとめて閉じる。
+    """
+
+    def __init__(self, diagnostics=NULL_DIAGNOSTICS):
+        self.diagnostics = diagnostics
+        self._districts = []
+        self._pending = []
+        self._buffer = []
+        self._open_sections = []
+        self._address_sections = []
+        self._current_addresses = None
+
+    def feed(self, line):
+        """1行を処理する"""
+        stripped = line.strip()
+        district_match = DISTRICT_PATTERN.search(stripped)
+        is_address_header = stripped.startswith(ADDRESS_HEADER) or stripped.endswith(ADDRESS_HEADER)
+
+        # 設置場所データ: 次の投票区名、所在地、ページ番号で終了
+        if self._open_sections:
+            if district_match or is_address_header or PAGE_NUMBER_PATTERN.match(stripped):
+                self._close_sections(stripped, district_match)
+            else:
+                self._buffer.append(stripped)
+
+        # 設置場所ヘッダー: それより前の行で待っている投票区に対応付ける
+        own_section = None
+        if ITEMS_HEADER in line:
+            if self._open_sections:
+                offset = len(self._buffer) - 1
+            else:
+                self._buffer = [stripped]
+                offset = 0
+            own_section = _ItemsSection(offset)
+            self._open_sections.append(own_section)
+            for entry in self._pending:
+                entry.section = own_section
+            self._pending = []
+
+        # 投票区名: この行より後の設置場所ヘッダーを待つ
+        if district_match:
+            district_num = to_halfwidth_digits(district_match.group(1))
+            entry = _DistrictEntry(district_num, line)
+            entry.own_section = own_section
+            self._districts.append(entry)
+            self._pending.append(entry)
+
+        # 所在地セクション
+        if self._current_addresses is not None:
+            if is_address_header or district_match or stripped.startswith(ITEMS_HEADER):
+                self._close_addresses()
+            elif stripped and not PAGE_NUMBER_PATTERN.match(stripped):
+                self._current_addresses.append(stripped)
+        if line.startswith(ADDRESS_HEADER) or line.endswith(ADDRESS_HEADER):
+            self._current_addresses = []
+
+    def _close_sections(self, last_line, next_district_match):
+        """開いている設置場所データを区切り行で閉じる"""
+        tail = []
+        # 区切り行に投票区名がある場合は、その投票区名より前の部分も含める
+        if last_line is not None and next_district_match:
+            before_next_district = last_line[:next_district_match.start()].strip()
+            if before_next_district and not PAGE_NUMBER_PATTERN.match(before_next_district):
+                tail = [before_next_district]
+
+        for section in self._open_sections:
+            section.combined_text = ' '.join(self._buffer[section.offset:] + tail)
+        self._open_sections = []
+        self._buffer = []
+
+    def _close_addresses(self):
+        if self._current_addresses:
+            self._address_sections.append(self._current_addresses)
+        self._current_addresses = None
+
+    def finish(self):
+        """
+        全行の処理後に呼び出す
+
+        Returns:
+            tuple: (投票区ごとの設置場所データ, 所在地セクションのリスト)
+        """
+        if self._open_sections:
+            self._close_sections(None, None)
+        if self._current_addresses is not None:
+            self._close_addresses()
+
+        districts_data = []
+        for entry in self._districts:
+            items = self._items_for(entry)
+            if items:
+                districts_data.append((entry.district_num, items))
+                print(f"投票区 {entry.district_num}: {len(items)}件の設置場所を抽出")
+            else:
+                self.diagnostics.warn('missing_items', f"警告: 投票区 {entry.district_num}: 設置場所データが見つかりません",
+                                      district=entry.district_num)
+
+        for i, addresses in enumerate(self._address_sections, 1):
+            print(f"住所セクション {i}: {len(addresses)}件の住所を抽出")
+
+        return districts_data, self._address_sections
+
+    @staticmethod
+    def _items_for(entry):
+        """投票区に対応する設置場所のリストを求める"""
+        if entry.section is not None:
+            return extract_items_from_text(entry.section.combined_text)
+
+        # 後続の行にヘッダーがない場合は、投票区名と同じ行の前後を確認する
+        if entry.own_section is None:
+            return []
+        district_marker = f'第{entry.district_num}投票区'
+        district_pos = entry.district_line.find(district_marker)
+        after_district = entry.district_line[district_pos + len(district_marker):]
+        before_district = entry.district_line[:district_pos]
+        if ITEMS_HEADER not in after_district and ITEMS_HEADER not in before_district:
+            return []
+
+        combined_text = entry.own_section.combined_text
+        district_pos = combined_text.find(district_marker)
+        if district_pos != -1:
+            # 投票区名より前の部分を取得（行末投票区の場合）
+            before_district = combined_text[:district_pos]
+            # 投票区名より後の部分を取得
+            after_district = combined_text[district_pos + len(district_marker):]
+            
+            # 前の部分に「番号 設 置 場 所」があれば前の部分を使用（行末投票区）
+            if ITEMS_HEADER in before_district:
+                combined_text = before_district
+            # そうでなければ後の部分を使用
+            elif ITEMS_HEADER in after_district:
+                combined_text = after_district
+        
+        return extract_items_from_text(combined_text)
+
+def parse_suita_sections(lines, diagnostics=NULL_DIAGNOSTICS):
+    """
+    104以降の投票区のテキストを1回の走査で解析する
+
+    Returns:
+        tuple: (投票区ごとの設置場所データ, 所在地セクションのリスト)
+    """
+    parser = SuitaSectionParser(diagnostics)
+    for line in lines:
+        parser.feed(line)
+    return parser.finish()
+
+
+def extract_items_from_text(text):
+    """
+    テキストから番号と設置場所のペアを抽出する
+    """
+    items = []
+    
+    # 「番号 設 置 場 所」を除去
+    text = ITEMS_HEADER_PATTERN.sub('', text)
+    
+    # 末尾の不要な文字列を除去
+    text = TRAILING_PAGE_NUMBER_PATTERN.sub('', text)  # ページ番号
+    text = TRAILING_ADDRESS_HEADER_PATTERN.sub('', text)  # 所在地
+    text = TRAILING_DISTRICT_PATTERN.sub('', text)  # 次の投票区名
+    
+    # 番号と設置場所のペアを抽出
+    matches = ITEM_PATTERN.findall(text)
+    
+    for number_str, remark in matches:
+        number = int(number_str)
+        remark = WHITESPACE_PATTERN.sub(' ', remark).strip()
+        
+        if remark:
+            items.append((number, remark))
+    
+    return items
+
+
+class SuitaLayout(Layout):
+    city_key = 'suita'
+    city_name = '吹田市'
+    address_prefix = '大阪府吹田市'
+    input_files = ('text copy.txt', 'text.txt')
+    output_file = 'suita_poster_locations_unified.csv'
+    public_file = 'suita.csv'
+
+    # 投票区101-103（text copy.txt）は1行に 番号・設置場所・住所 が並ぶ
+
+    def start_file(self, file_name):
+        return {'district': None}
+
+    def parse_line(self, state, line_number, line):
+        if not line:
+            return None
+
+        # 投票区の行を検出（全角・半角対応）
+        district_match = DISTRICT_PATTERN.match(line)
+        if district_match:
+            state['district'] = to_halfwidth_digits(district_match.group(1))
+            return None
+
+        # ヘッダー行をスキップ
+        if '番号 設 置 場 所 所 在 地' in line or line.startswith('番号') or not state['district']:
+            return None
+
+        # 番号の後は「設置場所 住所」の並び
+        fields = line.split(None, 1)
+        if len(fields) < 2:
+            return None
+        split = self.split_address(fields[1], address_first=False)
+        if split is not None and split[1]:
+            address, location = split
+            return self.make_record(state['district'], fields[0], address, location)
+
+        # 町名一覧にない住所は、丁目・町・番などで終わる部分を後ろから探す
+        parts = line.split()
+        if len(parts) < 3:
+            return None
+        address_start = len(parts) - 1
+        for i in range(len(parts) - 1, -1, -1):
+            if ADDRESS_SUFFIX_PATTERN.search(parts[i]) or parts[i].endswith('号'):
+                address_start = i
+                break
+
+        # 設置場所は番号の次から住所の前まで
+        location = ' '.join(parts[1:address_start])
+        address = ' '.join(parts[address_start:])
+        return self.make_record(state['district'], parts[0], address, location)
+
+    def parse(self, file_name, lines):
+        if file_name == 'text copy.txt':
+            print("=== 投票区101-103のデータ抽出開始 ===")
+            records = list(super().parse(file_name, lines))
+            for district in ['101', '102', '103']:
+                count = len([r for r in records if r.district == district])
+                print(f"投票区{district}: {count}件")
+            return records
+
+        # 104以降の投票区: 設置場所データと所在地セクションを1回の走査で抽出し、順序で対応付け
+        districts_data, address_sections = parse_suita_sections(lines, self.diagnostics)
+        with self.diagnostics.phase('match'):
+            return self.match_addresses(districts_data, address_sections)
+
+    def match_addresses(self, districts_data, address_sections):
+        """投票区と住所セクションを順序で対応付け"""
+        records = []
+
+        print(f"\n=== 対応付け結果 ===")
+        print(f"投票区数: {len(districts_data)}")
+        print(f"住所セクション数: {len(address_sections)}")
+
+        for i, (district_num, items) in enumerate(districts_data):
+            # 対応する住所セクションを取得
+            if i < len(address_sections):
+                addresses = address_sections[i]
+            else:
+                addresses = []
+                self.diagnostics.warn('missing_address_section',
+                                      f"警告: 投票区{district_num}に対応する住所セクションがありません",
+                                      district=district_num)
+
+            # 件数チェック
+            if len(items) == len(addresses):
+                print(f"投票区 {district_num}: {len(items)}件の設置場所が正常に処理されました")
+            else:
+                self.diagnostics.warn('count_mismatch',
+                                      f"警告: 投票区{district_num}で設置場所({len(items)}件)と住所({len(addresses)}件)の数が一致しません",
+                                      district=district_num, items=len(items), addresses=len(addresses))
+
+            for (number, remark), address in zip(items, addresses):
+                records.append(self.make_record(district_num, number, address, remark))
+
+        return records
+
+    def finalize(self, records):
+        # 投票区番号・番号でソート
+        records.sort(key=lambda r: (int(r.district), int(r.number)))
+        return records
+
+    def full_address(self, address):
+        # 101-103の住所には「大阪府」から始まるものがある
+        if address.startswith('大阪府'):
+            return address
+        return f"{self.address_prefix}{address}"
+
+
+LAYOUT = SuitaLayout()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+PDFから抽出したテキストファイルの行の読み込み
+
+ファイルをメモリマップし、行は必要になったときにデコードして返すため、
+文書全体の文字列や全行のリストを作らない。行番号で参照した場合だけ、
+各行の開始位置（1行8バイト）の索引を作る。
+
+行の区切り方は content.split('\\n') と同じ（末尾の改行の後の空行も1行として返す）。
+CRLF の行末の CR は除去する。
+
+    with MappedLines('text.txt') as lines:
+        for line in lines:          # 先頭から順に読む
+            ...
+        lines[120], lines[-1]       # 行番号（0始まり）で参照
+"""
+
+import mmap
+import os
+from array import array
+
+
+class MappedLines:
+    """メモリマップしたテキストファイルの行"""
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # 空のファイルはメモリマップできない
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._offsets = None
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b''
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _decode(self, start, end):
+        line = self._data[start:end].decode(self.encoding)
+        return line[:-1] if line.endswith('\r') else line
+
+    def __iter__(self):
+        data = self._data
+        start = 0
+        end = data.find(b'\n')
+        while end != -1:
+            yield self._decode(start, end)
+            start = end + 1
+            end = data.find(b'\n', start)
+        yield self._decode(start, len(data))
+
+    def _index(self):
+        """各行の開始位置の索引（最初に行番号で参照したときに作る）"""
+        if self._offsets is None:
+            offsets = array('Q', [0])
+            data = self._data
+            end = data.find(b'\n')
+            while end != -1:
+                offsets.append(end + 1)
+                end = data.find(b'\n', end + 1)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self._index())
+
+    def __getitem__(self, index):
+        offsets = self._index()
+        if index < 0:
+            index += len(offsets)
+        if not 0 <= index < len(offsets):
+            raise IndexError(f"行番号が範囲外です: {index}")
+        start = offsets[index]
+        end = offsets[index + 1] - 1 if index + 1 < len(offsets) else len(self._data)
+        return self._decode(start, end)
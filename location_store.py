@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全市区町村の掲示場所を1つのプロセスでまとめて保持するストア
+
+掲示場所は行番号で管理し、チェック状態・最終更新日時などは行番号で引く
+配列（array）に、文字列はリストに持つ。市キー・投票区番号・場所番号は
+intern した文字列を共有するため、行ごとの辞書やオブジェクトは作らない。
+
+    store = LocationStore.from_export('poster-data-export-2025-07-10.json')
+    location = store.get('suita', '101', '1')       # (市, 投票区, 番号) で O(1)
+    for location in store.iter_district('suita', '101'):
+        ...
+
+使い方:
+    python location_store.py                              # public/ のCSVから作成
+    python location_store.py --export poster-data-export-2025-07-10.json --lookup suita 101 1
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from array import array
+
+from columnar_export import NULL_TIMESTAMP, epoch_ms_to_datetime, iso_to_epoch_ms
+from export_stream import open_export
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(ROOT_DIR, 'public')
+
+# 行から読み出せる列
+COLUMNS = (
+    'city_key', 'city_name', 'district', 'number', 'name', 'address', 'remark',
+    'is_checked', 'last_updated', 'comment_count',
+)
+
+
+def _epoch_ms(value):
+    if not value or not isinstance(value, str):
+        return NULL_TIMESTAMP
+    return iso_to_epoch_ms(value)
+
+
+class LocationRef:
+    """ストア内の1行を指す軽量な参照（値は参照時にストアから読む）"""
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    @property
+    def city_key(self):
+        return self.store.city_keys[self.store.district_city[self.store.row_district[self.row]]]
+
+    @property
+    def city_name(self):
+        return self.store.city_names[self.store.district_city[self.store.row_district[self.row]]]
+
+    @property
+    def district(self):
+        return self.store.district_keys[self.store.row_district[self.row]]
+
+    @property
+    def number(self):
+        return self.store.numbers[self.row]
+
+    @property
+    def name(self):
+        return self.store.names[self.row]
+
+    @property
+    def address(self):
+        return self.store.addresses[self.row]
+
+    @property
+    def remark(self):
+        return self.store.remarks[self.row]
+
+    @property
+    def is_checked(self):
+        return bool(self.store.checked[self.row])
+
+    @property
+    def last_updated(self):
+        """最終更新日時（UTCのdatetime、ない場合は None）"""
+        return epoch_ms_to_datetime(self.store.last_updated[self.row])
+
+    @property
+    def comment_count(self):
+        return self.store.comment_counts[self.row]
+
+    @property
+    def key(self):
+        return self.city_key, self.district, self.number
+
+    def __repr__(self):
+        return f"LocationRef({self.city_key!r}, {self.district!r}, {self.number!r}, {self.name!r})"
+
+
+class LocationStore:
+    """
+    (市キー, 投票区番号, 場所番号) で引ける掲示場所のストア
+
+    市・投票区は出現順の番号で管理する。投票区ごとに行番号の配列を持つため、
+    投票区内の掲示場所は追加した順に取り出せる。
+    """
+
+    def __init__(self):
+        # 市番号ごと
+        self.city_keys = []
+        self.city_names = []
+        self._city_index = {}
+        # 投票区番号ごと
+        self.district_city = array('H')
+        self.district_keys = []
+        self._district_index = {}
+        self._district_rows = []
+        # 行番号ごと
+        self.row_district = array('I')
+        self.numbers = []
+        self.names = []
+        self.addresses = []
+        self.remarks = []
+        self.checked = array('b')
+        self.last_updated = array('q')
+        self.comment_counts = array('I')
+        # (市キー, 投票区番号, 場所番号) → 行番号
+        self._index = {}
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __contains__(self, key):
+        return self._key(*key) in self._index
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield LocationRef(self, row)
+
+    @staticmethod
+    def _key(city_key, district, number):
+        return city_key, str(district), str(number)
+
+    def add_city(self, city_key, city_name=None):
+        """市を登録して市番号を返す（登録済みならその番号）"""
+        city_index = self._city_index.get(city_key)
+        if city_index is None:
+            city_key = sys.intern(city_key)
+            city_index = self._city_index[city_key] = len(self.city_keys)
+            self.city_keys.append(city_key)
+            self.city_names.append(city_name or city_key)
+        elif city_name:
+            self.city_names[city_index] = city_name
+        return city_index
+
+    def _district_for(self, city_index, district):
+        key = (city_index, district)
+        district_index = self._district_index.get(key)
+        if district_index is None:
+            district_index = self._district_index[key] = len(self.district_keys)
+            self.district_city.append(city_index)
+            self.district_keys.append(sys.intern(district))
+            self._district_rows.append(array('I'))
+        return district_index
+
+    def add(self, city_key, district, number, name='', address='', remark='',
+            is_checked=False, last_updated=NULL_TIMESTAMP, comment_count=0):
+        """
+        掲示場所を追加する（同じキーが登録済みの場合は上書き）
+
+        Returns:
+            int: 行番号
+        """
+        key = self._key(city_key, district, number)
+        row = self._index.get(key)
+        if row is not None:
+            self.names[row] = name
+            self.addresses[row] = address
+            self.remarks[row] = remark
+            self.checked[row] = 1 if is_checked else 0
+            self.last_updated[row] = last_updated
+            self.comment_counts[row] = comment_count
+            return row
+
+        district_index = self._district_for(self.add_city(city_key), key[1])
+        row = len(self.numbers)
+        self._index[(self.city_keys[self.district_city[district_index]],
+                     self.district_keys[district_index], sys.intern(key[2]))] = row
+        self._district_rows[district_index].append(row)
+        self.row_district.append(district_index)
+        self.numbers.append(sys.intern(key[2]))
+        self.names.append(name)
+        self.addresses.append(address)
+        self.remarks.append(remark)
+        self.checked.append(1 if is_checked else 0)
+        self.last_updated.append(last_updated)
+        self.comment_counts.append(comment_count)
+        return row
+
+    def row_of(self, city_key, district, number):
+        """行番号を返す（ない場合は None）"""
+        return self._index.get(self._key(city_key, district, number))
+
+    def get(self, city_key, district, number):
+        """掲示場所の参照を返す（ない場合は None）"""
+        row = self.row_of(city_key, district, number)
+        return None if row is None else LocationRef(self, row)
+
+    def set_checked(self, city_key, district, number, is_checked, last_updated=None):
+        """チェック状態を更新する（last_updated はISO形式の文字列またはエポックミリ秒）"""
+        row = self._index[self._key(city_key, district, number)]
+        self.checked[row] = 1 if is_checked else 0
+        if last_updated is not None:
+            self.last_updated[row] = last_updated if isinstance(last_updated, int) else _epoch_ms(last_updated)
+
+    def districts(self, city_key):
+        """市内の投票区番号（追加した順）"""
+        city_index = self._city_index[city_key]
+        return [self.district_keys[i] for i, c in enumerate(self.district_city) if c == city_index]
+
+    def district_rows(self, city_key, district):
+        """投票区内の行番号の配列（投票区がない場合は空）"""
+        city_index = self._city_index.get(city_key)
+        district_index = self._district_index.get((city_index, str(district)))
+        return array('I') if district_index is None else self._district_rows[district_index]
+
+    def iter_district(self, city_key, district):
+        """投票区内の掲示場所を順に返す"""
+        for row in self.district_rows(city_key, district):
+            yield LocationRef(self, row)
+
+    def iter_columns(self, *columns, rows=None):
+        """
+        指定した列の値をタプルで返す（行ごとの辞書や参照は作らない）
+
+        Args:
+            columns: COLUMNS の列名
+            rows: 対象の行番号（省略時は全行）
+        """
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            raise ValueError(f"不明な列です: {', '.join(unknown)}")
+
+        district_city = self.district_city
+        row_district = self.row_district
+        getters = {
+            'city_key': lambda row: self.city_keys[district_city[row_district[row]]],
+            'city_name': lambda row: self.city_names[district_city[row_district[row]]],
+            'district': lambda row: self.district_keys[row_district[row]],
+            'number': self.numbers.__getitem__,
+            'name': self.names.__getitem__,
+            'address': self.addresses.__getitem__,
+            'remark': self.remarks.__getitem__,
+            'is_checked': lambda row: bool(self.checked[row]),
+            'last_updated': self.last_updated.__getitem__,
+            'comment_count': self.comment_counts.__getitem__,
+        }
+        selected = [getters[column] for column in columns]
+        for row in (range(len(self)) if rows is None else rows):
+            yield tuple(getter(row) for getter in selected)
+
+    def load_csv(self, csv_path, city_key, city_name=None):
+        """
+        解析結果のCSV（投票区,番号,住所,備考,名称）を読み込む
+
+        茨木市の全件CSVのように備考の列名が「設置説明」のものも読み込める。
+
+        Returns:
+            int: 読み込んだ件数
+        """
+        self.add_city(city_key, city_name)
+        count = 0
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            column = {name: i for i, name in enumerate(header)}
+            remark_column = column.get('備考', column.get('設置説明'))
+            for row in reader:
+                if not row:
+                    continue
+                self.add(
+                    city_key, row[column['投票区']], row[column['番号']],
+                    name=row[column['名称']], address=row[column['住所']],
+                    remark=row[remark_column] if remark_column is not None else '',
+                )
+                count += 1
+        return count
+
+    def load_export(self, json_file_path, streaming=False):
+        """
+        エクスポートJSONの掲示場所とチェック状態を読み込む
+
+        Returns:
+            str: エクスポート日時
+        """
+        with open_export(json_file_path, streaming=streaming) as export:
+            for city_key, city_name, district_key, district_data in export.iter_districts():
+                self.add_city(city_key, city_name)
+                for location in district_data.get('locations', []):
+                    self.add(
+                        city_key, district_key, location.get('number', ''),
+                        name=location.get('name', ''),
+                        address=location.get('address', ''),
+                        remark=location.get('remark', ''),
+                        is_checked=location.get('isChecked', False),
+                        last_updated=_epoch_ms(location.get('lastUpdated')),
+                        comment_count=len(location.get('comments') or []),
+                    )
+            return export.timestamp
+
+    @classmethod
+    def from_export(cls, json_file_path, streaming=False):
+        """エクスポートJSONからストアを作る"""
+        store = cls()
+        store.load_export(json_file_path, streaming=streaming)
+        return store
+
+    @classmethod
+    def from_public_csvs(cls, public_dir=PUBLIC_DIR):
+        """Webアプリが読み込む public/<市>.csv からストアを作る"""
+        from list_parsing.engine import discover_cities, load_layout
+
+        store = cls()
+        for city_key in discover_cities():
+            layout = load_layout(city_key)
+            csv_path = os.path.join(public_dir, layout.public_file or f'{city_key}.csv')
+            if os.path.isfile(csv_path):
+                store.load_csv(csv_path, city_key, layout.city_name)
+        return store
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='全市区町村の掲示場所をまとめて読み込む')
+    parser.add_argument('--export', help='エクスポートJSON（省略時は public/ のCSV）')
+    parser.add_argument('--stream', action='store_true', help='エクスポートを投票区ごとに読み込む')
+    parser.add_argument('--lookup', nargs=3, metavar=('CITY', 'DISTRICT', 'NUMBER'),
+                        help='指定した掲示場所を表示する（例: suita 101 1）')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.export:
+        store = LocationStore.from_export(args.export, streaming=args.stream)
+    else:
+        store = LocationStore.from_public_csvs()
+    elapsed = time.perf_counter() - start
+
+    print(f"掲示場所: {len(store)}件 / 市区町村: {len(store.city_keys)} / 投票区: {len(store.district_keys)} "
+          f"(読み込み {elapsed:.3f}秒)")
+    for city_index, city_key in enumerate(store.city_keys):
+        rows = sum(len(store.district_rows(city_key, district)) for district in store.districts(city_key))
+        print(f"  {store.city_names[city_index]} ({city_key}): {rows}件")
+
+    if args.lookup:
+        location = store.get(*args.lookup)
+        if location is None:
+            print(f"エラー: 掲示場所が見つかりません: {' '.join(args.lookup)}")
+            return
+        status = "チェック済み" if location.is_checked else "未チェック"
+        print(f"\n{location.city_name} 投票区{location.district} 番号{location.number}: {location.name.strip()}")
+        print(f"  住所: {location.address}")
+        print(f"  状態: {status} / コメント: {location.comment_count}件")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全市区町村の掲示場所一覧をまとめて解析するパイプライン
+
+list_parsing/<市>/ ディレクトリを探し、各市区町村の解析をプロセスプールで
+並列に実行する。work.py がある市区町村はその main() を市区町村ディレクトリで
+実行し（投票区ごとのCSVなども作成）、ない場合は共通エンジンで統合CSVだけを出力する。
+最後にWebアプリが読み込む public/<市>.csv を更新する。
+
+使い方:
+    python parse_all_cities.py                 # 全市区町村
+    python parse_all_cities.py suita minoo     # 指定した市区町村だけ
+    python parse_all_cities.py --no-public     # public/ は更新しない
+"""
+
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from list_parsing.engine import city_dir, discover_cities, load_layout, master_csv_path, run_city
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(ROOT_DIR, 'public')
+
+
+def count_csv_rows(csv_path):
+    """CSVのデータ行数（ヘッダーを除く）"""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """一時的に作業ディレクトリを変更する（Python 3.11 の contextlib.chdir と同じ）"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def parse_one(city_key):
+    """
+    1市区町村を解析する（ワーカープロセスで実行）
+
+    Returns:
+        tuple: (市キー, 成否, 処理秒数, 件数, 解析時の出力メッセージ)
+    """
+    # 並列実行時に各市区町村のメッセージが混ざらないよう取り込んで返す
+    log = io.StringIO()
+    start = time.perf_counter()
+    rows = 0
+    with contextlib.redirect_stdout(log):
+        try:
+            layout = load_layout(city_key)
+            if os.path.isfile(os.path.join(city_dir(city_key), 'work.py')):
+                # work.py は相対パスでファイルを開くため、市区町村ディレクトリで実行する
+                with working_directory(city_dir(city_key)):
+                    importlib.import_module(f'list_parsing.{city_key}.work').main()
+            else:
+                run_city(city_key)
+            rows = count_csv_rows(master_csv_path(layout))
+            success = True
+        except Exception as e:
+            print(f"エラー: {e}")
+            success = False
+    elapsed = time.perf_counter() - start
+    return city_key, success, elapsed, rows, log.getvalue()
+
+
+def parse_all_cities(cities, workers=None):
+    """
+    複数の市区町村を並列に解析する
+
+    Returns:
+        list: 市区町村ごとの parse_one の結果（市キー順）
+    """
+    if workers is None:
+        workers = min(len(cities), os.cpu_count() or 1) or 1
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_one, city_key) for city_key in cities]
+        for future in as_completed(futures):
+            city_key, success, elapsed, rows, _ = result = future.result()
+            status = "完了" if success else "失敗"
+            print(f"[{status}] {city_key}: {rows}件 ({elapsed:.2f}秒)")
+            results.append(result)
+
+    results.sort(key=lambda result: result[0])
+    return results
+
+
+def update_public_files(results):
+    """
+    解析に成功した市区町村の public/<市>.csv を更新する
+
+    Returns:
+        list: 更新したファイルのパス
+    """
+    updated = []
+    for city_key, success, _, _, _ in results:
+        layout = load_layout(city_key)
+        if not success or not layout.public_file:
+            continue
+        public_path = os.path.join(PUBLIC_DIR, layout.public_file)
+        shutil.copyfile(master_csv_path(layout), public_path)
+        updated.append(public_path)
+    return updated
+
+
+def print_summary(results, total_elapsed):
+    """解析結果のサマリーを表示"""
+    failed = [result for result in results if not result[1]]
+
+    print("\n=== 解析結果 ===")
+    for city_key, success, elapsed, rows, _ in results:
+        status = "成功" if success else "失敗"
+        print(f"  {city_key:<16} {status} {rows:>6}件 {elapsed:>7.2f}秒")
+    print(f"合計: {sum(result[3] for result in results)}件")
+    if results:
+        slowest = max(results, key=lambda result: result[2])
+        print(f"最も時間がかかった市区町村: {slowest[0]} ({slowest[2]:.2f}秒)")
+    print(f"全体の処理時間: {total_elapsed:.2f}秒")
+
+    for city_key, _, _, _, log in failed:
+        print(f"\n失敗: {city_key}")
+        print(log.rstrip())
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='全市区町村の掲示場所一覧をまとめて解析')
+    parser.add_argument('cities', nargs='*', help='対象の市区町村（省略時は list_parsing/ 以下の全て）')
+    parser.add_argument('-j', '--workers', type=int, help='並列数（省略時は市区町村数とCPUコア数の小さい方）')
+    parser.add_argument('--no-public', action='store_true', help='public/ のCSVを更新しない')
+    args = parser.parse_args()
+
+    cities = args.cities or discover_cities()
+    if not cities:
+        print("エラー: 解析対象の市区町村が見つかりません。")
+        return
+
+    print(f"対象の市区町村: {', '.join(cities)}")
+    print()
+
+    start = time.perf_counter()
+    results = parse_all_cities(cities, args.workers)
+    if not args.no_public:
+        for public_path in update_public_files(results):
+            print(f"更新: {os.path.relpath(public_path, ROOT_DIR)}")
+    print_summary(results, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
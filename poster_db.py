@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+poster_states テーブル（server.js の initDatabase で作成）への接続・一括書き込み・読み出し
+
+接続先は PostgreSQL の接続URL（postgres:// / postgresql://）か、ローカルでの確認用の
+SQLite のファイルパス。PostgreSQL には psycopg2 が必要（使うときだけ読み込む）。
+
+行の形はサーバーと同じ:
+    city, district_id, location_id（投票区全体は NULL）, is_checked,
+    memo（コメントの配列を JSON.stringify した文字列、なしは空文字）,
+    updated_at（タイムゾーンなしのUTC）
+"""
+
+import io
+import json
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+TABLE_NAME = 'poster_states'
+COLUMNS = ('city', 'district_id', 'location_id', 'is_checked', 'memo', 'updated_at')
+DEFAULT_BATCH_SIZE = 5000
+# 読み出し時に一度に取得する行数
+DEFAULT_FETCH_SIZE = 2000
+
+# 一括書き込みの一時テーブル
+STAGING_TABLE = 'poster_states_load'
+# メモの修復の一時テーブル
+REPAIR_TABLE = 'poster_states_repair'
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS poster_states (
+  id SERIAL PRIMARY KEY,
+  city VARCHAR(20) NOT NULL,
+  district_id VARCHAR(10) NOT NULL,
+  location_id VARCHAR(10),
+  is_checked BOOLEAN DEFAULT FALSE,
+  memo TEXT DEFAULT '',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE(city, district_id, location_id)
+)
+"""
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS poster_states (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  city VARCHAR(20) NOT NULL,
+  district_id VARCHAR(10) NOT NULL,
+  location_id VARCHAR(10),
+  is_checked BOOLEAN DEFAULT FALSE,
+  memo TEXT DEFAULT '',
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE(city, district_id, location_id)
+)
+"""
+
+# 掲示場所の行は一意制約で更新、投票区全体の行（location_id が NULL で一意制約が効かない）は
+# 既存の行の更新と、ない行の追加に分ける
+_MERGE_LOCATIONS = f"""
+INSERT INTO {TABLE_NAME} (city, district_id, location_id, is_checked, memo, updated_at)
+SELECT city, district_id, location_id, is_checked, memo, updated_at FROM {STAGING_TABLE}
+WHERE location_id IS NOT NULL
+ON CONFLICT (city, district_id, location_id) DO UPDATE SET
+  is_checked = excluded.is_checked,
+  memo = excluded.memo,
+  updated_at = excluded.updated_at
+"""
+
+_UPDATE_DISTRICTS = f"""
+UPDATE {TABLE_NAME} SET
+  is_checked = s.is_checked,
+  memo = s.memo,
+  updated_at = s.updated_at
+FROM {STAGING_TABLE} AS s
+WHERE s.location_id IS NULL AND {TABLE_NAME}.location_id IS NULL
+  AND {TABLE_NAME}.city = s.city AND {TABLE_NAME}.district_id = s.district_id
+"""
+
+_INSERT_DISTRICTS = f"""
+INSERT INTO {TABLE_NAME} (city, district_id, location_id, is_checked, memo, updated_at)
+SELECT s.city, s.district_id, NULL, s.is_checked, s.memo, s.updated_at FROM {STAGING_TABLE} AS s
+WHERE s.location_id IS NULL AND NOT EXISTS (
+  SELECT 1 FROM {TABLE_NAME} AS p
+  WHERE p.location_id IS NULL AND p.city = s.city AND p.district_id = s.district_id
+)
+"""
+
+# 市ごとの行を投票区の順に読む（整数の投票区は length → 文字列の順で数値の順になる）
+_SELECT_CITY_STATES = f"""
+SELECT district_id, location_id, is_checked, memo, updated_at FROM {TABLE_NAME}
+WHERE city = {{placeholder}}
+ORDER BY length(district_id), district_id, id
+"""
+
+# メモのある行を id の順に読む（前回の最後の id より後を fetch_size 行）
+_SELECT_MEMOS = f"""
+SELECT id, memo, updated_at FROM {TABLE_NAME}
+WHERE id > {{placeholder}} AND memo IS NOT NULL AND memo != ''
+ORDER BY id
+LIMIT {{placeholder}}
+"""
+
+# 読み出してから変更されていない行だけを書き換える（updated_at は変えない）
+_APPLY_REPAIRS = f"""
+UPDATE {TABLE_NAME} SET memo = r.new_memo
+FROM {REPAIR_TABLE} AS r
+WHERE {TABLE_NAME}.id = r.id AND {TABLE_NAME}.memo = r.old_memo
+"""
+
+
+def memo_to_json(comments):
+    """コメントの配列をサーバーと同じ形（JSON.stringify）の文字列にする"""
+    if not comments:
+        return ''
+    return json.dumps(comments, ensure_ascii=False, separators=(',', ':'))
+
+
+def _is_truthy(value):
+    """JavaScript の真偽値の判定"""
+    return not (value is None or value is False or value == '' or (type(value) in (int, float) and value == 0))
+
+
+def memo_value_to_comments(value, fallback_timestamp):
+    """APIの memos の値をアプリのエクスポートと同じく（配列でなければ1件のコメントにする）コメントの配列にする"""
+    if isinstance(value, list):
+        return value
+    if not _is_truthy(value):
+        return []
+    return [{'id': '1', 'text': value, 'timestamp': fallback_timestamp}]
+
+
+def memo_to_comments(memo, fallback_timestamp):
+    """
+    memo 列をコメントの配列に戻す
+
+    サーバー（JSON.parse できなければ文字列のまま）とアプリのエクスポートと同じ扱い。
+    """
+    if not memo:
+        return []
+    try:
+        value = json.loads(memo)
+    except ValueError:
+        value = memo
+    return memo_value_to_comments(value, fallback_timestamp)
+
+
+def iso_to_db_timestamp(iso_string):
+    """ISO 8601 の日時をタイムゾーンなしのUTCの日時文字列にする（ミリ秒まで）"""
+    if not iso_string:
+        return None
+    dt = datetime.fromisoformat(iso_string.replace('Z', '+00:00'))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.isoformat(sep=' ', timespec='milliseconds')
+
+
+def now_db_timestamp():
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(sep=' ', timespec='milliseconds')
+
+
+def format_iso(dt):
+    """UTCの日時を JavaScript の toISOString と同じ形式にする"""
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z"
+
+
+def db_timestamp_to_iso(value):
+    """updated_at 列（タイムゾーンなしのUTC）を toISOString の形式にする"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return format_iso(value)
+
+
+def now_iso():
+    return format_iso(datetime.now(timezone.utc))
+
+
+def _chunks(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SQLiteBackend:
+    """SQLite の poster_states（ローカルでの確認用）"""
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        # トランザクションは明示的に開始する
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute(SQLITE_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def upsert(self, rows, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        行を一時テーブルにまとめて書き込み、1つのトランザクションで poster_states に反映する
+
+        Returns:
+            int: 反映した行数
+        """
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN')
+        try:
+            cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+                           f"(city, district_id, location_id, is_checked, memo, updated_at)")
+            cursor.execute(f"DELETE FROM {STAGING_TABLE}")
+            count = 0
+            insert = f"INSERT INTO {STAGING_TABLE} VALUES (?, ?, ?, ?, ?, ?)"
+            for batch in _chunks(rows, batch_size):
+                cursor.executemany(insert, batch)
+                count += len(batch)
+            cursor.execute(_MERGE_LOCATIONS)
+            cursor.execute(_UPDATE_DISTRICTS)
+            cursor.execute(_INSERT_DISTRICTS)
+            cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+            cursor.execute('COMMIT')
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        return count
+
+    @contextmanager
+    def snapshot(self):
+        """読み出しを1つのトランザクションで行う（途中の書き込みの影響を受けない）"""
+        self.connection.execute('BEGIN')
+        try:
+            yield self
+        finally:
+            self.connection.execute('COMMIT')
+
+    def iter_city_states(self, city, fetch_size=DEFAULT_FETCH_SIZE):
+        """
+        市の行を投票区の順に fetch_size 行ずつ読み出す
+
+        Yields:
+            tuple: (district_id, location_id, is_checked, memo, updated_at)
+        """
+        cursor = self.connection.execute(_SELECT_CITY_STATES.format(placeholder='?'), (city,))
+        try:
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for district_id, location_id, is_checked, memo, updated_at in rows:
+                    yield district_id, location_id, bool(is_checked), memo, updated_at
+        finally:
+            cursor.close()
+
+    def iter_memos(self, fetch_size=DEFAULT_FETCH_SIZE):
+        """
+        メモのある行を id の順に fetch_size 行ずつ読み出す（読み出しの間はトランザクションを保持しない）
+
+        Yields:
+            tuple: (id, memo, updated_at)
+        """
+        last_id = 0
+        query = _SELECT_MEMOS.format(placeholder='?')
+        while True:
+            rows = self.connection.execute(query, (last_id, fetch_size)).fetchall()
+            if not rows:
+                break
+            yield from rows
+            last_id = rows[-1][0]
+
+    def apply_repairs(self, repairs, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        (id, 元のメモ, 新しいメモ) を一時テーブルにまとめて書き込み、1つのトランザクションで反映する
+
+        Returns:
+            int: 書き換えた行数（読み出した後に変更された行は書き換えない）
+        """
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN')
+        try:
+            cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {REPAIR_TABLE} (id, old_memo, new_memo)")
+            cursor.execute(f"DELETE FROM {REPAIR_TABLE}")
+            insert = f"INSERT INTO {REPAIR_TABLE} VALUES (?, ?, ?)"
+            for batch in _chunks(repairs, batch_size):
+                cursor.executemany(insert, batch)
+            cursor.execute(_APPLY_REPAIRS)
+            count = cursor.rowcount
+            cursor.execute(f"DROP TABLE {REPAIR_TABLE}")
+            cursor.execute('COMMIT')
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        return count
+
+
+def _copy_value(value):
+    """COPY のテキスト形式の値に変換"""
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class PostgresBackend:
+    """PostgreSQL の poster_states（一時テーブルへの COPY で一括書き込み）"""
+
+    name = 'postgres'
+
+    def __init__(self, dsn):
+        try:
+            import psycopg2
+        except ImportError:
+            raise RuntimeError("PostgreSQL への接続には psycopg2 が必要です (pip install psycopg2-binary)")
+        self.connection = psycopg2.connect(dsn)
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute(POSTGRES_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def upsert(self, rows, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        行を一時テーブルに COPY で書き込み、1つのトランザクションで poster_states に反映する
+
+        Returns:
+            int: 反映した行数
+        """
+        count = 0
+        # with connection: 正常終了でコミット、例外でロールバック
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TEMP TABLE {STAGING_TABLE} (
+                  city VARCHAR(20), district_id VARCHAR(10), location_id VARCHAR(10),
+                  is_checked BOOLEAN, memo TEXT, updated_at TIMESTAMP
+                ) ON COMMIT DROP
+            """)
+            copy_sql = f"COPY {STAGING_TABLE} ({', '.join(COLUMNS)}) FROM STDIN"
+            for batch in _chunks(rows, batch_size):
+                buffer = io.StringIO()
+                for row in batch:
+                    buffer.write('\t'.join(_copy_value(value) for value in row))
+                    buffer.write('\n')
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+                count += len(batch)
+            cursor.execute(_MERGE_LOCATIONS)
+            cursor.execute(_UPDATE_DISTRICTS)
+            cursor.execute(_INSERT_DISTRICTS)
+        return count
+
+    @contextmanager
+    def snapshot(self):
+        """読み出しを REPEATABLE READ の読み取り専用トランザクションで行う（一貫したスナップショット）"""
+        self.connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        try:
+            with self.connection:
+                yield self
+        finally:
+            self.connection.set_session(isolation_level='DEFAULT', readonly=False)
+
+    def iter_city_states(self, city, fetch_size=DEFAULT_FETCH_SIZE):
+        """
+        市の行を投票区の順にサーバー側カーソルで fetch_size 行ずつ読み出す
+
+        Yields:
+            tuple: (district_id, location_id, is_checked, memo, updated_at)
+        """
+        with self.connection.cursor(name=f'poster_states_{city}') as cursor:
+            cursor.itersize = fetch_size
+            cursor.execute(_SELECT_CITY_STATES.format(placeholder='%s'), (city,))
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for district_id, location_id, is_checked, memo, updated_at in rows:
+                    yield district_id, location_id, bool(is_checked), memo, updated_at
+
+    def iter_memos(self, fetch_size=DEFAULT_FETCH_SIZE):
+        """
+        メモのある行を id の順に fetch_size 行ずつ読み出す（1回ごとにコミットし、ロックを保持しない）
+
+        Yields:
+            tuple: (id, memo, updated_at)
+        """
+        last_id = 0
+        query = _SELECT_MEMOS.format(placeholder='%s')
+        while True:
+            with self.connection, self.connection.cursor() as cursor:
+                cursor.execute(query, (last_id, fetch_size))
+                rows = cursor.fetchall()
+            if not rows:
+                break
+            yield from rows
+            last_id = rows[-1][0]
+
+    def apply_repairs(self, repairs, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        (id, 元のメモ, 新しいメモ) を一時テーブルに COPY で書き込み、1つのトランザクションで反映する
+
+        Returns:
+            int: 書き換えた行数（読み出した後に変更された行は書き換えない）
+        """
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute(f"CREATE TEMP TABLE {REPAIR_TABLE} (id INTEGER, old_memo TEXT, new_memo TEXT) ON COMMIT DROP")
+            copy_sql = f"COPY {REPAIR_TABLE} (id, old_memo, new_memo) FROM STDIN"
+            for batch in _chunks(repairs, batch_size):
+                buffer = io.StringIO()
+                for row in batch:
+                    buffer.write('\t'.join(_copy_value(value) for value in row))
+                    buffer.write('\n')
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+            cursor.execute(_APPLY_REPAIRS)
+            return cursor.rowcount
+
+
+def is_postgres_url(target):
+    return target.startswith(('postgres://', 'postgresql://'))
+
+
+def open_backend(target):
+    """接続URLなら PostgreSQL、それ以外は SQLite のファイルとして開く"""
+    if is_postgres_url(target):
+        return PostgresBackend(target)
+    return SQLiteBackend(target)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エクスポートJSONから市・投票区ごとのポスター貼り付け進捗を集計するモジュール
+
+掲示場所のチェック状態を1回の走査で数え、投票区ごとの件数は
+配列（array）で保持する。未チェックの掲示場所と最終活動日時も同時に求める。
+
+使い方:
+    python progress_aggregate.py poster-data-export-2025-07-10.json
+    python progress_aggregate.py export.json --city suita --unchecked
+    python progress_aggregate.py export.json --json > progress.json
+"""
+
+import argparse
+import json
+import time
+from array import array
+
+from columnar_export import NULL_TIMESTAMP, epoch_ms_to_datetime, iso_to_epoch_ms
+from export_stream import open_export
+from text_normalize import strip_line_breaks
+
+
+def _latest_activity(latest, iso_string):
+    """これまでの最終活動日時と比較して新しい方を返す（エポックミリ秒）"""
+    if iso_string and isinstance(iso_string, str):
+        value = iso_to_epoch_ms(iso_string)
+        if value > latest:
+            return value
+    return latest
+
+
+def _comments_activity(latest, comments):
+    for comment in comments or []:
+        latest = _latest_activity(latest, comment.get('timestamp'))
+    return latest
+
+
+class ProgressReport:
+    """
+    進捗の集計結果
+
+    投票区は出現順の番号で管理し、件数・最終活動日時は番号で引く配列に持つ。
+    """
+
+    def __init__(self):
+        self.export_timestamp = ''
+        self.city_keys = []
+        self.city_names = []
+        # 市番号ごとの配列
+        self.city_total = array('l')
+        self.city_checked = array('l')
+        self.city_last_activity = array('q')
+        # 投票区番号ごとの配列
+        self.district_city = array('H')
+        self.district_keys = []
+        self.district_checked_flag = array('b')
+        self.total = array('l')
+        self.checked = array('l')
+        self.last_activity = array('q')
+        # 投票区番号 → 未チェックの掲示場所 (番号, 名称) のリスト
+        self.unchecked = []
+
+    @property
+    def district_count(self):
+        return len(self.district_keys)
+
+    def _add_city(self, city_key, city_name):
+        self.city_keys.append(city_key)
+        self.city_names.append(city_name)
+        self.city_total.append(0)
+        self.city_checked.append(0)
+        self.city_last_activity.append(NULL_TIMESTAMP)
+        return len(self.city_keys) - 1
+
+    def _add_district(self, city_index, district_key, district_data):
+        district_comments = district_data.get('districtComments', {})
+        locations = district_data.get('locations', [])
+
+        latest = _latest_activity(NULL_TIMESTAMP, district_comments.get('lastUpdated'))
+        latest = _comments_activity(latest, district_comments.get('comments'))
+        checked = 0
+        unchecked = []
+        for location in locations:
+            if location.get('isChecked', False):
+                checked += 1
+            else:
+                name = strip_line_breaks(location.get('name', ''))
+                unchecked.append((location.get('number', ''), name))
+            latest = _latest_activity(latest, location.get('lastUpdated'))
+            latest = _comments_activity(latest, location.get('comments'))
+
+        self.district_city.append(city_index)
+        self.district_keys.append(district_key)
+        self.district_checked_flag.append(1 if district_comments.get('isChecked', False) else 0)
+        self.total.append(len(locations))
+        self.checked.append(checked)
+        self.last_activity.append(latest)
+        self.unchecked.append(unchecked)
+
+        self.city_total[city_index] += len(locations)
+        self.city_checked[city_index] += checked
+        if latest > self.city_last_activity[city_index]:
+            self.city_last_activity[city_index] = latest
+
+    def city_summary(self, city_index):
+        """市ごとの (総数, チェック済み数, 最終活動日時) を返す"""
+        return self.city_total[city_index], self.city_checked[city_index], self.city_last_activity[city_index]
+
+    def overall_summary(self):
+        """全体の (総数, チェック済み数, 最終活動日時) を返す"""
+        latest = max(self.city_last_activity) if self.city_keys else NULL_TIMESTAMP
+        return sum(self.city_total), sum(self.city_checked), latest
+
+    def to_dict(self):
+        """JSON出力用の辞書に変換"""
+        def entry(total, checked, latest):
+            return {
+                'total': total,
+                'checked': checked,
+                'unchecked': total - checked,
+                'rate': checked / total if total else 0.0,
+                'lastActivity': _format_iso(latest),
+            }
+
+        cities = {}
+        for city_index, city_key in enumerate(self.city_keys):
+            city = entry(*self.city_summary(city_index))
+            city['name'] = self.city_names[city_index]
+            city['districts'] = {}
+            cities[city_key] = city
+        for i in range(self.district_count):
+            district = entry(self.total[i], self.checked[i], self.last_activity[i])
+            district['districtChecked'] = bool(self.district_checked_flag[i])
+            district['uncheckedLocations'] = [
+                {'number': number, 'name': name} for number, name in self.unchecked[i]
+            ]
+            cities[self.city_keys[self.district_city[i]]]['districts'][self.district_keys[i]] = district
+
+        overall = entry(*self.overall_summary())
+        return {'exportTimestamp': self.export_timestamp, 'overall': overall, 'cities': cities}
+
+
+def _format_iso(epoch_ms):
+    dt = epoch_ms_to_datetime(epoch_ms)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.') + f"{dt.microsecond // 1000:03d}Z" if dt else None
+
+
+def _format_local(epoch_ms):
+    dt = epoch_ms_to_datetime(epoch_ms)
+    return dt.strftime('%Y/%m/%d %H:%M') if dt else '-'
+
+
+def aggregate_progress(json_file_path, streaming=False):
+    """
+    エクスポートJSONを1回走査して進捗を集計する
+
+    Returns:
+        ProgressReport: 集計結果
+    """
+    report = ProgressReport()
+    city_indexes = {}
+
+    with open_export(json_file_path, streaming=streaming) as export:
+        report.export_timestamp = export.timestamp
+        for city_key, city_name, district_key, district_data in export.iter_districts():
+            city_index = city_indexes.get(city_key)
+            if city_index is None:
+                city_index = city_indexes[city_key] = report._add_city(city_key, city_name)
+            report._add_district(city_index, district_key, district_data)
+
+    return report
+
+
+def print_report(report, city_filter=None, show_unchecked=False):
+    """集計結果を表形式で表示"""
+    total, checked, latest = report.overall_summary()
+    print(f"エクスポート日時: {report.export_timestamp}")
+    print(f"全体: {checked}/{total}件 ({checked / total if total else 0:.1%}) 最終活動: {_format_local(latest)}")
+
+    for city_index, city_key in enumerate(report.city_keys):
+        if city_filter and city_key != city_filter:
+            continue
+        total, checked, latest = report.city_summary(city_index)
+        print(f"\n=== {report.city_names[city_index]} ({city_key}) ===")
+        print(f"合計: {checked}/{total}件 ({checked / total if total else 0:.1%}) 最終活動: {_format_local(latest)}")
+
+        for i in range(report.district_count):
+            if report.district_city[i] != city_index:
+                continue
+            district_total = report.total[i]
+            district_checked = report.checked[i]
+            rate = district_checked / district_total if district_total else 0
+            print(f"  投票区{report.district_keys[i]}: {district_checked}/{district_total}件 ({rate:.0%}) "
+                  f"最終活動: {_format_local(report.last_activity[i])}")
+            if show_unchecked:
+                for number, name in report.unchecked[i]:
+                    print(f"    未チェック: {number} {name}")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='エクスポートJSONからポスター貼り付け進捗を集計')
+    parser.add_argument('json_file', help='エクスポートJSON')
+    parser.add_argument('--city', help='表示する市（suita, minoo など）')
+    parser.add_argument('--unchecked', action='store_true', help='未チェックの掲示場所も表示する')
+    parser.add_argument('--json', action='store_true', help='集計結果をJSONで出力する')
+    parser.add_argument('--stream', action='store_true', help='投票区ごとに読み込みながら集計する')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = aggregate_progress(args.json_file, streaming=args.stream)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+        return
+
+    print_report(report, args.city, args.unchecked)
+    print(f"\n集計時間: {elapsed:.3f}秒")
+
+
+if __name__ == "__main__":
+    main()
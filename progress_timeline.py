@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+複数のエクスポートJSONから投票区ごとの進捗の推移を再構成するモジュール
+
+スナップショットを時刻順に読み、掲示場所のチェック状態が変わった時点を
+投票区ごとのイベント（時刻の配列と増減の配列）として記録する。
+各スナップショットの全データは保持せず、掲示場所ごとの直前の状態だけを持つ。
+
+イベントの時刻は掲示場所の lastUpdated（スナップショット時刻より後の場合や
+ない場合はスナップショット時刻）とする。
+
+使い方:
+    python progress_timeline.py snapshots/ --city suita --district 131 --at "2025-07-05 18:00"
+    python progress_timeline.py snapshots/ --city 吹田市 --district 131 --from "2025-07-05 08:00" --to "2025-07-05 20:00" --step 60
+"""
+
+import argparse
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+from batch_convert import collect_export_files
+from columnar_export import NULL_TIMESTAMP, epoch_ms_to_datetime, iso_to_epoch_ms
+from export_stream import ExportStreamReader
+
+# タイムゾーンの指定がない時刻は日本時間として扱う
+JST = timezone(timedelta(hours=9))
+
+
+def parse_time(value, default_tz=JST):
+    """日時の文字列またはdatetimeをエポックミリ秒に変換"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=default_tz)
+    return int(value.timestamp() * 1000)
+
+
+class _DistrictSeries:
+    """投票区1つ分のイベント列とスナップショットごとの掲示場所数"""
+
+    __slots__ = ('event_times', 'event_deltas', 'cumulative', 'snapshot_times', 'snapshot_totals')
+
+    def __init__(self):
+        self.event_times = array('q')
+        self.event_deltas = array('b')
+        self.cumulative = None
+        self.snapshot_times = array('q')
+        self.snapshot_totals = array('l')
+
+    def finalize(self):
+        """イベントを時刻順に並べ、累積のチェック数を求める"""
+        order = sorted(range(len(self.event_times)), key=self.event_times.__getitem__)
+        self.event_times = array('q', (self.event_times[i] for i in order))
+        self.event_deltas = array('b', (self.event_deltas[i] for i in order))
+        self.cumulative = array('l')
+        checked = 0
+        for delta in self.event_deltas:
+            checked += delta
+            self.cumulative.append(checked)
+
+    def checked_at(self, when):
+        index = bisect_right(self.event_times, when)
+        return self.cumulative[index - 1] if index else 0
+
+    def total_at(self, when):
+        index = bisect_right(self.snapshot_times, when)
+        return self.snapshot_totals[max(index - 1, 0)] if self.snapshot_totals else 0
+
+
+class ProgressTimeline:
+    """
+    投票区ごとのチェック数の推移
+
+    Attributes:
+        snapshot_times (array): 読み込んだスナップショットの時刻（エポックミリ秒）
+    """
+
+    def __init__(self):
+        self.snapshot_times = array('q')
+        self.city_names = {}
+        self._series = {}
+        # (市キー, 投票区番号, 場所番号) → 直前のチェック状態
+        self._last_state = {}
+
+    def _series_for(self, city_key, district_key):
+        key = (city_key, district_key)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _DistrictSeries()
+        return series
+
+    def add_snapshot(self, json_file_path):
+        """スナップショットを1つ取り込む（時刻順に呼び出すこと）"""
+        with ExportStreamReader(json_file_path) as export:
+            snapshot_time = iso_to_epoch_ms(export.timestamp) if export.timestamp else NULL_TIMESTAMP
+            self.snapshot_times.append(snapshot_time)
+            seen = set()
+
+            for city_key, city_name, district_key, district_data in export.iter_districts():
+                self.city_names[city_key] = city_name
+                series = self._series_for(city_key, district_key)
+                locations = district_data.get('locations', [])
+                series.snapshot_times.append(snapshot_time)
+                series.snapshot_totals.append(len(locations))
+
+                for location in locations:
+                    key = (city_key, district_key, location.get('number', ''))
+                    seen.add(key)
+                    checked = bool(location.get('isChecked', False))
+                    if self._last_state.get(key, False) == checked:
+                        self._last_state[key] = checked
+                        continue
+                    self._last_state[key] = checked
+                    series.event_times.append(self._event_time(location.get('lastUpdated'), snapshot_time))
+                    series.event_deltas.append(1 if checked else -1)
+
+        # スナップショットから消えたチェック済みの掲示場所は取り消しとして扱う
+        for key in [key for key in self._last_state if key not in seen]:
+            if self._last_state.pop(key):
+                series = self._series_for(key[0], key[1])
+                series.event_times.append(snapshot_time)
+                series.event_deltas.append(-1)
+
+    @staticmethod
+    def _event_time(last_updated, snapshot_time):
+        if last_updated and isinstance(last_updated, str):
+            event_time = iso_to_epoch_ms(last_updated)
+            if event_time != NULL_TIMESTAMP and event_time <= snapshot_time:
+                return event_time
+        return snapshot_time
+
+    def finalize(self):
+        """全スナップショットの取り込み後に呼び出す"""
+        for series in self._series.values():
+            series.finalize()
+        self._last_state.clear()
+
+    def resolve_city(self, city):
+        """市キー・市名のどちらでも市キーを返す"""
+        if city in self.city_names:
+            return city
+        for city_key, city_name in self.city_names.items():
+            if city_name == city:
+                return city_key
+        raise KeyError(f"市が見つかりません: {city}")
+
+    def districts(self, city):
+        """市内の投票区番号の一覧"""
+        city_key = self.resolve_city(city)
+        return [district for c, district in self._series if c == city_key]
+
+    def progress_at(self, city, district, when):
+        """
+        指定時刻の投票区の進捗を返す
+
+        Args:
+            when: エポックミリ秒・ISO形式の文字列・datetime（タイムゾーンなしは日本時間）
+
+        Returns:
+            tuple: (チェック済み数, 掲示場所数)
+        """
+        series = self._series[(self.resolve_city(city), str(district))]
+        when = parse_time(when)
+        return series.checked_at(when), series.total_at(when)
+
+    def city_progress_at(self, city, when):
+        """指定時刻の市全体の進捗 (チェック済み数, 掲示場所数) を返す"""
+        city_key = self.resolve_city(city)
+        when = parse_time(when)
+        checked = total = 0
+        for (c, _), series in self._series.items():
+            if c == city_key:
+                checked += series.checked_at(when)
+                total += series.total_at(when)
+        return checked, total
+
+    def curve(self, city, district, start, end, step_minutes=60):
+        """
+        指定期間の進捗を一定間隔で返す
+
+        Returns:
+            list: (エポックミリ秒, チェック済み数, 掲示場所数) のリスト
+        """
+        series = self._series[(self.resolve_city(city), str(district))]
+        start = parse_time(start)
+        end = parse_time(end)
+        step = step_minutes * 60 * 1000
+        points = []
+        when = start
+        while when <= end:
+            points.append((when, series.checked_at(when), series.total_at(when)))
+            when += step
+        return points
+
+
+def build_timeline(json_files):
+    """
+    複数のスナップショットから進捗の推移を作る
+
+    スナップショットはエクスポート日時の順に取り込む。
+    """
+    ordered = []
+    for path in json_files:
+        with ExportStreamReader(path) as export:
+            ordered.append((export.timestamp or '', path))
+    ordered.sort()
+
+    timeline = ProgressTimeline()
+    for _, path in ordered:
+        timeline.add_snapshot(path)
+    timeline.finalize()
+    return timeline
+
+
+def _format_jst(epoch_ms):
+    dt = epoch_ms_to_datetime(epoch_ms)
+    return dt.astimezone(JST).strftime('%Y/%m/%d %H:%M') if dt else '-'
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='複数のエクスポートから投票区ごとの進捗の推移を求める')
+    parser.add_argument('targets', nargs='+', help='エクスポートJSON・ディレクトリ・globパターン')
+    parser.add_argument('--city', required=True, help='市キーまたは市名（suita, 吹田市 など）')
+    parser.add_argument('--district', help='投票区番号（省略時は市全体）')
+    parser.add_argument('--at', help='この時刻の進捗を表示（タイムゾーンなしは日本時間）')
+    parser.add_argument('--from', dest='start', help='推移の開始時刻')
+    parser.add_argument('--to', dest='end', help='推移の終了時刻')
+    parser.add_argument('--step', type=int, default=60, help='推移の間隔（分）')
+    args = parser.parse_args()
+
+    json_files = collect_export_files(args.targets)
+    if not json_files:
+        print("エラー: エクスポートJSONが見つかりません。")
+        return
+
+    start = time.perf_counter()
+    timeline = build_timeline(json_files)
+    print(f"スナップショット数: {len(json_files)}件 (読み込み {time.perf_counter() - start:.2f}秒)")
+
+    city_key = timeline.resolve_city(args.city)
+    label = f"{timeline.city_names[city_key]}"
+    if args.district:
+        label += f" 投票区{args.district}"
+
+    if args.at:
+        if args.district:
+            checked, total = timeline.progress_at(city_key, args.district, args.at)
+        else:
+            checked, total = timeline.city_progress_at(city_key, args.at)
+        rate = checked / total if total else 0
+        print(f"{label} {_format_jst(parse_time(args.at))}時点: {checked}/{total}件 ({rate:.0%})")
+
+    if args.start and args.end:
+        if not args.district:
+            parser.error('推移の表示には --district を指定してください')
+        print(f"\n=== {label} の推移 ===")
+        for when, checked, total in timeline.curve(city_key, args.district, args.start, args.end, args.step):
+            rate = checked / total if total else 0
+            print(f"  {_format_jst(when)}  {checked:>4}/{total}件 ({rate:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+エクスポートJSONと掲示場所一覧（解析済みのCSV）の突き合わせ
+
+一覧を (市, 投票区, 番号) で引ける LocationStore に読み込み、エクスポートの
+掲示場所を1件ずつ引き当てる。どちらも1回ずつ走査するだけなので、件数に比例した
+時間で終わる。
+
+    欠落: 一覧にあるがエクスポートにない掲示場所
+    追加: エクスポートにあるが一覧にない掲示場所
+    変更: 両方にあるが名称・住所・備考が異なる掲示場所
+
+名称はWebアプリの読み込み時に付く行末の改行コードを除いて比較する。
+
+使い方:
+    python reconcile.py poster-data-export-2025-07-10.json
+    python reconcile.py export.json --master parsed --city suita
+    python reconcile.py export.json --json > reconcile.json
+    python reconcile.py export.json --strict   # 差異があれば終了コード1（デプロイ前の確認用）
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from export_stream import open_export
+from list_parsing.engine import discover_cities, load_layout, parsed_master_csv_path
+from location_store import PUBLIC_DIR, LocationStore
+
+# 比較する項目（エクスポートのキー, LocationStore の列）
+COMPARED_FIELDS = (('name', 'names'), ('address', 'addresses'), ('remark', 'remarks'))
+
+
+def _normalize(value):
+    return (value or '').strip()
+
+
+def load_master(cities=None, source='public'):
+    """
+    掲示場所一覧を読み込む
+
+    Args:
+        cities (list): 対象の市キー（省略時は全て）
+        source (str): 'parsed' は list_parsing/ の解析結果、'public' はWebアプリの public/ のCSV
+
+    Returns:
+        LocationStore: 掲示場所一覧
+    """
+    store = LocationStore()
+    for city_key in cities or discover_cities():
+        layout = load_layout(city_key)
+        if source == 'public':
+            csv_path = os.path.join(PUBLIC_DIR, layout.public_file or f'{city_key}.csv')
+        else:
+            csv_path = parsed_master_csv_path(layout)
+        store.load_csv(csv_path, city_key, layout.city_name)
+    return store
+
+
+class ReconcileReport:
+    """突き合わせの結果"""
+
+    def __init__(self):
+        self.export_timestamp = ''
+        self.matched = 0
+        # (市キー, 投票区, 番号, 名称)
+        self.missing = []
+        self.extra = []
+        # (市キー, 投票区, 番号, 項目, 一覧の値, エクスポートの値)
+        self.changed = []
+
+    @property
+    def has_differences(self):
+        return bool(self.missing or self.extra or self.changed)
+
+    def city_counts(self):
+        """市ごとの (欠落, 追加, 変更された掲示場所) の件数"""
+        counts = {}
+        for kind, entries in (('missing', self.missing), ('extra', self.extra)):
+            for entry in entries:
+                counts.setdefault(entry[0], {'missing': 0, 'extra': 0, 'changed': 0})[kind] += 1
+        for city_key in {entry[:3] for entry in self.changed}:
+            counts.setdefault(city_key[0], {'missing': 0, 'extra': 0, 'changed': 0})['changed'] += 1
+        return counts
+
+    def to_dict(self):
+        """JSON出力用の辞書に変換"""
+        def location(entry):
+            return {'city': entry[0], 'district': entry[1], 'number': entry[2], 'name': entry[3]}
+
+        return {
+            'exportTimestamp': self.export_timestamp,
+            'matched': self.matched,
+            'missing': [location(entry) for entry in self.missing],
+            'extra': [location(entry) for entry in self.extra],
+            'changed': [
+                {'city': city_key, 'district': district, 'number': number,
+                 'field': field, 'master': master_value, 'export': export_value}
+                for city_key, district, number, field, master_value, export_value in self.changed
+            ],
+        }
+
+
+def reconcile(json_file_path, master, cities=None, streaming=False):
+    """
+    エクスポートと掲示場所一覧を突き合わせる
+
+    Args:
+        master (LocationStore): 掲示場所一覧
+        cities (list): 対象の市キー（省略時は全て）
+
+    Returns:
+        ReconcileReport: 突き合わせの結果
+    """
+    report = ReconcileReport()
+    seen = bytearray(len(master))
+    targets = set(cities) if cities else None
+
+    with open_export(json_file_path, streaming=streaming) as export:
+        report.export_timestamp = export.timestamp
+        for city_key, _, district_key, district_data in export.iter_districts():
+            if targets is not None and city_key not in targets:
+                continue
+            for location in district_data.get('locations', []):
+                number = str(location.get('number', ''))
+                row = master.row_of(city_key, district_key, number)
+                if row is None:
+                    report.extra.append((city_key, district_key, number, _normalize(location.get('name'))))
+                    continue
+
+                seen[row] = 1
+                report.matched += 1
+                for field, column in COMPARED_FIELDS:
+                    master_value = _normalize(getattr(master, column)[row])
+                    export_value = _normalize(location.get(field))
+                    if master_value != export_value:
+                        report.changed.append((city_key, district_key, number, field, master_value, export_value))
+
+    for row, (city_key, district, number, name) in enumerate(master.iter_columns('city_key', 'district', 'number', 'name')):
+        if not seen[row] and (targets is None or city_key in targets):
+            report.missing.append((city_key, district, number, _normalize(name)))
+
+    return report
+
+
+def print_report(report):
+    """突き合わせの結果を表示"""
+    print(f"エクスポート日時: {report.export_timestamp}")
+    print(f"一致: {report.matched}件 / 欠落: {len(report.missing)}件 / 追加: {len(report.extra)}件 / "
+          f"変更: {len({entry[:3] for entry in report.changed})}件")
+
+    for city_key, counts in sorted(report.city_counts().items()):
+        print(f"  {city_key}: 欠落 {counts['missing']}件 / 追加 {counts['extra']}件 / 変更 {counts['changed']}件")
+
+    if report.missing:
+        print("\n=== 欠落（一覧にあるがエクスポートにない） ===")
+        for city_key, district, number, name in report.missing:
+            print(f"  {city_key} 投票区{district} 番号{number}: {name}")
+
+    if report.extra:
+        print("\n=== 追加（エクスポートにあるが一覧にない） ===")
+        for city_key, district, number, name in report.extra:
+            print(f"  {city_key} 投票区{district} 番号{number}: {name}")
+
+    if report.changed:
+        print("\n=== 変更 ===")
+        for city_key, district, number, field, master_value, export_value in report.changed:
+            print(f"  {city_key} 投票区{district} 番号{number} {field}: {master_value!r} → {export_value!r}")
+
+    if not report.has_differences:
+        print("\n差異はありません")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='エクスポートJSONと掲示場所一覧を突き合わせる')
+    parser.add_argument('json_file', help='エクスポートJSON')
+    parser.add_argument('--master', choices=['public', 'parsed'], default='public',
+                        help='比較する一覧（public: public/ のCSV、parsed: list_parsing/ の解析結果）')
+    parser.add_argument('--city', action='append', help='対象の市キー（複数指定可、省略時は全て）')
+    parser.add_argument('--json', action='store_true', help='結果をJSONで出力する')
+    parser.add_argument('--stream', action='store_true', help='エクスポートを投票区ごとに読み込む')
+    parser.add_argument('--strict', action='store_true', help='差異がある場合は終了コード1で終了する')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    master = load_master(args.city, args.master)
+    report = reconcile(args.json_file, master, args.city, streaming=args.stream)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+        print(f"\n処理時間: {elapsed:.3f}秒 (一覧 {len(master)}件)")
+
+    if args.strict and report.has_differences:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+未チェックの掲示場所を班ごとに分け、回る順番を求める
+
+1. エクスポートから指定した投票区の未チェックの掲示場所を選ぶ
+2. 座標はジオコーディングのキャッシュ（geocode.py）から引く
+3. 班の数だけ k-means で地理的にまとめる
+4. 班ごとに最近傍法で順路を作り、2-opt で交差をなくす
+
+距離は緯度経度を平面（km）に投影して求める。2-opt は各地点の近傍（格子で求めた
+近い順の数地点）だけを候補にするため、数千地点でも数秒で終わる。
+
+使い方:
+    python route_plan.py poster-data-export-2025-07-10.json --city ibaraki --districts 22 36 40 41 47 56 59 --crews 3
+    python route_plan.py export.json --city suita --districts 131 132 --crews 2 --start 34.76,135.52 -o routes.csv
+"""
+
+import argparse
+import csv
+import math
+import random
+import time
+from collections import deque
+
+from geocode import DEFAULT_CACHE_FILE, DEFAULT_GAZETTEER_FILE, GeocodeCache, geocode_store, load_resolver
+from location_store import LocationRef, LocationStore
+
+# 2-opt で候補にする近傍の地点数
+NEIGHBOR_COUNT = 10
+KMEANS_MAX_ITERATIONS = 50
+# 近傍探索の格子の1マスに入れる地点数の上限（同じ座標の地点が多い場合を除く）
+MAX_POINTS_PER_CELL = 16
+# 緯度1度あたりの距離（km）
+KM_PER_DEGREE_LAT = 110.574
+KM_PER_DEGREE_LNG_AT_EQUATOR = 111.320
+
+OUTPUT_HEADERS = ['班', '順番', '投票区', '番号', '名称', '住所', '緯度', '経度', '前の地点からの距離(km)']
+
+
+def project(coordinates):
+    """
+    緯度経度を平面の座標（km）に投影する（地点の平均緯度を基準にした正距円筒図法）
+
+    Returns:
+        tuple: (xのリスト, yのリスト)
+    """
+    if not coordinates:
+        return [], []
+    lat0 = sum(lat for lat, _ in coordinates) / len(coordinates)
+    lng0 = sum(lng for _, lng in coordinates) / len(coordinates)
+    kx = KM_PER_DEGREE_LNG_AT_EQUATOR * math.cos(math.radians(lat0))
+    xs = [(lng - lng0) * kx for _, lng in coordinates]
+    ys = [(lat - lat0) * KM_PER_DEGREE_LAT for lat, _ in coordinates]
+    return xs, ys
+
+
+class _Grid:
+    """近傍探索用の格子（1マスに平均2地点程度、多くても MAX_POINTS_PER_CELL 地点）"""
+
+    def __init__(self, xs, ys, indexes):
+        self.xs = xs
+        self.ys = ys
+        min_x = min(xs[i] for i in indexes)
+        min_y = min(ys[i] for i in indexes)
+        width = max(xs[i] for i in indexes) - min_x
+        height = max(ys[i] for i in indexes) - min_y
+        # 地点が一直線に並ぶ場合も長辺に沿って1マス数地点になるようにする
+        side = max(width, height)
+        area = max(width * height, side * side / len(indexes), 1e-12)
+        self.cell = max(math.sqrt(area * 2 / len(indexes)), 1e-6)
+        self.min_x = min_x
+        self.min_y = min_y
+        # 地点が一部に集まっている場合はマスを細かくする
+        while True:
+            self.cells = {}
+            for i in indexes:
+                self.cells.setdefault(self._cell_of(i), []).append(i)
+            if self.cell <= 1e-6 or max(len(members) for members in self.cells.values()) <= MAX_POINTS_PER_CELL:
+                break
+            self.cell /= 2
+        self.count = len(indexes)
+        self.max_ring = int(side / self.cell) + 1
+
+    def _cell_of(self, i):
+        return int((self.xs[i] - self.min_x) / self.cell), int((self.ys[i] - self.min_y) / self.cell)
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def nearest(self, i, k):
+        """地点 i に近い順に最大 k 地点"""
+        xs, ys = self.xs, self.ys
+        cx, cy = self._cell_of(i)
+        found = []
+        for r in range(self.max_ring + 1):
+            # 空のマスを調べる方が多くなる場合は残りの全地点を比べる
+            if (2 * r + 1) ** 2 > 4 * self.count:
+                return self._nearest_all(i, k)
+            for cell in self._ring(cx, cy, r):
+                for j in self.cells.get(cell, ()):
+                    if j != i:
+                        found.append((math.hypot(xs[i] - xs[j], ys[i] - ys[j]), j))
+            # この輪より外のマスはどの地点も r * cell より遠い
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= r * self.cell:
+                    return [j for _, j in found[:k]]
+        found.sort()
+        return [j for _, j in found[:k]]
+
+    def _nearest_all(self, i, k):
+        xs, ys = self.xs, self.ys
+        found = sorted(
+            (math.hypot(xs[i] - xs[j], ys[i] - ys[j]), j)
+            for members in self.cells.values() for j in members if j != i
+        )
+        return [j for _, j in found[:k]]
+
+    def remove(self, i):
+        cell = self._cell_of(i)
+        members = self.cells[cell]
+        members.remove(i)
+        if not members:
+            del self.cells[cell]
+        self.count -= 1
+
+
+def kmeans(xs, ys, k, seed=0):
+    """
+    地点を k 個のまとまりに分ける（k-means++ で初期化）
+
+    Returns:
+        list: 地点ごとのまとまりの番号
+    """
+    n = len(xs)
+    k = max(1, min(k, n))
+    rng = random.Random(seed)
+
+    centers = [rng.randrange(n)]
+    nearest_sq = [(xs[i] - xs[centers[0]]) ** 2 + (ys[i] - ys[centers[0]]) ** 2 for i in range(n)]
+    while len(centers) < k:
+        total = sum(nearest_sq)
+        if total <= 0:
+            centers.append(rng.randrange(n))
+            continue
+        target = rng.random() * total
+        cumulative = 0.0
+        chosen = n - 1
+        for i, value in enumerate(nearest_sq):
+            cumulative += value
+            if cumulative >= target:
+                chosen = i
+                break
+        centers.append(chosen)
+        cx, cy = xs[chosen], ys[chosen]
+        for i in range(n):
+            d = (xs[i] - cx) ** 2 + (ys[i] - cy) ** 2
+            if d < nearest_sq[i]:
+                nearest_sq[i] = d
+    center_x = [xs[c] for c in centers]
+    center_y = [ys[c] for c in centers]
+
+    labels = [-1] * n
+    for _ in range(KMEANS_MAX_ITERATIONS):
+        changed = False
+        for i in range(n):
+            x, y = xs[i], ys[i]
+            best = min(range(k), key=lambda c: (x - center_x[c]) ** 2 + (y - center_y[c]) ** 2)
+            if best != labels[i]:
+                labels[i] = best
+                changed = True
+        if not changed:
+            break
+
+        sum_x = [0.0] * k
+        sum_y = [0.0] * k
+        counts = [0] * k
+        for i, label in enumerate(labels):
+            sum_x[label] += xs[i]
+            sum_y[label] += ys[i]
+            counts[label] += 1
+        for c in range(k):
+            if counts[c]:
+                center_x[c] = sum_x[c] / counts[c]
+                center_y[c] = sum_y[c] / counts[c]
+            else:
+                # 空になったまとまりは最も遠い地点から作り直す
+                far = max(range(n), key=lambda i: (xs[i] - center_x[labels[i]]) ** 2 + (ys[i] - center_y[labels[i]]) ** 2)
+                center_x[c], center_y[c] = xs[far], ys[far]
+    return labels
+
+
+def nearest_neighbor_route(xs, ys, indexes, start):
+    """最近傍法で start から全地点を回る順路を作る"""
+    grid = _Grid(xs, ys, indexes)
+    route = [start]
+    grid.remove(start)
+    current = start
+    for _ in range(len(indexes) - 1):
+        current = grid.nearest(current, 1)[0]
+        grid.remove(current)
+        route.append(current)
+    return route
+
+
+def two_opt(xs, ys, route, neighbor_count=NEIGHBOR_COUNT):
+    """
+    近傍リストを使った 2-opt で順路を改善する（始点は固定、終点は自由）
+
+    Returns:
+        list: 改善した順路
+    """
+    n = len(route)
+    if n < 4:
+        return route
+
+    def dist(a, b):
+        if a is None or b is None:
+            return 0.0
+        return math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+    grid = _Grid(xs, ys, route)
+    neighbors = {i: grid.nearest(i, neighbor_count) for i in route}
+    route = list(route)
+    position = {node: p for p, node in enumerate(route)}
+
+    def reverse(i, j):
+        route[i:j + 1] = route[i:j + 1][::-1]
+        for p in range(i, j + 1):
+            position[route[p]] = p
+
+    queue = deque(route)
+    queued = set(route)
+    while queue:
+        a = queue.popleft()
+        queued.discard(a)
+        i = position[a]
+        b = route[i + 1] if i + 1 < n else None
+        d_ab = dist(a, b)
+
+        for c in neighbors[a]:
+            d_ac = dist(a, c)
+            j = position[c]
+            if j > i + 1:
+                # a→b ... c→d を a→c ... b→d に（a→c が a→b より短い場合だけ改善しうる）
+                if d_ac >= d_ab:
+                    continue
+                d = route[j + 1] if j + 1 < n else None
+                gain = d_ab + dist(c, d) - d_ac - dist(b, d)
+                if gain > 1e-9:
+                    reverse(i + 1, j)
+                    touched = (a, b, c, d)
+                    break
+            elif j < i - 1:
+                # c→e ... a→b を c→a ... e→b に（始点 route[0] は動かさない）
+                e = route[j + 1]
+                gain = dist(c, e) + d_ab - d_ac - dist(e, b)
+                if gain > 1e-9:
+                    reverse(j + 1, i)
+                    touched = (a, b, c, e)
+                    break
+        else:
+            continue
+
+        for node in touched:
+            if node is not None and node not in queued:
+                queue.append(node)
+                queued.add(node)
+    return route
+
+
+def route_length(xs, ys, route):
+    """順路の長さ（km）"""
+    return sum(math.hypot(xs[a] - xs[b], ys[a] - ys[b]) for a, b in zip(route, route[1:]))
+
+
+def plan_routes(coordinates, crews, start=None, seed=0):
+    """
+    地点を班ごとに分け、回る順番を求める
+
+    Args:
+        coordinates (list): 地点ごとの (緯度, 経度)
+        crews (int): 班の数
+        start (tuple): 出発地点の (緯度, 経度)（省略時は各班のまとまりの端から）
+
+    Returns:
+        list: 班ごとの (地点番号の順路, 長さkm)。出発地点は順路に含まない
+    """
+    if not coordinates:
+        return []
+    points = list(coordinates) + ([start] if start else [])
+    xs, ys = project(points)
+    n = len(coordinates)
+    labels = kmeans(xs[:n], ys[:n], crews, seed)
+
+    routes = []
+    for crew in sorted(set(labels)):
+        members = [i for i in range(n) if labels[i] == crew]
+        if start:
+            depot = n
+            indexes = members + [depot]
+        else:
+            # まとまりの重心から最も遠い地点（端）から回る
+            cx = sum(xs[i] for i in members) / len(members)
+            cy = sum(ys[i] for i in members) / len(members)
+            depot = max(members, key=lambda i: (xs[i] - cx) ** 2 + (ys[i] - cy) ** 2)
+            indexes = members
+        route = two_opt(xs, ys, nearest_neighbor_route(xs, ys, indexes, depot))
+        length = route_length(xs, ys, route)
+        routes.append(([i for i in route if i != n], length))
+    return routes
+
+
+def select_unchecked(store, city_key, districts):
+    """
+    指定した投票区の未チェックの掲示場所だけのストアを作る
+
+    Args:
+        districts (list): 投票区番号（省略時は市内の全投票区）
+    """
+    selected = LocationStore()
+    selected.add_city(city_key, store.city_names[store.city_keys.index(city_key)])
+    for district in districts or store.districts(city_key):
+        for location in store.iter_district(city_key, district):
+            if not location.is_checked:
+                selected.add(city_key, location.district, location.number,
+                             name=location.name, address=location.address, remark=location.remark)
+    return selected
+
+
+def _parse_start(value):
+    lat, _, lng = value.partition(',')
+    return float(lat), float(lng)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='未チェックの掲示場所を班ごとに分け、回る順番を求める')
+    parser.add_argument('json_file', help='エクスポートJSON')
+    parser.add_argument('--city', required=True, help='市キー（suita, ibaraki など）')
+    parser.add_argument('--districts', nargs='*', help='対象の投票区番号（省略時は市内の全て）')
+    parser.add_argument('--crews', type=int, default=1, help='班の数')
+    parser.add_argument('--start', type=_parse_start, help='出発地点の 緯度,経度')
+    parser.add_argument('--gazetteer', default=DEFAULT_GAZETTEER_FILE, help='地名辞書のCSV（キャッシュにない住所の解決に使用）')
+    parser.add_argument('--resolver', help='独自のリゾルバー（モジュール名:クラス名）')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE, help='ジオコーディングのキャッシュファイル')
+    parser.add_argument('--seed', type=int, default=0, help='班分けの乱数の種')
+    parser.add_argument('-o', '--output', help='順路のCSVの出力先')
+    args = parser.parse_args()
+
+    store = LocationStore.from_export(args.json_file, streaming=True)
+    if args.city not in store.city_keys:
+        print(f"エラー: エクスポートに市 '{args.city}' がありません。")
+        return
+    selected = select_unchecked(store, args.city, args.districts)
+    if not len(selected):
+        print("未チェックの掲示場所はありません。")
+        return
+
+    geocoded, _ = geocode_store(selected, load_resolver(args.resolver, args.gazetteer), GeocodeCache(args.cache))
+    rows = [row for row, entry in enumerate(geocoded) if entry is not None]
+    missing = len(selected) - len(rows)
+    print(f"未チェックの掲示場所: {len(selected)}件 (座標なしのため除外: {missing}件)")
+    if not rows:
+        print("エラー: 座標のある掲示場所がありません。先に geocode.py で座標を付けてください。")
+        return
+
+    coordinates = [(geocoded[row]['lat'], geocoded[row]['lng']) for row in rows]
+    start = time.perf_counter()
+    routes = plan_routes(coordinates, args.crews, args.start, args.seed)
+    elapsed = time.perf_counter() - start
+
+    output_rows = []
+    for crew, (route, length) in enumerate(routes, 1):
+        print(f"\n=== 班{crew}: {len(route)}件 約{length:.1f}km ===")
+        previous = args.start
+        for order, index in enumerate(route, 1):
+            location = LocationRef(selected, rows[index])
+            lat, lng = coordinates[index]
+            step = 0.0 if previous is None else _distance_km(previous, coordinates[index])
+            previous = coordinates[index]
+            print(f"  {order:>3}. 投票区{location.district} 番号{location.number} {location.name.strip()}")
+            output_rows.append([crew, order, location.district, location.number, location.name.strip(),
+                                location.address, lat, lng, f"{step:.3f}"])
+    print(f"\n順路の計算時間: {elapsed:.3f}秒")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(OUTPUT_HEADERS)
+            writer.writerows(output_rows)
+        print(f"出力: {args.output}")
+
+
+def _distance_km(a, b):
+    xs, ys = project([a, b])
+    return math.hypot(xs[0] - xs[1], ys[0] - ys[1])
+
+
+if __name__ == "__main__":
+    main()
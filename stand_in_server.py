@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ポスターAPI（server.js）と同じ応答を返す、SQLiteを使ったローカルの代替サーバー
+
+負荷試験やAPIクライアントの確認を、本番のサーバー・PostgreSQLを使わずに行うためのもの。
+次のエンドポイントを server.js と同じ形の要求・応答で提供する:
+
+    GET  /api/states/:city   チェック状態とメモ（{checkStates, memos}）
+    POST /api/states/check   チェック状態の更新
+    POST /api/states/memo    メモの更新
+    GET  /api/stats/:city    投票区ごとの掲示場所数とチェック済みの数（件数は文字列）
+    GET  /<市>.csv           public/ の掲示場所一覧
+
+投票区全体の行（location_id が NULL）が一意制約で更新されず追加されることも含め、
+server.js のSQLと同じ動作にしている。
+
+使い方:
+    python stand_in_server.py --db stand_in.db --seed poster-data-export-2025-07-10.json
+    python stand_in_server.py --db stand_in.db --port 0       # 空いているポートで起動
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from location_store import PUBLIC_DIR
+from poster_db import SQLITE_SCHEMA, TABLE_NAME, db_timestamp_to_iso, now_db_timestamp
+
+DEFAULT_PORT = 5000
+
+_UPSERT_CHECK = f"""
+INSERT INTO {TABLE_NAME} (city, district_id, location_id, is_checked, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (city, district_id, location_id)
+DO UPDATE SET is_checked = excluded.is_checked, updated_at = excluded.updated_at
+"""
+
+_UPSERT_MEMO = f"""
+INSERT INTO {TABLE_NAME} (city, district_id, location_id, memo, updated_at)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (city, district_id, location_id)
+DO UPDATE SET memo = excluded.memo, updated_at = excluded.updated_at
+"""
+
+_SELECT_STATS = f"""
+SELECT district_id,
+  COUNT(*) AS total_locations,
+  COUNT(CASE WHEN is_checked = 1 AND location_id IS NOT NULL THEN 1 END) AS completed_locations
+FROM {TABLE_NAME}
+WHERE city = ? AND location_id IS NOT NULL
+GROUP BY district_id
+ORDER BY district_id
+"""
+
+
+def _js_stringify(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class StandInAPI:
+    """server.js の各エンドポイントの処理（スレッドごとにSQLiteの接続を持つ）"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        connection = self.connection()
+        connection.execute(SQLITE_SCHEMA)
+        # 読み出しと書き込みを並行して行えるようにする
+        connection.execute('PRAGMA journal_mode=WAL')
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def get_states(self, city):
+        rows = self.connection().execute(
+            f"SELECT district_id, location_id, is_checked, memo, updated_at FROM {TABLE_NAME} "
+            f"WHERE city = ? ORDER BY id", (city,))
+        check_states = {}
+        memos = {}
+        for district_id, location_id, is_checked, memo, updated_at in rows:
+            key = f"{district_id}-{location_id}" if location_id else f"{district_id}-district"
+            check_states[key] = {
+                'checked': bool(is_checked),
+                'lastUpdated': db_timestamp_to_iso(updated_at),
+            }
+            if memo:
+                try:
+                    memos[key] = json.loads(memo)
+                except ValueError:
+                    # JSON形式でない場合（古いデータ）は文字列として扱う
+                    memos[key] = memo
+        return {'checkStates': check_states, 'memos': memos}
+
+    def update_check(self, body):
+        connection = self.connection()
+        with connection:
+            connection.execute(_UPSERT_CHECK, (
+                body.get('city'), body.get('districtId'), body.get('locationId') or None,
+                body.get('isChecked'), now_db_timestamp(),
+            ))
+        return {'success': True}
+
+    def update_memo(self, body):
+        memo = body.get('memo')
+        if isinstance(memo, (list, dict)):
+            memo = _js_stringify(memo)
+        connection = self.connection()
+        with connection:
+            connection.execute(_UPSERT_MEMO, (
+                body.get('city'), body.get('districtId'), body.get('locationId') or None,
+                memo, now_db_timestamp(),
+            ))
+        return {'success': True}
+
+    def get_stats(self, city):
+        # node-postgres は COUNT の結果（bigint）を文字列で返す
+        return [
+            {'district_id': district_id, 'total_locations': str(total), 'completed_locations': str(completed)}
+            for district_id, total, completed in self.connection().execute(_SELECT_STATS, (city,))
+        ]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1（keep-alive）で要求を受け、StandInAPI に振り分ける"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PosterStandIn/1.0'
+    api = None
+    verbose = False
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type='application/json; charset=utf-8'):
+        data = body if isinstance(body, bytes) else _js_stringify(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        return json.loads(raw.decode('utf-8')) if raw else {}
+
+    def do_GET(self):
+        path = unquote(self.path.split('?', 1)[0])
+        try:
+            if path.startswith('/api/states/'):
+                self._send(200, self.api.get_states(path[len('/api/states/'):]))
+            elif path.startswith('/api/stats/'):
+                self._send(200, self.api.get_stats(path[len('/api/stats/'):]))
+            elif path.endswith('.csv') and '/' not in path[1:]:
+                csv_path = os.path.join(PUBLIC_DIR, path[1:])
+                if not os.path.exists(csv_path):
+                    self._send(404, {'error': 'Not Found'})
+                    return
+                with open(csv_path, 'rb') as f:
+                    self._send(200, f.read(), 'text/csv; charset=utf-8')
+            else:
+                self._send(404, {'error': 'Not Found'})
+        except sqlite3.Error as e:
+            print(f"状態取得エラー: {e}", file=sys.stderr)
+            self._send(500, {'error': 'データベースエラー'})
+
+    def do_POST(self):
+        path = unquote(self.path.split('?', 1)[0])
+        handlers = {'/api/states/check': self.api.update_check, '/api/states/memo': self.api.update_memo}
+        handler = handlers.get(path)
+        if handler is None:
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self._send(404, {'error': 'Not Found'})
+            return
+        try:
+            body = self._read_json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            self._send(400, {'error': 'Bad Request'})
+            return
+        try:
+            self._send(200, handler(body))
+        except sqlite3.Error as e:
+            print(f"更新エラー: {e}", file=sys.stderr)
+            self._send(500, {'error': 'データベースエラー'})
+
+
+def make_server(db_path, host='127.0.0.1', port=DEFAULT_PORT, verbose=False):
+    """代替サーバーを作成する（serve_forever で起動）"""
+    handler = type('Handler', (StandInHandler,), {'api': StandInAPI(db_path), 'verbose': verbose})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='ポスターAPIのローカルの代替サーバー（SQLite）')
+    parser.add_argument('--db', required=True, help='SQLiteのファイルパス（なければ作成）')
+    parser.add_argument('--seed', help='起動前に書き込むエクスポートJSON')
+    parser.add_argument('--host', default='127.0.0.1', help='待ち受けるアドレス')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='待ち受けるポート（0で空いているポート）')
+    parser.add_argument('--verbose', action='store_true', help='要求ごとにログを表示')
+    args = parser.parse_args()
+
+    if args.seed:
+        if not os.path.exists(args.seed):
+            print(f"エラー: 指定されたJSONファイルが見つかりません: {args.seed}")
+            sys.exit(1)
+        from db_load import load_export
+        stats = load_export(args.seed, args.db)
+        print(f"初期データ: {stats['rows']}行")
+
+    try:
+        server = make_server(args.db, args.host, args.port, args.verbose)
+    except OSError as e:
+        print(f"エラー: サーバーを起動できません。{e}")
+        sys.exit(1)
+    host, port = server.server_address[:2]
+    # 負荷試験などから起動した場合はこの行でポートを知る
+    print(f"起動しました: http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+掲示場所一覧の解析（list_parsing/engine.py）のテスト
+
+各市区町村のレイアウトの解析結果が作成済みのCSVと行ごとに一致すること、
+住所の分割例（list_parsing/address_cases.txt）が期待どおりに分割されることを確認する。
+`python -m list_parsing.engine --check` と同じ内容を、リポジトリのルートで
+`python -m pytest` または `python -m unittest` として実行できる。
+"""
+
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import unittest
+
+from list_parsing.engine import (
+    ADDRESS_CASES_FILE, city_dir, discover_cities, load_layout, parse_city,
+    read_address_cases, write_csv,
+)
+
+
+def read_rows(path):
+    """CSVの行をリストで返す（改行コードの違いは比較しない）"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return list(csv.reader(f))
+
+
+class ParseCityTest(unittest.TestCase):
+    """各市区町村の解析結果と作成済みのCSVの比較"""
+
+    def test_matches_golden_csv(self):
+        cities = discover_cities()
+        self.assertTrue(cities)
+        for city_key in cities:
+            with self.subTest(city=city_key):
+                layout = load_layout(city_key)
+                golden = os.path.join(city_dir(city_key), layout.golden_file or layout.output_file)
+
+                # 解析中の進捗表示は抑止する
+                with contextlib.redirect_stdout(io.StringIO()):
+                    records = parse_city(layout)
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    output_file = os.path.join(tmp_dir, 'output.csv')
+                    write_csv(layout, records, output_file)
+                    actual = read_rows(output_file)
+
+                expected = read_rows(golden)
+                self.assertEqual(len(actual), len(expected))
+                for line_number, (actual_row, expected_row) in enumerate(zip(actual, expected), 1):
+                    self.assertEqual(actual_row, expected_row, f"{os.path.relpath(golden)}:{line_number}")
+
+
+class AddressCasesTest(unittest.TestCase):
+    """住所と備考の分割例"""
+
+    def test_address_cases(self):
+        layouts = {}
+        cases = list(read_address_cases())
+        self.assertTrue(cases)
+        for line_number, city_key, address_first, text, address, remark in cases:
+            with self.subTest(case=f"{os.path.basename(ADDRESS_CASES_FILE)}:{line_number}"):
+                if city_key not in layouts:
+                    layouts[city_key] = load_layout(city_key)
+                self.assertEqual(layouts[city_key].split_address(text, address_first), (address, remark), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
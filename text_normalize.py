@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+掲示場所データの文字列の正規化
+
+変換表・正規表現はモジュールの読み込み時に1回だけ作る。キャッシュするのは同じ文字列が
+何度も現れる住所の照合キーだけで、ほぼ全て異なる名称はキャッシュしない（ハッシュと
+追い出しの分だけ遅くなるため）。
+
+    to_halfwidth_digits('第１０１投票区')          → '第101投票区'
+    strip_line_breaks('101-1 吹田市役所前\\r')      → '101-1 吹田市役所前'
+    normalize_address('大阪府吹田市泉町１丁目３－４０') → '大阪府吹田市泉町1丁目3-40'
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# キャッシュする文字列の種類の上限
+NORMALIZE_CACHE_SIZE = 65536
+
+FULLWIDTH_DIGITS = '０１２３４５６７８９'
+HALFWIDTH_DIGITS = '0123456789'
+
+FULLWIDTH_DIGITS_TABLE = str.maketrans(FULLWIDTH_DIGITS, HALFWIDTH_DIGITS)
+
+# 数字の間のハイフン・長音記号など、住所の区切りに使われる文字
+ADDRESS_DASH_PATTERN = re.compile(r'(?<=\d)[\-‐‑‒–—―−ーｰ](?=\d)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def to_halfwidth_digits(text):
+    """全角数字を半角数字に変換（投票区・番号のキーはほとんどが半角のため、ASCIIのみの文字列はそのまま返す）"""
+    if text.isascii():
+        return text
+    return text.translate(FULLWIDTH_DIGITS_TABLE)
+
+
+def strip_line_breaks(text):
+    """
+    改行文字（CR・LF）を除去
+
+    Webアプリは public/*.csv を LF だけで分割するため、CRLF のCSVから読んだ
+    名称には行末に CR が残る。短い文字列では translate より replace の方が速い。
+    """
+    return text.replace('\r', '').replace('\n', '')
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_address(address):
+    """
+    住所の表記ゆれ（全角・半角、空白、ハイフンの種類）を統一した照合用のキー（キャッシュ付き）
+
+    NFKC で全角英数字・記号（全角ハイフン・全角スペースを含む）を半角にし、空白を除いて、
+    数字の間の区切り（ハイフン・ダッシュ・長音記号の類）をハイフンにする。
+    """
+    address = unicodedata.normalize('NFKC', address or '')
+    address = WHITESPACE_PATTERN.sub('', address)
+    return ADDRESS_DASH_PATTERN.sub('-', address)